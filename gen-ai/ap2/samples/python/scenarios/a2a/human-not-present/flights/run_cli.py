@@ -12,26 +12,38 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-# cspell:words PYTHONUNBUFFERED
+"""A custom CLI runner for the human-not-present flight booking demo.
 
+The agent's answers are streamed to the terminal as they are generated, along
+with its tool calls and their results.
 
-"""A custom CLI runner for the human-not-present flight booking demo."""
+With --turns, the user's turns are instead read from a file, one per line
+(blank lines and lines starting with # are skipped), the mandate is approved
+without asking, and the latency of each turn is reported at the end:
 
+  python run_cli.py --turns=turns.txt
+"""
+
+import argparse
 import asyncio
+import dataclasses
 import logging
 import os
-import subprocess
-import sys
-import time
+from collections.abc import Sequence
 from pathlib import Path
+import time
 
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService, Session
 from google.genai.types import Content, Part
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
+from rich.table import Table
 
+from common.process_supervisor import ProcessSupervisor
+from common.process_supervisor import RoleServer
 from roles.shopping_agent_flights.agent import flight_shopping_agent
 
 # Configure logging after imports to satisfy linting rules
@@ -41,6 +53,76 @@ logging.getLogger("google_genai").setLevel(logging.ERROR)
 # Resolve the repository root (so logs go to <repo>/.logs/)
 PROJECT_ROOT = Path(__file__).resolve().parents[6]
 
+# The A2A endpoint of the flight merchant agent, polled until it is ready.
+MERCHANT_BASE_URL = "http://localhost:8004/a2a/flights_merchant"
+
+# Stream the model's answers, so that they are shown as they are generated.
+RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
+
+@dataclasses.dataclass
+class TurnResult:
+    """How long a turn of the conversation took, and what happened in it."""
+
+    user_input: str
+    first_event_seconds: float | None = None
+    total_seconds: float = 0.0
+    tool_calls: int = 0
+    errors: int = 0
+
+
+async def run_turn(
+    runner: Runner, session: Session, user_input: str, console: Console
+) -> TurnResult:
+    """Sends a user turn to the agent, rendering its events as they arrive."""
+    result = TurnResult(user_input)
+    start = time.perf_counter()
+    # Whether the partial text of the current answer is being printed.
+    streaming = False
+    async for event in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=Content(role="user", parts=[Part(text=user_input)]),
+        run_config=RUN_CONFIG,
+    ):
+        if result.first_event_seconds is None:
+            result.first_event_seconds = time.perf_counter() - start
+
+        if event.error_message:
+            result.errors += 1
+            console.print(
+                f"[bold red]AGENT ERROR: {event.error_message}[/bold red]"
+            )
+        if not event.partial:
+            for call in event.get_function_calls():
+                result.tool_calls += 1
+                console.print(f"[dim]→ {call.name}({call.args or {}})[/dim]")
+            for response in event.get_function_responses():
+                console.print(f"[dim]← {response.name}: {response.response}[/dim]")
+
+        parts = event.content.parts if event.content and event.content.parts else []
+        text = "".join(part.text for part in parts if part.text and not part.thought)
+        if not text:
+            continue
+        if event.partial:
+            if not streaming:
+                console.print(
+                    f"\n[bold green]{session.app_name}:[/bold green] ", end=""
+                )
+                streaming = True
+            console.print(text, end="", markup=False, highlight=False)
+        elif streaming:
+            # The complete answer repeats the partial text already printed.
+            console.print()
+            streaming = False
+        else:
+            console.print(
+                f"\n[bold green]{session.app_name}:[/bold green] {text.strip()}"
+            )
+
+    result.total_seconds = time.perf_counter() - start
+    return result
+
 
 async def run_demo(runner: Runner, session: Session) -> None:
     """Drives the conversational agent programmatically using the Runner."""
@@ -55,62 +137,59 @@ async def run_demo(runner: Runner, session: Session) -> None:
     )
 
     # Kick off the conversation with a simple greeting.
-    invocation = runner.run_async(
-        user_id=session.user_id,
-        session_id=session.id,
-        new_message=Content(role="user", parts=[Part(text="Hi there")]),
-    )
-
+    user_input = "Hi there"
     while True:
-        try:
-            # Collect streamed events from the agent
-            events = [event async for event in invocation]
-
-            # Aggregate any final, user-facing text
-            final_text = ""
-            for event in events:
-                if event.is_final_response():
-                    if (
-                        event.content
-                        and event.content.parts
-                        and event.content.parts[0].text
-                    ):
-                        final_text += event.content.parts[0].text.strip() + " "
-                if event.error_message:
-                    console.print(
-                        f"[bold red]AGENT ERROR: {event.error_message}[/bold red]"
-                    )
-
-            if final_text:
-                console.print(
-                    f"\n[bold green]{session.app_name}:[/bold green] {final_text.strip()}"
-                )
+        await run_turn(runner, session, user_input, console)
 
-            # Prompt for next user input
-            user_input = Prompt.ask("\n[bold]You[/bold]")
-            if user_input.lower() in ["exit", "quit"]:
-                break
+        # Prompt for next user input
+        user_input = Prompt.ask("\n[bold]You[/bold]")
+        if user_input.lower() in ["exit", "quit"]:
+            break
 
-            # Continue the conversation
-            invocation = runner.run_async(
-                user_id=session.user_id,
-                session_id=session.id,
-                new_message=Content(role="user", parts=[Part(text=user_input)]),
-            )
 
-        except StopAsyncIteration:
-            console.print("\n[bold yellow]Conversation ended.[/bold yellow]")
-            break
+async def run_batch(
+    runner: Runner, session: Session, user_inputs: Sequence[str]
+) -> None:
+    """Replays scripted user turns, and reports the latency of each one."""
+    console = Console()
+    results = []
+    for user_input in user_inputs:
+        console.print(f"\n[bold]You:[/bold] {user_input}")
+        results.append(await run_turn(runner, session, user_input, console))
+
+    table = Table(title="Turn latency")
+    table.add_column("#", justify="right")
+    table.add_column("User input")
+    table.add_column("First event (ms)", justify="right")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Tool calls", justify="right")
+    table.add_column("Errors", justify="right")
+    for index, result in enumerate(results, start=1):
+        first_event = (
+            f"{result.first_event_seconds * 1000:.0f}"
+            if result.first_event_seconds is not None
+            else "-"
+        )
+        table.add_row(
+            str(index),
+            result.user_input,
+            first_event,
+            f"{result.total_seconds * 1000:.0f}",
+            str(result.tool_calls),
+            str(result.errors),
+        )
+    console.print(table)
 
 
-def main() -> None:
-    """Main function to start the merchant server and run the demo."""
-    merchant_log_path = PROJECT_ROOT / ".logs" / "flight_merchant.log"
-    merchant_log_path.parent.mkdir(parents=True, exist_ok=True)
+def read_script(path: str) -> list[str]:
+    """Reads the user turns of a script file."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
 
-    # Spawn using the same interpreter; force unbuffered output for live logs
-    merchant_command = [sys.executable, "-m", "roles.merchant_agent_flights"]
 
+async def run_scenario(script: list[str] | None) -> None:
+    """Starts the merchant server, runs the demo, and stops the server."""
     app_name = "flight_shopping_agent"
     user_id = "cli_user"
     session_id = "cli_session"
@@ -121,39 +200,50 @@ def main() -> None:
         session_service=session_service,
     )
 
-    process = None
-    try:
-        with open(merchant_log_path, "w") as log_file:
-            env = os.environ.copy()
-            env["PYTHONUNBUFFERED"] = "1"
-            process = subprocess.Popen(
-                merchant_command,
-                cwd=PROJECT_ROOT,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                env=env,
-            )
-
+    merchant = RoleServer(
+        "roles.merchant_agent_flights",
+        MERCHANT_BASE_URL,
+        "flight_merchant.log",
+    )
+    supervisor = ProcessSupervisor(
+        [merchant],
+        log_dir=PROJECT_ROOT / ".logs",
+        cwd=PROJECT_ROOT,
+        # The merchant narrates its checks to its log, for the demo.
+        env={**os.environ, "AP2_CONSOLE": "rich"},
+    )
+    async with supervisor:
         print(
-            f"--> Started Flight Merchant Agent in the background "
-            f"(log: {merchant_log_path.resolve()})"
+            "--> Started Flight Merchant Agent in the background "
+            f"(log: {Path(supervisor.log_path(merchant)).resolve()})"
         )
-        time.sleep(3)  # brief warm-up
-
-        session = asyncio.run(
-            session_service.create_session(
-                app_name=app_name, user_id=user_id, session_id=session_id
-            )
+        session = await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            # Nobody is there to approve the mandate of a scripted run.
+            state={"auto_approve_mandate": script is not None},
         )
+        try:
+            if script is None:
+                await run_demo(runner, session)
+            else:
+                await run_batch(runner, session, script)
+        finally:
+            print("\n--> Shutting down background merchant agent...")
+    print("--> Cleanup complete.")
 
-        asyncio.run(run_demo(runner, session))
 
-    finally:
-        if process:
-            print("\n--> Shutting down background merchant agent...")
-            process.terminate()
-            process.wait()
-            print("--> Cleanup complete.")
+def main() -> None:
+    """Main function to start the merchant server and run the demo."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--turns",
+        help="A file of user turns to replay, one per line, instead of prompting.",
+    )
+    args = parser.parse_args()
+    script = read_script(args.turns) if args.turns else None
+    asyncio.run(run_scenario(script))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks the merchant agent's local product catalog.
+
+Builds synthetic catalogs of the given sizes, then reports the time taken to
+index them and the latency of IntentMandate searches.
+
+Usage, from the samples/python/src directory:
+  python -m benchmarks.catalog_search --sizes=100000,1000000
+"""
+
+from collections.abc import Sequence
+import random
+import statistics
+import time
+
+from absl import app
+from absl import flags
+
+from ap2.types.mandate import IntentMandate
+from roles.merchant_agent.sub_agents.product_catalog import Product
+from roles.merchant_agent.sub_agents.product_catalog import ProductCatalog
+
+_SIZES = flags.DEFINE_list(
+    "sizes", ["100000", "1000000"], "The catalog sizes to benchmark."
+)
+_QUERIES = flags.DEFINE_integer(
+    "queries", 200, "The number of searches per catalog."
+)
+_VECTOR_INDEX = flags.DEFINE_bool(
+    "vector_index", False, "Whether to also build the trigram vector index."
+)
+
+_ADJECTIVES = [
+    "compact", "deluxe", "ergonomic", "lightweight", "portable", "premium",
+    "rugged", "smart", "vintage", "wireless",
+]
+_COLORS = ["black", "blue", "green", "grey", "red", "silver", "white"]
+_NOUNS = [
+    "backpack", "blender", "coffee maker", "desk lamp", "headphones", "kettle",
+    "keyboard", "monitor", "running shoes", "sofa", "speaker", "tent",
+    "toaster", "umbrella", "watch",
+]
+_MERCHANTS = ["Generic Merchant", "Acme Goods", "Corner Shop"]
+
+
+def _make_products(count: int, rng: random.Random) -> list[Product]:
+  """Creates a synthetic catalog of products."""
+  return [
+      Product(
+          sku=f"SKU{i:08d}",
+          label=(
+              f"{rng.choice(_ADJECTIVES)} {rng.choice(_COLORS)}"
+              f" {rng.choice(_NOUNS)} {i % 997}"
+          ),
+          price=round(rng.uniform(5, 500), 2),
+          merchant=rng.choice(_MERCHANTS),
+          refund_period=rng.choice([0, 30]),
+      )
+      for i in range(count)
+  ]
+
+
+def _make_intents(count: int, rng: random.Random) -> list[IntentMandate]:
+  """Creates IntentMandates exercising the catalog's filters."""
+  intents = []
+  for _ in range(count):
+    description = f"a {rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)}"
+    if rng.random() < 0.5:
+      description = f"{rng.choice(_COLORS)} {description}"
+    intents.append(
+        IntentMandate(
+            natural_language_description=description,
+            merchants=[rng.choice(_MERCHANTS)] if rng.random() < 0.3 else None,
+            requires_refundability=rng.random() < 0.3,
+            intent_expiry="2099-01-01T00:00:00Z",
+        )
+    )
+  return intents
+
+
+def _benchmark(size: int) -> None:
+  rng = random.Random(size)
+  products = _make_products(size, rng)
+  intents = _make_intents(_QUERIES.value, rng)
+
+  start = time.perf_counter()
+  catalog = ProductCatalog(products, vector_index=_VECTOR_INDEX.value)
+  index_seconds = time.perf_counter() - start
+
+  latencies_ms = []
+  for intent in intents:
+    start = time.perf_counter()
+    catalog.search(intent, limit=3)
+    latencies_ms.append((time.perf_counter() - start) * 1000)
+  latencies_ms.sort()
+
+  print(
+      f"{size:>9,} SKUs: indexed in {index_seconds:6.2f}s, search"
+      f" p50 {statistics.median(latencies_ms):7.2f}ms"
+      f" p99 {latencies_ms[int(len(latencies_ms) * 0.99) - 1]:7.2f}ms"
+  )
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv  # Unused.
+  for size in _SIZES.value:
+    _benchmark(int(size))
+
+
+if __name__ == "__main__":
+  app.run(main)
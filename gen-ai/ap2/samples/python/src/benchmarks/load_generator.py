@@ -0,0 +1,318 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Drives concurrent purchases of the human-present card scenario.
+
+Each session plays the shopping agent's part of the journey, calling its
+tools directly instead of through the ADK web UI and a model:
+
+  find_products -> get_shipping_address -> update_cart -> get_payment_methods
+  -> get_payment_credential_token -> sign -> send_signed_payment_mandate
+  -> initiate_payment -> initiate_payment_with_otp
+
+The last hop only runs if the payment processor raises an OTP challenge,
+which it skips for low-risk payments.
+
+By default, the merchant, credentials provider and payment processor agents
+are started as local processes, answered by the deterministic fake Gemini of
+common/fake_gemini.py, so the results measure the agents rather than the
+model. --fake_gemini_latency adds a modelled delay to each of its answers.
+
+Sessions arrive at --arrival_rate per second (or back to back, if 0), with at
+most --concurrency running at once. The latency percentiles of each hop, and
+the errors, are reported at the end.
+
+With AP2_TRACE_EXPORTER set (see common/tracing.py), each purchase is traced
+across the agents, under a "purchase" span with a span per hop.
+
+Usage, from the samples/python/src directory:
+  python -m benchmarks.load_generator --sessions=50 --concurrency=8
+"""
+
+import asyncio
+import collections
+from collections.abc import Sequence
+import contextlib
+import dataclasses
+import os
+import random
+import sys
+import time
+import types
+
+from absl import app
+from absl import flags
+from absl import logging
+from a2a.types import TaskState
+
+from common import fake_gemini
+from common import tracing
+from common.process_supervisor import ProcessSupervisor
+from common.process_supervisor import RoleServer
+
+_SESSIONS = flags.DEFINE_integer(
+    "sessions", 20, "The number of purchases to make."
+)
+_CONCURRENCY = flags.DEFINE_integer(
+    "concurrency", 4, "The maximum number of sessions running at once."
+)
+_ARRIVAL_RATE = flags.DEFINE_float(
+    "arrival_rate",
+    0.0,
+    "Sessions started per second, with exponentially distributed gaps. If 0,"
+    " each session starts as soon as another one finishes.",
+)
+_START_SERVERS = flags.DEFINE_bool(
+    "start_servers",
+    True,
+    "Whether to start the role servers, rather than use running ones.",
+)
+_FAKE_GEMINI = flags.DEFINE_bool(
+    "fake_gemini",
+    True,
+    "Whether the started role servers use the fake Gemini instead of the"
+    " real one.",
+)
+_FAKE_GEMINI_PORT = flags.DEFINE_integer(
+    "fake_gemini_port", 8090, "The port of the fake Gemini."
+)
+_FAKE_GEMINI_LATENCY = flags.DEFINE_string(
+    "fake_gemini_latency",
+    None,
+    "The delay of the fake Gemini's answers, e.g. lognormal:400,0.5. See"
+    " common/fake_gemini.py.",
+)
+_FAKE_GEMINI_SCRIPT = flags.DEFINE_string(
+    "fake_gemini_script", None, "A JSON file of the fake Gemini's answers."
+)
+_STARTUP_TIMEOUT = flags.DEFINE_float(
+    "startup_timeout", 60.0, "Seconds to wait for the role servers to start."
+)
+_LOG_DIR = flags.DEFINE_string(
+    "server_log_dir", ".logs", "Where the started role servers write logs."
+)
+_SEED = flags.DEFINE_integer("seed", 0, "Seeds the session arrival times.")
+
+_USER_EMAIL = "bugsbunny@gmail.com"
+_PAYMENT_METHOD_ALIAS = "American Express ending in 4444"
+# The OTP the sample payment processor expects.
+_OTP = "123"
+
+# The role servers of the scenario.
+_ROLE_SERVERS = [
+    RoleServer(
+        "roles.merchant_agent",
+        "http://localhost:8001/a2a/merchant_agent",
+        "load_merchant_agent.log",
+    ),
+    RoleServer(
+        "roles.credentials_provider_agent",
+        "http://localhost:8002/a2a/credentials_provider",
+        "load_credentials_provider_agent.log",
+    ),
+    RoleServer(
+        "roles.merchant_payment_processor_agent",
+        "http://localhost:8003/a2a/merchant_payment_processor_agent",
+        "load_merchant_payment_processor_agent.log",
+    ),
+]
+
+
+@dataclasses.dataclass
+class _Stats:
+  """The latencies and errors of each hop."""
+
+  latencies: dict[str, list[float]] = dataclasses.field(
+      default_factory=lambda: collections.defaultdict(list)
+  )
+  errors: collections.Counter = dataclasses.field(
+      default_factory=collections.Counter
+  )
+  completed_sessions: int = 0
+  failed_sessions: int = 0
+
+  @contextlib.asynccontextmanager
+  async def hop(self, name: str):
+    """Times a hop, recording its error, if any, before re-raising it."""
+    start = time.perf_counter()
+    try:
+      with tracing.span(name):
+        yield
+    except Exception as e:
+      self.errors[(name, type(e).__name__)] += 1
+      raise
+    finally:
+      self.latencies[name].append(time.perf_counter() - start)
+
+  def report(self, wall_seconds: float) -> None:
+    print(
+        f"{self.completed_sessions} sessions completed, {self.failed_sessions}"
+        f" failed in {wall_seconds:.1f} s"
+        f" ({self.completed_sessions / wall_seconds:.2f} sessions/s)"
+    )
+    print(
+        f"  {'hop':<30} {'count':>6} {'p50 ms':>9} {'p90 ms':>9}"
+        f" {'p99 ms':>9} {'max ms':>9}"
+    )
+    for name, latencies in self.latencies.items():
+      print(
+          f"  {name:<30} {len(latencies):>6}"
+          + "".join(
+              f" {_percentile(latencies, p) * 1000:>9.1f}"
+              for p in (50, 90, 99, 100)
+          )
+      )
+    for (name, error), count in sorted(self.errors.items()):
+      print(f"  error: {name}: {error} x{count}")
+
+
+async def _run_session(index: int, stats: _Stats) -> None:
+  """Makes one purchase, as the shopping agent would."""
+  # Imported here, so that flags are parsed before the agents are configured.
+  # pylint: disable=g-import-not-at-top
+  from roles.shopping_agent import tools
+  from roles.shopping_agent.subagents.payment_method_collector import (
+      tools as payment_method_tools,
+  )
+  from roles.shopping_agent.subagents.shipping_address_collector import (
+      tools as shipping_address_tools,
+  )
+  from roles.shopping_agent.subagents.shopper import tools as shopper_tools
+  # pylint: enable=g-import-not-at-top
+
+  tool_context = types.SimpleNamespace(state={})
+  shopper_tools.create_intent_mandate(
+      natural_language_description=f"A pair of running shoes, order {index}",
+      user_cart_confirmation_required=True,
+      merchants=[],
+      skus=[],
+      requires_refundability=False,
+      tool_context=tool_context,
+  )
+  async with stats.hop("find_products"):
+    cart_mandates = await shopper_tools.find_products(tool_context)
+  shopper_tools.update_chosen_cart_mandate(
+      cart_mandates[0].contents.id, tool_context
+  )
+  async with stats.hop("get_shipping_address"):
+    shipping_address = await shipping_address_tools.get_shipping_address(
+        _USER_EMAIL, tool_context
+    )
+  async with stats.hop("update_cart"):
+    await tools.update_cart(shipping_address.model_dump(), tool_context)
+  async with stats.hop("get_payment_methods"):
+    await payment_method_tools.get_payment_methods(_USER_EMAIL, tool_context)
+  async with stats.hop("get_payment_credential_token"):
+    await payment_method_tools.get_payment_credential_token(
+        _USER_EMAIL, _PAYMENT_METHOD_ALIAS, tool_context
+    )
+  async with stats.hop("sign"):
+    tools.create_payment_mandate(
+        _PAYMENT_METHOD_ALIAS, _USER_EMAIL, tool_context
+    )
+    tools.sign_mandates_on_user_device(tool_context)
+  async with stats.hop("send_signed_payment_mandate"):
+    await tools.send_signed_payment_mandate_to_credentials_provider(
+        tool_context
+    )
+  async with stats.hop("initiate_payment"):
+    status = await tools.initiate_payment(tool_context)
+  if status.state == TaskState.completed:
+    # The payment was low-risk enough to skip the challenge.
+    return
+  if status.state != TaskState.input_required:
+    raise RuntimeError(f"Expected an OTP challenge, got {status.state}")
+  async with stats.hop("initiate_payment_with_otp"):
+    status = await tools.initiate_payment_with_otp(_OTP, tool_context)
+    if status.state != TaskState.completed:
+      raise RuntimeError(f"Expected the payment to complete: {status.state}")
+
+
+async def _drive(stats: _Stats) -> None:
+  """Runs the sessions at the configured arrival rate and concurrency."""
+  rng = random.Random(_SEED.value)
+  slots = asyncio.Semaphore(_CONCURRENCY.value)
+
+  async def session(index: int) -> None:
+    async with slots:
+      try:
+        with tracing.span("purchase", attributes={"ap2.session": index}):
+          await _run_session(index, stats)
+      except Exception:  # pylint: disable=broad-exception-caught
+        stats.failed_sessions += 1
+      else:
+        stats.completed_sessions += 1
+
+  sessions = []
+  for index in range(_SESSIONS.value):
+    if _ARRIVAL_RATE.value > 0 and index:
+      await asyncio.sleep(rng.expovariate(_ARRIVAL_RATE.value))
+    sessions.append(asyncio.create_task(session(index)))
+  await asyncio.gather(*sessions)
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv  # Unused.
+  # Logging every request would drown out the report, and slow the sessions.
+  logging.set_verbosity(logging.WARNING)
+  tracing.configure_if_enabled("load_generator")
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join(
+      [os.getcwd()] + [p for p in sys.path if p]
+  )
+  if _START_SERVERS.value and _FAKE_GEMINI.value:
+    # The role servers all share one fake, served by this process.
+    env["AP2_FAKE_GEMINI"] = fake_gemini.serve_in_background(
+        fake_gemini.create_app(
+            script=fake_gemini.load_script(_FAKE_GEMINI_SCRIPT.value)
+            if _FAKE_GEMINI_SCRIPT.value
+            else (),
+            latency=fake_gemini.parse_latency(
+                _FAKE_GEMINI_LATENCY.value, seed=_SEED.value
+            ),
+        ),
+        port=_FAKE_GEMINI_PORT.value,
+    )
+  asyncio.run(_run(env))
+
+
+async def _run(env: dict[str, str]) -> None:
+  async with contextlib.AsyncExitStack() as stack:
+    if _START_SERVERS.value:
+      await stack.enter_async_context(
+          ProcessSupervisor(
+              _ROLE_SERVERS,
+              log_dir=_LOG_DIR.value,
+              env=env,
+              startup_timeout_seconds=_STARTUP_TIMEOUT.value,
+          )
+      )
+    await _measure()
+
+
+async def _measure() -> None:
+  stats = _Stats()
+  start = time.perf_counter()
+  await _drive(stats)
+  stats.report(time.perf_counter() - start)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+  ordered = sorted(values)
+  index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+  return ordered[index]
+
+
+if __name__ == "__main__":
+  app.run(main)
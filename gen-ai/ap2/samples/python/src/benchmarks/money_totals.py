@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks maintaining the total of a PaymentRequest with many items.
+
+Compares summing the float values of all of the display items after each
+change, as the merchant agent used to, with the exact minor unit totals of
+ap2.types.money.
+
+Usage, from the samples/python/src directory:
+  python -m benchmarks.money_totals --item_count=5000
+"""
+
+from collections.abc import Sequence
+import timeit
+
+from absl import app
+from absl import flags
+
+from ap2.types import money
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentDetailsInit
+from ap2.types.payment_request import PaymentItem
+
+_ITEM_COUNT = flags.DEFINE_integer(
+    "item_count", 5000, "The number of display items in the cart."
+)
+_REPEATS = flags.DEFINE_integer(
+    "repeats", 20, "The number of times each operation is timed."
+)
+
+
+def _make_details(item_count: int) -> PaymentDetailsInit:
+  return PaymentDetailsInit(
+      id="order_1",
+      display_items=[
+          PaymentItem(
+              label=f"Item number {i}",
+              amount=PaymentCurrencyAmount(currency="USD", value=0.1 + i % 7),
+          )
+          for i in range(item_count)
+      ],
+      total=PaymentItem(
+          label="Total",
+          amount=PaymentCurrencyAmount(currency="USD", value=0.0),
+      ),
+  )
+
+
+def _shipping() -> PaymentItem:
+  return PaymentItem(
+      label="Shipping",
+      amount=PaymentCurrencyAmount(currency="USD", value=2.00),
+  )
+
+
+def _float_sum(details: PaymentDetailsInit) -> float:
+  return sum(item.amount.value for item in details.display_items)
+
+
+def _add_and_float_sum(details: PaymentDetailsInit) -> None:
+  details.display_items.append(_shipping())
+  details.total.amount.value = _float_sum(details)
+  details.display_items.pop()
+
+
+def _add_and_remove(details: PaymentDetailsInit) -> None:
+  details.add_display_items([_shipping()])
+  details.remove_display_item("Shipping")
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv  # Unused.
+  details = _make_details(_ITEM_COUNT.value)
+  values = [item.amount.value for item in details.display_items]
+  details.recompute_total()
+  print(
+      f"Total of {_ITEM_COUNT.value:,} items: float sum"
+      f" {_float_sum(details)!r}, exact {details.total.amount.value!r}"
+  )
+
+  operations = {
+      "float sum of all items": lambda: _float_sum(details),
+      "exact sum, one by one": lambda: sum(
+          money.to_minor_units(value, "USD") for value in values
+      ),
+      "exact sum, vectorized": lambda: money.sum_values(values, "USD"),
+      "add item, float sum": lambda: _add_and_float_sum(details),
+      "add and remove, running": lambda: _add_and_remove(details),
+  }
+  for name, operation in operations.items():
+    seconds = timeit.timeit(operation, number=_REPEATS.value) / _REPEATS.value
+    print(f"  {name:<26} {seconds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+  app.run(main)
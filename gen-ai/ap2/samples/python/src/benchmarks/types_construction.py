@@ -0,0 +1,122 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks reading, dumping and copying a large PaymentRequest.
+
+Compares pydantic models with the read-only views of ap2.types.trusted, for a
+PaymentRequest with many display items.
+
+Usage, from the samples/python/src directory:
+  python -m benchmarks.types_construction --item_count=1000
+"""
+
+from collections.abc import Sequence
+import timeit
+
+from absl import app
+from absl import flags
+
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentDetailsInit
+from ap2.types.payment_request import PaymentItem
+from ap2.types.payment_request import PaymentMethodData
+from ap2.types.payment_request import PaymentOptions
+from ap2.types.payment_request import PaymentRequest
+from ap2.types.trusted import TrustedView
+
+_ITEM_COUNT = flags.DEFINE_integer(
+    "item_count", 1000, "The number of display items in the PaymentRequest."
+)
+_REPEATS = flags.DEFINE_integer(
+    "repeats", 100, "The number of times each operation is timed."
+)
+
+
+def _make_payment_request(item_count: int) -> PaymentRequest:
+  items = [
+      PaymentItem(
+          label=f"Item number {i}",
+          amount=PaymentCurrencyAmount(currency="USD", value=9.99 + i),
+      )
+      for i in range(item_count)
+  ]
+  return PaymentRequest(
+      method_data=[
+          PaymentMethodData(
+              supported_methods="CARD",
+              data={"network": ["mastercard", "paypal", "amex"]},
+          )
+      ],
+      details=PaymentDetailsInit(
+          id="order_1",
+          display_items=items,
+          total=PaymentItem(
+              label="Total",
+              amount=PaymentCurrencyAmount(
+                  currency="USD",
+                  value=sum(item.amount.value for item in items),
+              ),
+          ),
+      ),
+      options=PaymentOptions(request_shipping=True),
+  )
+
+
+def _read_total(payment_request) -> float:
+  return payment_request.details.total.amount.value
+
+
+def _read_item_amounts(payment_request) -> float:
+  return sum(
+      item.amount.value for item in payment_request.details.display_items
+  )
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv  # Unused.
+  payment_request = _make_payment_request(_ITEM_COUNT.value)
+  data = payment_request.model_dump()
+  view = TrustedView(PaymentRequest, data)
+  assert _read_total(view) == _read_total(payment_request)
+  assert _read_item_amounts(view) == _read_item_amounts(payment_request)
+  assert view.to_model() == payment_request
+
+  operations = {
+      "validate, read total": lambda: _read_total(
+          PaymentRequest.model_validate(data)
+      ),
+      "view, read total": lambda: _read_total(
+          TrustedView(PaymentRequest, data)
+      ),
+      "validate, read all items": lambda: _read_item_amounts(
+          PaymentRequest.model_validate(data)
+      ),
+      "view, read all items": lambda: _read_item_amounts(
+          TrustedView(PaymentRequest, data)
+      ),
+      "model.model_dump()": payment_request.model_dump,
+      "view.to_data()": view.to_data,
+      "model.model_copy(deep=True)": (
+          lambda: payment_request.model_copy(deep=True)
+      ),
+      "view.to_model()": view.to_model,
+  }
+  print(f"PaymentRequest with {_ITEM_COUNT.value:,} display items:")
+  for name, operation in operations.items():
+    seconds = timeit.timeit(operation, number=_REPEATS.value) / _REPEATS.value
+    print(f"  {name:<28} {seconds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+  app.run(main)
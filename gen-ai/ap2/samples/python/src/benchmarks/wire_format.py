@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks the compact encoding of DataParts against JSON.
+
+For CartMandates with an increasing number of display items, reports the size
+of the DataPart on the wire, and the time taken to encode and decode it.
+
+Usage, from the samples/python/src directory:
+  python -m benchmarks.wire_format --item_counts=1,10,100,1000
+"""
+
+from collections.abc import Sequence
+import json
+import timeit
+
+from absl import app
+from absl import flags
+
+from ap2.types.mandate import CART_MANDATE_DATA_KEY
+from ap2.types.mandate import CartContents
+from ap2.types.mandate import CartMandate
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentDetailsInit
+from ap2.types.payment_request import PaymentItem
+from ap2.types.payment_request import PaymentMethodData
+from ap2.types.payment_request import PaymentOptions
+from ap2.types.payment_request import PaymentRequest
+from common import compact_encoding
+
+_ITEM_COUNTS = flags.DEFINE_list(
+    "item_counts",
+    ["1", "10", "100", "1000"],
+    "The numbers of display items in the benchmarked CartMandates.",
+)
+_REPEATS = flags.DEFINE_integer(
+    "repeats", 200, "The number of times each operation is timed."
+)
+
+
+def _make_data_part(item_count: int) -> dict:
+  """Returns the contents of a DataPart holding a CartMandate."""
+  items = [
+      PaymentItem(
+          label=f"Item number {i}",
+          amount=PaymentCurrencyAmount(currency="USD", value=9.99 + i),
+          refund_period=30,
+      )
+      for i in range(item_count)
+  ]
+  cart_mandate = CartMandate(
+      contents=CartContents(
+          id="cart_01JZ6V3QX5M0Q9D7K2X8R4T1AB",
+          user_cart_confirmation_required=True,
+          payment_request=PaymentRequest(
+              method_data=[
+                  PaymentMethodData(
+                      supported_methods="CARD",
+                      data={"network": ["mastercard", "paypal", "amex"]},
+                  )
+              ],
+              details=PaymentDetailsInit(
+                  id="order_01JZ6V3QX5M0Q9D7K2X8R4T1AB",
+                  display_items=items,
+                  total=PaymentItem(
+                      label="Total",
+                      amount=PaymentCurrencyAmount(
+                          currency="USD",
+                          value=sum(item.amount.value for item in items),
+                      ),
+                  ),
+              ),
+              options=PaymentOptions(request_shipping=True),
+          ),
+          cart_expiry="2025-09-01T12:30:00+00:00",
+          merchant_name="Generic Merchant",
+      ),
+      merchant_authorization="eyJhbGciOiJSUzI1NiIsImtpZIwMjQwOTA...",
+  )
+  return {CART_MANDATE_DATA_KEY: cart_mandate.model_dump()}
+
+
+def _time_us(fn) -> float:
+  """Returns the mean time taken by fn, in microseconds."""
+  return timeit.timeit(fn, number=_REPEATS.value) / _REPEATS.value * 1e6
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv  # Unused.
+  print(
+      f"{'items':>6} | {'JSON bytes':>10} {'compact':>10} {'ratio':>6} |"
+      f" {'JSON enc/dec us':>16} | {'compact enc/dec us':>19}"
+  )
+  for item_count in map(int, _ITEM_COUNTS.value):
+    data = _make_data_part(item_count)
+    json_text = json.dumps(data)
+    compact_data = compact_encoding.encode_data(data)
+    # The compact DataPart still travels inside the JSON-RPC envelope.
+    compact_text = json.dumps(compact_data)
+    assert compact_encoding.decode_data(json.loads(compact_text)) == data
+
+    json_encode = _time_us(lambda: json.dumps(data))
+    json_decode = _time_us(lambda: json.loads(json_text))
+    compact_encode = _time_us(
+        lambda: json.dumps(compact_encoding.encode_data(data))
+    )
+    compact_decode = _time_us(
+        lambda: compact_encoding.decode_data(json.loads(compact_text))
+    )
+    print(
+        f"{item_count:>6} | {len(json_text):>10,} {len(compact_text):>10,}"
+        f" {len(compact_text) / len(json_text):>6.2f} |"
+        f" {json_encode:>7.1f} / {json_decode:>6.1f} |"
+        f" {compact_encode:>8.1f} / {compact_decode:>8.1f}"
+    )
+
+
+if __name__ == "__main__":
+  app.run(main)
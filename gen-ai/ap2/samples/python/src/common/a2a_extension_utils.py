@@ -15,3 +15,9 @@
 """Utility class for storing A2A related objects."""
 
 EXTENSION_URI = "https://github.com/google-agentic-commerce/ap2/v1"
+
+# An opt-in extension for sending ap2.types payloads in a compact binary
+# encoding. See compact_encoding.py.
+COMPACT_ENCODING_EXTENSION_URI = (
+    "https://github.com/google-agentic-commerce/ap2/compact-encoding/v1"
+)
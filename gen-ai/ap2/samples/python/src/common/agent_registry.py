@@ -0,0 +1,329 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A registry of the trusted remote agents, by role.
+
+Each role (e.g. "merchant_agent") may be served by several replicas. The
+registry lists their base URLs and hands out a BalancedA2aClient per role,
+which sends each message to one of the replicas:
+
+  * A message continuing an A2A context goes to the replica that created the
+    context, which holds its state (e.g. carts, pending challenges).
+  * Otherwise, it goes to the healthy replica with the fewest requests in
+    flight.
+
+Replicas are health-checked in the background by fetching their AgentCards,
+and one that refuses a connection is marked unhealthy until its next
+successful probe.
+
+Roles default to the URLs registered by the agents themselves. The JSON file
+named by the AP2_AGENT_REGISTRY_PATH environment variable can override them,
+as a map of roles to lists of base URLs:
+
+  {"merchant_agent": ["http://localhost:8001/a2a/merchant_agent",
+                      "http://localhost:8101/a2a/merchant_agent"]}
+
+The file is reloaded whenever it changes, without a restart.
+"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from a2a import types as a2a_types
+from a2a.client.errors import A2AClientHTTPError
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+import httpx
+
+from common.payment_remote_a2a_client import PaymentRemoteA2aClient
+from common.payment_remote_a2a_client import get_shared_client
+from common.sharded_store import ShardedStore
+
+# How often replicas are health-checked.
+_PROBE_INTERVAL_SECONDS = float(
+    os.environ.get("AP2_AGENT_REGISTRY_PROBE_INTERVAL_SECONDS", "10")
+)
+_PROBE_TIMEOUT_SECONDS = 2.0
+# How often the config file is checked for changes.
+_RELOAD_INTERVAL_SECONDS = 2.0
+# How long a context stays bound to the replica that created it.
+_CONTEXT_AFFINITY_TTL_SECONDS = 2 * 60 * 60
+
+
+@dataclasses.dataclass
+class Endpoint:
+  """A replica of a role, and its current load and health."""
+
+  base_url: str
+  healthy: bool = True
+  outstanding_requests: int = 0
+
+
+class AgentRegistry:
+  """The replicas of each remote agent role."""
+
+  def __init__(self, config_path: str | None = None):
+    """Initialization.
+
+    Args:
+      config_path: The JSON file listing the replicas of each role, if any.
+    """
+    self._config_path = config_path
+    self._config_mtime: float | None = None
+    self._next_reload_check = 0.0
+    self._defaults: dict[str, list[str]] = {}
+    self._configured: dict[str, list[str]] = {}
+    self._endpoints: dict[str, list[Endpoint]] = {}
+    self._context_endpoints = ShardedStore[str](_CONTEXT_AFFINITY_TTL_SECONDS)
+    self._prober: asyncio.Task | None = None
+
+  def register_default(self, role: str, base_urls: list[str]) -> None:
+    """Sets the replicas of a role, unless the config file lists the role."""
+    self._defaults[role] = list(base_urls)
+    self._update_endpoints()
+
+  def endpoints(self, role: str) -> list[Endpoint]:
+    """Returns the replicas of a role."""
+    self._maybe_reload()
+    endpoints = self._endpoints.get(role)
+    if not endpoints:
+      raise KeyError(f"No remote agent is registered for role {role!r}")
+    return endpoints
+
+  def client(
+      self, role: str, required_extensions: set[str] | None = None
+  ) -> "BalancedA2aClient":
+    """Returns a client sending messages to the replicas of a role.
+
+    Args:
+      role: The role of the remote agent.
+      required_extensions: A set of extension URIs that the client requires.
+    """
+    return BalancedA2aClient(self, role, required_extensions)
+
+  def acquire(
+      self,
+      role: str,
+      context_id: str | None,
+      exclude: frozenset[str] = frozenset(),
+  ) -> Endpoint:
+    """Picks the replica for a request, and counts the request against it.
+
+    Args:
+      role: The role of the remote agent.
+      context_id: The A2A context the request continues, if any.
+      exclude: The base URLs of replicas not to pick, unless there is no other.
+
+    Returns:
+      The replica. The caller must `release` it once the request finishes.
+    """
+    self._ensure_prober()
+    endpoints = self.endpoints(role)
+    endpoint = None
+    if context_id:
+      base_url = self._context_endpoints.get(f"{role}/{context_id}")
+      endpoint = next(
+          (e for e in endpoints if e.base_url == base_url), None
+      )
+    if endpoint is None:
+      # If no replica is known to be healthy, try them all anyway, rather than
+      # failing on a possibly stale probe.
+      candidates = [e for e in endpoints if e.base_url not in exclude]
+      candidates = [e for e in candidates if e.healthy] or candidates
+      candidates = candidates or endpoints
+      endpoint = min(candidates, key=lambda e: e.outstanding_requests)
+    endpoint.outstanding_requests += 1
+    return endpoint
+
+  def release(
+      self, role: str, endpoint: Endpoint, context_id: str | None
+  ) -> None:
+    """Ends a request, binding its context to the replica that handled it."""
+    endpoint.outstanding_requests -= 1
+    if context_id:
+      self._context_endpoints.set(f"{role}/{context_id}", endpoint.base_url)
+
+  async def probe(self) -> None:
+    """Health-checks every replica by fetching its AgentCard."""
+    endpoints = [e for role in self._endpoints.values() for e in role]
+    async with httpx.AsyncClient(timeout=_PROBE_TIMEOUT_SECONDS) as client:
+      results = await asyncio.gather(
+          *(
+              client.get(e.base_url.rstrip("/") + AGENT_CARD_WELL_KNOWN_PATH)
+              for e in endpoints
+          ),
+          return_exceptions=True,
+      )
+    for endpoint, result in zip(endpoints, results):
+      healthy = (
+          isinstance(result, httpx.Response) and result.status_code == 200
+      )
+      if healthy != endpoint.healthy:
+        logging.info(
+            "Remote agent %s is now %s",
+            endpoint.base_url,
+            "healthy" if healthy else "unhealthy",
+        )
+      endpoint.healthy = healthy
+
+  def _ensure_prober(self) -> None:
+    """Starts the background health checks on the running event loop."""
+    if self._prober is None or self._prober.done():
+      self._prober = asyncio.get_running_loop().create_task(
+          self._probe_forever()
+      )
+
+  async def _probe_forever(self) -> None:
+    while True:
+      await asyncio.sleep(_PROBE_INTERVAL_SECONDS)
+      try:
+        self._maybe_reload()
+        await self.probe()
+      except Exception:  # pylint: disable=broad-exception-caught
+        logging.exception("Failed to probe the remote agents")
+
+  def _maybe_reload(self) -> None:
+    """Reloads the config file if it changed since it was last read."""
+    if not self._config_path or time.monotonic() < self._next_reload_check:
+      return
+    self._next_reload_check = time.monotonic() + _RELOAD_INTERVAL_SECONDS
+    try:
+      mtime = os.stat(self._config_path).st_mtime
+    except FileNotFoundError:
+      mtime = None
+    if mtime == self._config_mtime:
+      return
+    try:
+      configured = _load_config(self._config_path) if mtime else {}
+    except (OSError, ValueError) as e:
+      # Keep the last good config, e.g. while the file is being rewritten.
+      logging.warning("Failed to load %s: %s", self._config_path, e)
+      return
+    self._config_mtime = mtime
+    self._configured = configured
+    self._update_endpoints()
+    logging.info("Loaded the remote agent registry from %s", self._config_path)
+
+  def _update_endpoints(self) -> None:
+    """Rebuilds the replicas, keeping the state of the ones still listed."""
+    existing = {
+        (role, e.base_url): e
+        for role, endpoints in self._endpoints.items()
+        for e in endpoints
+    }
+    self._endpoints = {
+        role: [
+            existing.get((role, base_url)) or Endpoint(base_url)
+            for base_url in base_urls
+        ]
+        for role, base_urls in (self._defaults | self._configured).items()
+    }
+
+
+class BalancedA2aClient:
+  """Sends messages to the replicas of a role, like a PaymentRemoteA2aClient."""
+
+  def __init__(
+      self,
+      registry: AgentRegistry,
+      role: str,
+      required_extensions: set[str] | None = None,
+  ):
+    self._registry = registry
+    self._role = role
+    self._required_extensions = required_extensions
+
+  async def get_agent_card(self) -> a2a_types.AgentCard:
+    """Returns the AgentCard of the least loaded replica."""
+    endpoint = self._registry.acquire(self._role, None)
+    try:
+      return await self._client(endpoint).get_agent_card()
+    finally:
+      self._registry.release(self._role, endpoint, None)
+
+  async def send_a2a_message(
+      self, message: a2a_types.Message
+  ) -> a2a_types.Task:
+    """Sends the message to a replica, and returns the resulting task.
+
+    A message that does not continue a context is retried on another replica
+    if the first one refuses the connection, since it never received it.
+    """
+    attempts = 1 if message.context_id else len(
+        self._registry.endpoints(self._role)
+    )
+    tried = frozenset()
+    for attempt in range(attempts):
+      endpoint = self._registry.acquire(
+          self._role, message.context_id, exclude=tried
+      )
+      tried |= {endpoint.base_url}
+      context_id = None
+      try:
+        task = await self._client(endpoint).send_a2a_message(message)
+        context_id = task.context_id
+        return task
+      except (httpx.ConnectError, A2AClientHTTPError) as e:
+        if not _is_connect_error(e):
+          raise
+        endpoint.healthy = False
+        if attempt == attempts - 1:
+          raise
+        logging.warning(
+            "Remote agent %s is unreachable, trying another replica",
+            endpoint.base_url,
+        )
+      finally:
+        self._registry.release(self._role, endpoint, context_id)
+
+  def _client(self, endpoint: Endpoint) -> PaymentRemoteA2aClient:
+    return get_shared_client(
+        name=self._role,
+        base_url=endpoint.base_url,
+        required_extensions=self._required_extensions,
+    )
+
+
+def get_registry() -> AgentRegistry:
+  """Returns the AgentRegistry shared by every caller in the process."""
+  global _registry
+  if _registry is None:
+    _registry = AgentRegistry(os.environ.get("AP2_AGENT_REGISTRY_PATH"))
+  return _registry
+
+
+def _is_connect_error(error: Exception) -> bool:
+  """Returns True if the error is a refused connection, maybe wrapped by A2A."""
+  return isinstance(error, httpx.ConnectError) or isinstance(
+      error.__cause__, httpx.ConnectError
+  )
+
+
+def _load_config(path: str) -> dict[str, list[str]]:
+  """Reads the replicas of each role from a JSON file."""
+  with open(path, "r", encoding="utf-8") as f:
+    config: Any = json.load(f)
+  if not isinstance(config, dict) or not all(
+      isinstance(urls, list) and all(isinstance(url, str) for url in urls)
+      for urls in config.values()
+  ):
+    raise ValueError("Expected a map of roles to lists of base URLs.")
+  return config
+
+
+_registry: AgentRegistry | None = None
@@ -14,6 +14,7 @@
 
 """Helper functions for working with A2A Artifact objects."""
 
+from collections.abc import Iterator
 from typing import Any, TypeVar
 
 from a2a.types import Artifact
@@ -21,6 +22,47 @@ from a2a.utils import message as message_utils
 from pydantic import BaseModel
 
 T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+_NOT_FOUND = object()
+
+
+def iter_data_parts(
+    artifacts: list[Artifact] | None,
+) -> Iterator[dict[str, Any]]:
+  """Yields the contents of each DataPart in the artifacts, in order.
+
+  Args:
+    artifacts: The artifacts to be searched.
+
+  Yields:
+    The data contents of each DataPart.
+  """
+  for artifact in artifacts or []:
+    for part in artifact.parts:
+      if hasattr(part.root, "data"):
+        yield part.root.data
+
+
+def iter_canonical_objects(
+    artifacts: list[Artifact] | None, data_key: str, model: type[M]
+) -> Iterator[M]:
+  """Yields the canonical objects of the given type in the artifacts.
+
+  Each object is validated only when it is reached, so a caller that stops
+  early does not pay for validating the rest.
+
+  Args:
+    artifacts: The artifacts to be searched.
+    data_key: The key of the DataPart to search for.
+    model: The model of the canonical object to search for.
+
+  Yields:
+    The canonical objects of the given type, in order.
+  """
+  for data in iter_data_parts(artifacts):
+    if data_key in data:
+      yield model.model_validate(data[data_key])
 
 
 def find_canonical_objects(
@@ -36,15 +78,56 @@ def find_canonical_objects(
   Returns:
     A list of canonical objects of the given type in the artifacts.
   """
-  if artifacts is None:
-    return []
+  return list(iter_canonical_objects(artifacts, data_key, model))
 
-  canonical_objects = []
-  for artifact in artifacts:
-    for part in artifact.parts:
-      if hasattr(part.root, "data") and data_key in part.root.data:
-        canonical_objects.append(model.model_validate(part.root.data[data_key]))
-  return canonical_objects
+
+def first_canonical_object(
+    artifacts: list[Artifact] | None, data_key: str, model: type[M]
+) -> M | None:
+  """Returns the first canonical object of the given type, or None.
+
+  Only the first matching DataPart is validated.
+
+  Args:
+    artifacts: The artifacts to be searched.
+    data_key: The key of the DataPart to search for.
+    model: The model of the canonical object to search for.
+  """
+  return next(iter_canonical_objects(artifacts, data_key, model), None)
+
+
+def only_canonical_object(
+    artifacts: list[Artifact] | None,
+    data_key: str,
+    model: type[M],
+    required: bool = True,
+) -> M | None:
+  """Returns the only canonical object of the given type in the artifacts.
+
+  Only the matching DataPart is validated; the search stops as soon as a
+  second one is found.
+
+  Args:
+    artifacts: The artifacts to be searched.
+    data_key: The key of the DataPart to search for.
+    model: The model of the canonical object to search for.
+    required: Whether a missing object is an error. If False, None is returned
+      instead.
+
+  Raises:
+    ValueError: if there is more than one object, or none when required.
+  """
+  matches = (
+      data[data_key] for data in iter_data_parts(artifacts) if data_key in data
+  )
+  found = next(matches, _NOT_FOUND)
+  if found is _NOT_FOUND:
+    if required:
+      raise ValueError(f"No {data_key} found.")
+    return None
+  if next(matches, _NOT_FOUND) is not _NOT_FOUND:
+    raise ValueError(f"More than one {data_key} found.")
+  return model.model_validate(found)
 
 
 def get_first_data_part(artifacts: list[Artifact]) -> dict[str, Any]:
@@ -56,22 +139,9 @@ def get_first_data_part(artifacts: list[Artifact]) -> dict[str, Any]:
   Returns:
     The data contents within the first found DataPart.
   """
-  if artifacts is None:
-    return {}
-
-  # Extract data parts manually since message_utils.get_data_parts doesn't exist
-  data_parts = [
-      [part.root.data for part in artifact.parts if hasattr(part.root, "data")]
-      for artifact in artifacts
-  ]
-  # Original
-  # data_parts = [
-  #     message_utils.get_data_parts(artifact.parts) for artifact in artifacts
-  # ]
-  for data_part in data_parts:
-    for item in data_part:
-      return item
-  return {}
+  # Extract data parts manually since message_utils.get_data_parts doesn't
+  # exist. Only the first one is needed, so the rest are never visited.
+  return next(iter_data_parts(artifacts), {})
 
 
 def only(list_: list[T]) -> T:
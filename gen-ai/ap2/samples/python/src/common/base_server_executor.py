@@ -21,6 +21,13 @@ activates any requested extensions that the agent supports.
 use for a given request, and invoking it to complete the task.
 3. It logs key events in the Agent Payments Protocol to the watch log. See
 watch_log.py for more details.
+4. If the client negotiates the compact encoding extension, it decodes the
+request's ap2.types payloads and encodes those of its artifacts. See
+compact_encoding.py for more details.
+5. It records the latency of choosing a tool, and of each tool, in the
+process's metrics. See metrics.py for more details.
+6. It continues the trace of the sender of the request, with spans around
+choosing and running the tool. See tracing.py for more details.
 """
 
 import abc
@@ -38,15 +45,32 @@ from a2a.types import TextPart
 from a2a.utils import message
 from ap2.types.mandate import PAYMENT_MANDATE_DATA_KEY
 from google import genai
+from opentelemetry.trace import SpanKind
 from ap2.types.mandate import PaymentMandate
+from common import compact_encoding
 from common import message_utils
+from common import metrics
+from common import tracing
 from common import watch_log
+from common.a2a_extension_utils import COMPACT_ENCODING_EXTENSION_URI
 from common.a2a_extension_utils import EXTENSION_URI
 from common.function_call_resolver import FunctionCallResolver
 from common.validation import validate_payment_mandate_signature
 
 DataPartContent = dict[str, Any]
-Tool = Callable[[list[DataPartContent], TaskUpdater, Task | None], Any]
+# Tools receive the request's data parts as a message_utils.DataParts, which is
+# a Sequence[DataPartContent] indexed by key.
+Tool = Callable[[message_utils.DataParts, TaskUpdater, Task | None], Any]
+
+_ROUTING_LATENCY = metrics.histogram(
+    "ap2_tool_routing_latency_seconds",
+    "Latency of asking the LLM which tool handles a request.",
+)
+_TOOL_LATENCY = metrics.histogram(
+    "ap2_tool_latency_seconds",
+    "Latency of handling a request, by tool.",
+    ("tool",),
+)
 
 class BaseServerExecutor(AgentExecutor, abc.ABC):
   """A baseline A2A AgentExecutor to be utilized by agents."""
@@ -84,13 +108,28 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
       context: The request context containing the message, task ID, etc.
       event_queue: The queue to publish events to.
     """
+    with tracing.span(
+        "handle_message",
+        kind=SpanKind.SERVER,
+        parent=tracing.extract(context.message),
+        attributes={
+            "a2a.context_id": context.context_id or "",
+            "a2a.task_id": context.task_id or "",
+        },
+    ):
+      await self._execute(context, event_queue)
+
+  async def _execute(
+      self, context: RequestContext, event_queue: EventQueue
+  ) -> None:
+    """Executes a request, in the span of handling it."""
     watch_log.log_a2a_request_extensions(context)
 
+    self._handle_extensions(context)
+
     text_parts, data_parts = self._parse_request(context)
     watch_log.log_a2a_message_parts(text_parts, data_parts)
 
-    self._handle_extensions(context)
-
     if EXTENSION_URI in context.call_context.activated_extensions:
       payment_mandate = message_utils.find_data_part(
           PAYMENT_MANDATE_DATA_KEY, data_parts
@@ -105,16 +144,22 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
           f" {context.call_context.activated_extensions}"
       )
 
-    updater = TaskUpdater(
+    updater_class = (
+        compact_encoding.CompactTaskUpdater
+        if self._uses_compact_encoding(context)
+        else TaskUpdater
+    )
+    updater = updater_class(
         event_queue,
         task_id=context.task_id or str(uuid.uuid4()),
         context_id=context.context_id or str(uuid.uuid4()),
     )
 
     logging.info(
-        "Server working on (context_id, task_id): (%s, %s)",
+        "Server working on (context_id, task_id, trace_id): (%s, %s, %s)",
         updater.context_id,
         updater.task_id,
+        tracing.current_trace_id(),
     )
     await self._handle_request(
         text_parts,
@@ -130,7 +175,7 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
   async def _handle_request(
       self,
       text_parts: list[str],
-      data_parts: list[dict[str, Any]],
+      data_parts: message_utils.DataParts,
       updater: TaskUpdater,
       current_task: Task | None,
   ) -> None:
@@ -144,7 +189,8 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
     """
     try:
       prompt = (text_parts[0] if text_parts else "").strip()
-      tool_name = self._tool_resolver.determine_tool_to_use(prompt)
+      with tracing.span("resolve_tool"), _ROUTING_LATENCY.time():
+        tool_name = self._tool_resolver.determine_tool_to_use(prompt)
       logging.info("Using tool: %s", tool_name)
 
       matching_tools = list(
@@ -155,7 +201,13 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
             f"Expected 1 tool matching {tool_name}, got {len(matching_tools)}"
         )
       callable_tool = matching_tools[0]
-      await callable_tool(data_parts, updater, current_task)
+      with (
+          tracing.span(
+              f"execute_tool {tool_name}", attributes={"ap2.tool": tool_name}
+          ),
+          _TOOL_LATENCY.labels(tool_name).time(),
+      ):
+        await callable_tool(data_parts, updater, current_task)
 
     except Exception as e:  # pylint: disable=broad-exception-caught
       error_message = updater.new_agent_message(
@@ -165,19 +217,24 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
 
   def _parse_request(
       self, context: RequestContext
-  ) -> Tuple[list[str], list[dict[str, Any]]]:
+  ) -> Tuple[list[str], message_utils.DataParts]:
     """Parses the request and returns the text and data parts.
 
     Args:
       context: The A2A RequestContext
 
     Returns:
-      A tuple containing the contents of TextPart and DataPart objects.
+      A tuple containing the contents of TextPart objects, and the contents of
+      DataPart objects indexed by key.
     """
     parts = context.message.parts if context.message else []
+    if self._uses_compact_encoding(context):
+      parts = compact_encoding.decode_parts(parts)
     text_parts = message.get_text_parts(parts)
     # Extract data parts manually since get_data_parts doesn't exist
-    data_parts = [part.root.data for part in parts if hasattr(part.root, "data")]
+    data_parts = message_utils.DataParts(
+        part.root.data for part in parts if hasattr(part.root, "data")
+    )
     # Original
     # data_parts = message.get_data_parts(parts)
     return text_parts, data_parts
@@ -192,3 +249,10 @@ class BaseServerExecutor(AgentExecutor, abc.ABC):
     activated_uris = requested_uris.intersection(self._supported_extension_uris)
     for uri in activated_uris:
       context.add_activated_extension(uri)
+
+  def _uses_compact_encoding(self, context: RequestContext) -> bool:
+    """Returns True if the compact encoding extension is activated."""
+    return (
+        COMPACT_ENCODING_EXTENSION_URI
+        in context.call_context.activated_extensions
+    )
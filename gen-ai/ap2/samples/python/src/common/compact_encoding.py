@@ -0,0 +1,320 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A compact binary encoding of ap2.types payloads in A2A DataParts.
+
+Mandates normally travel as the JSON of their `model_dump()`, in which every
+field name is repeated in every object. With this encoding, each object is
+instead a msgpack array of its field values, in the order the fields are
+declared by its pydantic model, so the field names are never sent:
+
+  * A nested model is encoded the same way.
+  * A list of models is an array of encoded models.
+  * A union of models is a pair of the index of the member in the union and
+    the encoded member.
+  * Any other value (e.g. a `Dict[str, Any]`) is sent as is.
+
+The schema of each model is fingerprinted, so that agents using different
+versions of ap2.types fail loudly rather than mix up fields.
+
+An encoded value replaces the original under the same data key, as
+`{"ap2.compact": "<base64 of the msgpack bytes>"}`. Values that cannot be
+encoded losslessly, e.g. a subclass with extra fields, are left as JSON.
+
+Agents opt in by negotiating COMPACT_ENCODING_EXTENSION_URI, and the encoding
+requires msgpack, from the samples' `compact` extra.
+"""
+
+import base64
+from collections.abc import Sequence
+import dataclasses
+import functools
+import inspect
+import os
+import types
+import typing
+from typing import Any
+import zlib
+
+from a2a.server.tasks.task_updater import TaskUpdater
+from a2a.types import DataPart
+from a2a.types import Part
+from ap2.types.contact_picker import CONTACT_ADDRESS_DATA_KEY
+from ap2.types.contact_picker import ContactAddress
+from ap2.types.mandate import CART_MANDATE_DATA_KEY
+from ap2.types.mandate import CartMandate
+from ap2.types.mandate import INTENT_MANDATE_DATA_KEY
+from ap2.types.mandate import IntentMandate
+from ap2.types.mandate import PAYMENT_MANDATE_DATA_KEY
+from ap2.types.mandate import PaymentMandate
+from ap2.types.payment_receipt import PAYMENT_RECEIPT_DATA_KEY
+from ap2.types.payment_receipt import PaymentReceipt
+from ap2.types.payment_request import PAYMENT_METHOD_DATA_DATA_KEY
+from ap2.types.payment_request import PaymentMethodData
+from pydantic import BaseModel
+
+# Whether clients request the compact encoding from agents that support it.
+ENABLED_BY_DEFAULT = os.environ.get("AP2_COMPACT_ENCODING", "").lower() in (
+    "1",
+    "true",
+)
+
+COMPACT_VALUE_KEY = "ap2.compact"
+
+# The models of the DataPart values that are encoded, by data key.
+MODELS_BY_DATA_KEY: dict[str, type[BaseModel]] = {
+    CART_MANDATE_DATA_KEY: CartMandate,
+    INTENT_MANDATE_DATA_KEY: IntentMandate,
+    PAYMENT_MANDATE_DATA_KEY: PaymentMandate,
+    PAYMENT_RECEIPT_DATA_KEY: PaymentReceipt,
+    CONTACT_ADDRESS_DATA_KEY: ContactAddress,
+    PAYMENT_METHOD_DATA_DATA_KEY: PaymentMethodData,
+}
+
+
+class _NotEncodable(Exception):
+  """Raised when a value does not match its model's schema exactly."""
+
+
+def is_available() -> bool:
+  """Returns True if msgpack is installed."""
+  try:
+    _msgpack()
+  except ImportError:
+    return False
+  return True
+
+
+def encode(model: type[BaseModel], data: dict[str, Any]) -> bytes:
+  """Encodes the `model_dump()` of a model.
+
+  Args:
+    model: The pydantic model of the data.
+    data: The data, with exactly the fields of the model.
+
+  Returns:
+    The encoded data.
+
+  Raises:
+    ValueError: If the data cannot be encoded losslessly.
+  """
+  codec = _codec(model)
+  try:
+    return _msgpack().packb([codec.fingerprint, codec.encode(data)])
+  except (_NotEncodable, TypeError) as e:
+    raise ValueError(f"Cannot encode {model.__name__}: {e}") from e
+
+
+def decode(model: type[BaseModel], payload: bytes) -> dict[str, Any]:
+  """Decodes data encoded by `encode`.
+
+  Args:
+    model: The pydantic model of the data.
+    payload: The encoded data.
+
+  Returns:
+    The data, as it was before it was encoded.
+
+  Raises:
+    ValueError: If the payload was encoded with a different model schema.
+  """
+  codec = _codec(model)
+  fingerprint, values = _msgpack().unpackb(payload)
+  if fingerprint != codec.fingerprint:
+    raise ValueError(
+        f"The {model.__name__} payload was encoded with a different schema."
+    )
+  return codec.decode(values)
+
+
+def encode_data(data: dict[str, Any]) -> dict[str, Any]:
+  """Returns the contents of a DataPart with its ap2.types values encoded."""
+  encoded_data = dict(data)
+  for data_key, model in MODELS_BY_DATA_KEY.items():
+    value = data.get(data_key)
+    if not isinstance(value, dict):
+      continue
+    try:
+      payload = encode(model, value)
+    except ValueError:
+      continue
+    encoded_data[data_key] = {
+        COMPACT_VALUE_KEY: base64.b64encode(payload).decode("ascii")
+    }
+  return encoded_data
+
+
+def decode_data(data: dict[str, Any]) -> dict[str, Any]:
+  """Returns the contents of a DataPart with its encoded values decoded."""
+  decoded_data = dict(data)
+  for data_key, model in MODELS_BY_DATA_KEY.items():
+    value = data.get(data_key)
+    if isinstance(value, dict) and value.keys() == {COMPACT_VALUE_KEY}:
+      decoded_data[data_key] = decode(
+          model, base64.b64decode(value[COMPACT_VALUE_KEY])
+      )
+  return decoded_data
+
+
+def encode_parts(parts: Sequence[Part]) -> list[Part]:
+  """Returns the parts with the ap2.types values of their DataParts encoded."""
+  return [_map_data(part, encode_data) for part in parts]
+
+
+def decode_parts(parts: Sequence[Part]) -> list[Part]:
+  """Returns the parts with the encoded values of their DataParts decoded."""
+  return [_map_data(part, decode_data) for part in parts]
+
+
+class CompactTaskUpdater(TaskUpdater):
+  """A TaskUpdater that sends artifacts in the compact encoding."""
+
+  async def add_artifact(self, parts: list[Part], *args, **kwargs) -> None:
+    await super().add_artifact(encode_parts(parts), *args, **kwargs)
+
+
+def _map_data(part: Part, map_fn) -> Part:
+  if not isinstance(part.root, DataPart):
+    return part
+  data = map_fn(part.root.data)
+  return Part(root=part.root.model_copy(update={"data": data}))
+
+
+_RAW = "raw"  # The kind of a field value that is sent as is.
+
+
+@dataclasses.dataclass(frozen=True)
+class _ModelCodec:
+  """Encodes and decodes the fields of one model, in declaration order."""
+
+  field_names: tuple[str, ...]
+  field_kinds: tuple[Any, ...]
+  fingerprint: int
+  field_set: frozenset[str] = dataclasses.field(init=False)
+
+  def __post_init__(self):
+    object.__setattr__(self, "field_set", frozenset(self.field_names))
+
+  def encode(self, data: Any) -> list[Any]:
+    if not isinstance(data, dict) or data.keys() != self.field_set:
+      raise _NotEncodable("fields do not match the model")
+    return [
+        _encode_value(data[name], kind)
+        for name, kind in zip(self.field_names, self.field_kinds)
+    ]
+
+  def decode(self, values: list[Any]) -> dict[str, Any]:
+    if len(values) != len(self.field_names):
+      raise ValueError("The payload does not match the model's fields.")
+    return {
+        name: _decode_value(value, kind)
+        for name, value, kind in zip(
+            self.field_names, values, self.field_kinds
+        )
+    }
+
+
+# A field kind is _RAW, or a tuple of ("model", codec), ("list", codec) or
+# ("union", (codec, ...)).
+def _encode_value(value: Any, kind: Any) -> Any:
+  if value is None or kind is _RAW:
+    return value
+  tag, codec = kind
+  if tag == "model":
+    return codec.encode(value)
+  if tag == "list":
+    if not isinstance(value, list):
+      raise _NotEncodable("expected a list")
+    return [codec.encode(item) for item in value]
+  # A union: the member is identified by its field names, which are all that
+  # a model_dump() keeps.
+  if isinstance(value, dict):
+    for index, member in enumerate(codec):
+      if value.keys() == member.field_set:
+        return [index, member.encode(value)]
+  raise _NotEncodable("no union member matches the value")
+
+
+def _decode_value(value: Any, kind: Any) -> Any:
+  if value is None or kind is _RAW:
+    return value
+  tag, codec = kind
+  if tag == "model":
+    return codec.decode(value)
+  if tag == "list":
+    return [codec.decode(item) for item in value]
+  index, member_value = value
+  return codec[index].decode(member_value)
+
+
+@functools.cache
+def _codec(model: type[BaseModel]) -> _ModelCodec:
+  """Returns the codec of a model, derived from its fields."""
+  field_names = tuple(model.model_fields)
+  field_kinds = tuple(
+      _field_kind(field.annotation) for field in model.model_fields.values()
+  )
+  schema = ",".join(
+      f"{name}:{_kind_schema(kind)}"
+      for name, kind in zip(field_names, field_kinds)
+  )
+  return _ModelCodec(
+      field_names=field_names,
+      field_kinds=field_kinds,
+      fingerprint=zlib.crc32(f"{model.__name__}({schema})".encode("utf-8")),
+  )
+
+
+def _field_kind(annotation: Any) -> Any:
+  """Returns how a field with the given type annotation is encoded."""
+  origin = typing.get_origin(annotation)
+  if origin in (typing.Union, types.UnionType):
+    members = [
+        arg for arg in typing.get_args(annotation) if arg is not type(None)
+    ]
+    if len(members) == 1:
+      return _field_kind(members[0])
+    if all(_is_model(member) for member in members):
+      return ("union", tuple(_codec(member) for member in members))
+    return _RAW
+  if origin is list:
+    (item_type,) = typing.get_args(annotation)
+    return ("list", _codec(item_type)) if _is_model(item_type) else _RAW
+  if _is_model(annotation):
+    return ("model", _codec(annotation))
+  return _RAW
+
+
+def _kind_schema(kind: Any) -> str:
+  if kind is _RAW:
+    return "*"
+  tag, codec = kind
+  if tag == "union":
+    return "|".join(str(member.fingerprint) for member in codec)
+  return f"{tag}{codec.fingerprint}"
+
+
+def _is_model(annotation: Any) -> bool:
+  return inspect.isclass(annotation) and issubclass(annotation, BaseModel)
+
+
+def _msgpack():
+  """Returns the msgpack module."""
+  try:
+    import msgpack  # pylint: disable=g-import-not-at-top
+  except ImportError as e:
+    raise ImportError(
+        "The compact encoding requires msgpack: pip install msgpack"
+    ) from e
+  return msgpack
@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for compact_encoding."""
+
+import json
+import unittest
+
+from absl.testing import absltest
+from a2a.types import DataPart
+from a2a.types import Part
+from a2a.types import TextPart
+
+from ap2.types.mandate import CART_MANDATE_DATA_KEY
+from ap2.types.mandate import CartContents
+from ap2.types.mandate import CartMandate
+from ap2.types.mandate import IntentMandate
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentDetailsInit
+from ap2.types.payment_request import PaymentItem
+from ap2.types.payment_request import PaymentMethodData
+from ap2.types.payment_request import PaymentRequest
+from common import compact_encoding
+
+
+def _cart_mandate() -> CartMandate:
+  items = [
+      PaymentItem(
+          label=f"Item {i}",
+          amount=PaymentCurrencyAmount(currency="USD", value=1.25 * i),
+      )
+      for i in range(3)
+  ]
+  return CartMandate(
+      contents=CartContents(
+          id="cart_1",
+          user_cart_confirmation_required=True,
+          payment_request=PaymentRequest(
+              method_data=[
+                  PaymentMethodData(
+                      supported_methods="CARD",
+                      data={"network": ["visa"], "nested": {"a": [1, None]}},
+                  )
+              ],
+              details=PaymentDetailsInit(
+                  id="order_1",
+                  display_items=items,
+                  total=PaymentItem(
+                      label="Total",
+                      amount=PaymentCurrencyAmount(currency="USD", value=3.75),
+                  ),
+              ),
+          ),
+          cart_expiry="2025-09-01T00:30:00Z",
+          merchant_name="Generic Merchant",
+      ),
+      merchant_authorization="eyJhbGciOiJSUzI1NiJ9...",
+  )
+
+
+@unittest.skipUnless(
+    compact_encoding.is_available(), "The compact encoding requires msgpack."
+)
+class CompactEncodingTest(absltest.TestCase):
+
+  def test_decode_returns_the_encoded_data(self):
+    data = _cart_mandate().model_dump()
+
+    payload = compact_encoding.encode(CartMandate, data)
+
+    self.assertEqual(compact_encoding.decode(CartMandate, payload), data)
+
+  def test_encoding_is_smaller_than_json(self):
+    data = _cart_mandate().model_dump()
+
+    payload = compact_encoding.encode(CartMandate, data)
+
+    self.assertLess(len(payload), len(json.dumps(data)))
+
+  def test_encode_rejects_data_with_fields_outside_the_model(self):
+    data = _cart_mandate().model_dump()
+    data["contents"]["extra"] = "value"
+
+    with self.assertRaises(ValueError):
+      compact_encoding.encode(CartMandate, data)
+
+  def test_decode_rejects_a_payload_of_another_model(self):
+    intent_mandate = IntentMandate(
+        natural_language_description="Red shoes",
+        intent_expiry="2025-09-02T00:00:00Z",
+    )
+    payload = compact_encoding.encode(
+        IntentMandate, intent_mandate.model_dump()
+    )
+
+    with self.assertRaises(ValueError):
+      compact_encoding.decode(CartMandate, payload)
+
+  def test_encode_data_replaces_only_the_mandates(self):
+    data = {
+        CART_MANDATE_DATA_KEY: _cart_mandate().model_dump(),
+        "risk_data": "fake_risk_data",
+    }
+
+    encoded = compact_encoding.encode_data(data)
+
+    self.assertEqual(
+        encoded[CART_MANDATE_DATA_KEY].keys(),
+        {compact_encoding.COMPACT_VALUE_KEY},
+    )
+    self.assertEqual(encoded["risk_data"], "fake_risk_data")
+    self.assertEqual(compact_encoding.decode_data(encoded), data)
+
+  def test_encode_data_leaves_values_it_cannot_encode_as_json(self):
+    cart_mandate = _cart_mandate().model_dump()
+    cart_mandate["extra"] = "value"
+    data = {CART_MANDATE_DATA_KEY: cart_mandate}
+
+    self.assertEqual(compact_encoding.encode_data(data), data)
+
+  def test_parts_round_trip(self):
+    parts = [
+        Part(root=TextPart(text="Here is your cart")),
+        Part(
+            root=DataPart(
+                data={CART_MANDATE_DATA_KEY: _cart_mandate().model_dump()}
+            )
+        ),
+    ]
+
+    decoded = compact_encoding.decode_parts(
+        compact_encoding.encode_parts(parts)
+    )
+
+    self.assertEqual(decoded, parts)
+
+
+if __name__ == "__main__":
+  absltest.main()
@@ -0,0 +1,488 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A deterministic, local stand-in for the Gemini API.
+
+Benchmarks cannot depend on a live model: it is slow, rate limited, and gives
+different answers each time. This server answers the generateContent and
+streamGenerateContent calls the agents make, with the same answer for the
+same request:
+
+  * A request matching a rule of the script gets the rule's answer.
+  * A request continuing after a function response gets a short text, which
+    ends the agent's turn.
+  * If the request declares functions, it calls the function whose name and
+    description best match the words of the prompt, e.g. "Update the cart with
+    the user's shipping address." calls `update_cart`, with arguments generated
+    from its parameter schema.
+  * If the request asks for JSON, it gets a value of the response schema,
+    seeded by the prompt.
+  * Otherwise, it gets a short text.
+
+The script is a JSON list of rules, tried in order. Each rule matches a regular
+expression against the prompt, and answers with a function call, a text, or a
+JSON value:
+
+  [{"match": "shipping address", "function_call": {"name": "update_cart",
+                                                   "args": {}}},
+   {"match": "running shoes", "json": [{"label": "Trail runners", ...}]},
+   {"match": ".*", "text": "Done."}]
+
+Each answer can be delayed, to model the latency of the real API:
+  fixed:MS, uniform:LOW_MS,HIGH_MS or lognormal:MEDIAN_MS,SIGMA
+
+Agents use the fake if the AP2_FAKE_GEMINI environment variable is set, see
+`use_if_configured`, with the script and latency set by AP2_FAKE_GEMINI_SCRIPT
+and AP2_FAKE_GEMINI_LATENCY. It can also be served on its own.
+
+Usage, from the samples/python/src directory:
+  python -m common.fake_gemini --port=8090 --latency=lognormal:400,0.5
+"""
+
+import asyncio
+import collections
+from collections.abc import Sequence
+import dataclasses
+import json
+import math
+import os
+import random
+import re
+import socket
+import threading
+import time
+from typing import Any, Callable
+import zlib
+
+from absl import app
+from absl import flags
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.responses import Response
+from starlette.routing import Route
+import uvicorn
+
+# Words that say nothing about which function to call.
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from get give given handle here i in is it "
+    "me my no of on or that the this to user user's with".split()
+)
+# A word shared with a function's name counts this many times more than one
+# shared with its description.
+_NAME_WEIGHT = 3
+# The score of a pair of consecutive words shared with a function's name.
+_PAIR_WEIGHT = 6
+_ARRAY_LENGTH = 3
+
+
+@dataclasses.dataclass(frozen=True)
+class Rule:
+  """A scripted answer to the prompts matching a regular expression."""
+
+  match: re.Pattern[str]
+  part: dict[str, Any]
+
+
+def load_script(path: str) -> list[Rule]:
+  """Reads the rules of a script file.
+
+  Raises:
+    ValueError: If a rule has no answer, or more than one.
+  """
+  with open(path, "r", encoding="utf-8") as f:
+    entries = json.load(f)
+  rules = []
+  for entry in entries:
+    answers = [key for key in ("function_call", "text", "json") if key in entry]
+    if len(answers) != 1:
+      raise ValueError(f"Expected one of function_call, text or json: {entry}")
+    (answer,) = answers
+    if answer == "function_call":
+      part = {"functionCall": {"args": {}, **entry[answer]}}
+    elif answer == "text":
+      part = {"text": entry[answer]}
+    else:
+      part = {"text": json.dumps(entry[answer])}
+    rules.append(Rule(re.compile(entry.get("match", "")), part))
+  return rules
+
+
+def parse_latency(spec: str | None, seed: int = 0) -> Callable[[], float]:
+  """Returns a function sampling delays, in seconds, from a distribution.
+
+  Args:
+    spec: fixed:MS, uniform:LOW_MS,HIGH_MS or lognormal:MEDIAN_MS,SIGMA, or
+      None for no delay.
+    seed: Seeds the samples.
+
+  Raises:
+    ValueError: If the distribution is unknown.
+  """
+  if not spec:
+    return lambda: 0.0
+  rng = random.Random(seed)
+  kind, _, args = spec.partition(":")
+  values = [float(value) for value in args.split(",") if value]
+  if kind == "fixed" and len(values) == 1:
+    return lambda: values[0] / 1000
+  if kind == "uniform" and len(values) == 2:
+    return lambda: rng.uniform(values[0], values[1]) / 1000
+  if kind == "lognormal" and len(values) == 2:
+    mu = math.log(values[0])
+    return lambda: rng.lognormvariate(mu, values[1]) / 1000
+  raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def create_app(
+    script: Sequence[Rule] = (),
+    latency: Callable[[], float] = lambda: 0.0,
+) -> Starlette:
+  """Returns the ASGI app of the fake Gemini API.
+
+  Args:
+    script: The scripted answers, tried before the default ones.
+    latency: Samples the delay of each answer, in seconds.
+  """
+
+  async def generate_content(request: Request) -> Response:
+    model, _, method = request.path_params["model_method"].partition(":")
+    if method not in ("generateContent", "streamGenerateContent"):
+      return JSONResponse({"error": {"message": method}}, status_code=404)
+    body = await request.json()
+    response = generate_response(body, script)
+    response["modelVersion"] = model
+    delay = latency()
+    if delay > 0:
+      await asyncio.sleep(delay)
+    if method == "streamGenerateContent":
+      # The whole answer is sent as a single server-sent event.
+      return Response(
+          f"data: {json.dumps(response)}\r\n\r\n",
+          media_type="text/event-stream",
+      )
+    return JSONResponse(response)
+
+  return Starlette(
+      routes=[
+          Route(
+              "/{version}/models/{model_method}",
+              generate_content,
+              methods=["POST"],
+          ),
+      ]
+  )
+
+
+def serve_in_background(app: Starlette, port: int = 0) -> str:
+  """Serves the app from a daemon thread until the process exits.
+
+  Args:
+    app: The ASGI app.
+    port: The port to serve on, or 0 for any free port.
+
+  Returns:
+    The base URL of the server, once it is ready.
+  """
+  sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+  sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+  sock.bind(("127.0.0.1", port))
+  server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+  threading.Thread(
+      target=server.run, kwargs={"sockets": [sock]}, daemon=True
+  ).start()
+  while not server.started:
+    time.sleep(0.01)
+  return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def serve(
+    port: int, script_path: str | None = None, latency: str | None = None
+) -> None:
+  """Serves the fake from this thread until the process is interrupted.
+
+  Args:
+    port: The port to serve on.
+    script_path: A JSON file of scripted answers, if any.
+    latency: The distribution of the delay of each answer, if any.
+  """
+  uvicorn.run(
+      create_app(
+          script=load_script(script_path) if script_path else (),
+          latency=parse_latency(latency),
+      ),
+      host="127.0.0.1",
+      port=port,
+  )
+
+
+def use_if_configured(
+    script_path: str | None = None, latency: str | None = None
+) -> None:
+  """Points google-genai clients at the fake, if AP2_FAKE_GEMINI is set.
+
+  AP2_FAKE_GEMINI is either the base URL of a fake Gemini that is already
+  running, or "1" to serve one from this process. Clients created afterwards,
+  including those of ADK agents, use the fake.
+
+  Args:
+    script_path: The script of a fake served from this process; defaults to
+      AP2_FAKE_GEMINI_SCRIPT.
+    latency: The latency of a fake served from this process; defaults to
+      AP2_FAKE_GEMINI_LATENCY.
+  """
+  setting = os.environ.get("AP2_FAKE_GEMINI", "")
+  if setting.lower() in ("", "0", "false"):
+    return
+  if setting.startswith("http"):
+    base_url = setting
+  else:
+    script_path = script_path or os.environ.get("AP2_FAKE_GEMINI_SCRIPT")
+    base_url = serve_in_background(
+        create_app(
+            script=load_script(script_path) if script_path else (),
+            latency=parse_latency(
+                latency or os.environ.get("AP2_FAKE_GEMINI_LATENCY")
+            ),
+        )
+    )
+  os.environ["GOOGLE_GEMINI_BASE_URL"] = base_url
+  os.environ.setdefault("GOOGLE_API_KEY", "fake")
+  os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+
+
+def generate_response(
+    body: dict[str, Any], script: Sequence[Rule] = ()
+) -> dict[str, Any]:
+  """Returns the GenerateContentResponse for a GenerateContentRequest.
+
+  Args:
+    body: The GenerateContentRequest.
+    script: The scripted answers, tried before the default ones.
+  """
+  prompt = _prompt_text(body)
+  rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+  declarations = [
+      declaration
+      for tool in body.get("tools") or []
+      for declaration in tool.get("functionDeclarations") or []
+  ]
+  generation_config = body.get("generationConfig") or {}
+  # The SDK sends JSON Schemas under their snake_case names, as written.
+  schema = (
+      generation_config.get("responseJsonSchema")
+      or generation_config.get("response_json_schema")
+      or generation_config.get("responseSchema")
+  )
+  rule = next((rule for rule in script if rule.match.search(prompt)), None)
+  if rule is not None:
+    part = rule.part
+  elif _follows_function_response(body):
+    part = {"text": "Done."}
+  elif declarations:
+    declaration = choose_function(prompt, declarations)
+    parameters = (
+        declaration.get("parametersJsonSchema")
+        or declaration.get("parameters_json_schema")
+        or declaration.get("parameters")
+    )
+    part = {
+        "functionCall": {
+            "name": declaration["name"],
+            "args": generate_json(parameters, rng, parameters)
+            if parameters
+            else {},
+        }
+    }
+  elif generation_config.get("responseMimeType") == "application/json":
+    value = generate_json(schema or {"type": "OBJECT"}, rng, schema or {})
+    part = {"text": json.dumps(value)}
+  else:
+    part = {"text": "OK"}
+  return {
+      "candidates": [{
+          "content": {"role": "model", "parts": [part]},
+          "finishReason": "STOP",
+          "index": 0,
+      }],
+      "usageMetadata": {
+          "promptTokenCount": len(prompt.split()),
+          "candidatesTokenCount": 1,
+          "totalTokenCount": len(prompt.split()) + 1,
+      },
+  }
+
+
+def choose_function(
+    prompt: str, declarations: list[dict[str, Any]]
+) -> dict[str, Any]:
+  """Returns the declaration of the function that best matches the prompt.
+
+  Each word of the prompt found in a function's name or summary adds to its
+  score, weighted by how rare the word is among the functions, and each pair
+  of consecutive words also found in its name adds more. Ties go to the
+  function declared first.
+
+  Args:
+    prompt: The text of the prompt.
+    declarations: The FunctionDeclarations of the request.
+  """
+  prompt_words = _words(prompt)
+  prompt_pairs = _pairs(prompt)
+  documents = [
+      (
+          _words(declaration["name"].replace("_", " ")),
+          # The argument descriptions say what the functions take, not do.
+          _words((declaration.get("description") or "").split("Args:")[0]),
+      )
+      for declaration in declarations
+  ]
+  document_frequency = collections.Counter(
+      word for name, summary in documents for word in name | summary
+  )
+
+  def score(index: int) -> float:
+    name, summary = documents[index]
+    name_pairs = _pairs(declarations[index]["name"].replace("_", " "))
+    return _PAIR_WEIGHT * len(prompt_pairs & name_pairs) + sum(
+        (_NAME_WEIGHT if word in name else 1)
+        * math.log(1 + len(documents) / document_frequency[word])
+        for word in prompt_words & (name | summary)
+    )
+
+  return declarations[max(range(len(declarations)), key=score)]
+
+
+def generate_json(
+    schema: dict[str, Any], rng: random.Random, root: dict[str, Any]
+) -> Any:
+  """Returns a value of a Gemini Schema or JSON Schema.
+
+  Args:
+    schema: The schema of the value.
+    rng: The source of the value's randomness.
+    root: The schema containing the definitions of `$ref`s.
+  """
+  if "$ref" in schema:
+    name = schema["$ref"].rsplit("/", 1)[-1]
+    definitions = root.get("$defs") or root.get("definitions") or {}
+    return generate_json(definitions[name], rng, root)
+  for key in ("anyOf", "oneOf"):
+    if schema.get(key):
+      members = [s for s in schema[key] if _type_of(s) != "null"]
+      return generate_json(members[0] if members else {}, rng, root)
+  if schema.get("enum"):
+    return schema["enum"][0]
+  schema_type = _type_of(schema)
+  if schema_type == "object":
+    return {
+        name: _generate_property(name, property_schema, rng, root)
+        for name, property_schema in (schema.get("properties") or {}).items()
+    }
+  if schema_type == "array":
+    return [
+        generate_json(schema.get("items") or {}, rng, root)
+        for _ in range(_ARRAY_LENGTH)
+    ]
+  if schema_type == "string":
+    return f"Item {rng.randrange(1000)}"
+  if schema_type == "integer":
+    return rng.randrange(1, 100)
+  if schema_type == "number":
+    return round(rng.uniform(1, 500), 2)
+  if schema_type == "boolean":
+    return False
+  return None
+
+
+def _generate_property(
+    name: str,
+    schema: dict[str, Any],
+    rng: random.Random,
+    root: dict[str, Any],
+) -> Any:
+  """Returns a value for an object property, plausible for its name."""
+  if _type_of(schema) == "string" or any(
+      _type_of(member) == "string" for member in schema.get("anyOf") or []
+  ):
+    if name == "currency":
+      return "USD"
+    if "email" in name:
+      return "user@example.com"
+  return generate_json(schema, rng, root)
+
+
+def _type_of(schema: dict[str, Any]) -> str:
+  schema_type = schema.get("type", "")
+  if isinstance(schema_type, list):
+    schema_type = next((t for t in schema_type if t != "null"), "null")
+  return schema_type.lower()
+
+
+def _follows_function_response(body: dict[str, Any]) -> bool:
+  """Returns True if the last turn of a request is a function's response."""
+  contents = body.get("contents") or []
+  return bool(contents) and any(
+      "functionResponse" in part for part in contents[-1].get("parts") or []
+  )
+
+
+def _prompt_text(body: dict[str, Any]) -> str:
+  """Returns the text of the last user turn of a request."""
+  user_turns = [
+      content
+      for content in body.get("contents") or []
+      if content.get("role", "user") == "user"
+  ]
+  if not user_turns:
+    return ""
+  return " ".join(
+      part["text"] for part in user_turns[-1].get("parts") or [] if "text" in part
+  )
+
+
+def _words(text: str) -> set[str]:
+  """Returns the lowercase, crudely singularized words of a text."""
+  return set(_word_list(text))
+
+
+def _pairs(text: str) -> set[tuple[str, str]]:
+  """Returns the pairs of consecutive words of a text."""
+  words = _word_list(text)
+  return set(zip(words, words[1:]))
+
+
+def _word_list(text: str) -> list[str]:
+  words = []
+  for word in re.findall(r"[a-z']+", text.lower()):
+    if word in _STOP_WORDS:
+      continue
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+      word = word[:-1]
+    words.append(word)
+  return words
+
+
+if __name__ == "__main__":
+  # The flags are only defined when the fake is served on its own: every
+  # agent imports this module, and would otherwise accept them, and clash
+  # with its own flags of the same names.
+  _PORT = flags.DEFINE_integer("port", 8090, "The port to serve on.")
+  _SCRIPT = flags.DEFINE_string(
+      "script", None, "A JSON file of scripted answers."
+  )
+  _LATENCY = flags.DEFINE_string(
+      "latency", None, "The distribution of the delay of each answer."
+  )
+  app.run(lambda argv: serve(_PORT.value, _SCRIPT.value, _LATENCY.value))
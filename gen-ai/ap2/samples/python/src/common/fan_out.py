@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sends the same request to several agents at once.
+
+Unlike a HopGraph, where any failing hop fails the whole graph, a fan-out
+tolerates failures: each call's result or error is yielded as soon as it
+finishes, and calls still running at the shared deadline are cancelled and
+reported as timed out. Callers decide how many results are enough.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Mapping
+import dataclasses
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class FanOutResult(Generic[T]):
+  """The outcome of one call of a fan-out."""
+
+  name: str
+  value: T | None = None
+  error: BaseException | None = None
+
+  @property
+  def ok(self) -> bool:
+    """True if the call returned a value."""
+    return self.error is None
+
+
+async def fan_out(
+    calls: Mapping[str, Callable[[], Awaitable[T]]],
+    timeout: float | None = None,
+) -> AsyncIterator[FanOutResult[T]]:
+  """Runs the calls concurrently, yielding their results as they finish.
+
+  If the caller stops iterating early, the calls still running are cancelled.
+
+  Args:
+    calls: The calls to run, by name.
+    timeout: The deadline shared by all of the calls, in seconds.
+
+  Yields:
+    A FanOutResult for each call, in the order the calls finish. Calls still
+    running at the deadline are yielded last, with a TimeoutError.
+  """
+  names = {asyncio.ensure_future(call()): name for name, call in calls.items()}
+  loop = asyncio.get_running_loop()
+  deadline = None if timeout is None else loop.time() + timeout
+  pending = set(names)
+  try:
+    while pending:
+      remaining = None if deadline is None else deadline - loop.time()
+      if remaining is not None and remaining <= 0:
+        break
+      done, pending = await asyncio.wait(
+          pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+      )
+      for task in done:
+        if task.cancelled():
+          yield FanOutResult(names[task], error=asyncio.CancelledError())
+        elif task.exception() is not None:
+          yield FanOutResult(names[task], error=task.exception())
+        else:
+          yield FanOutResult(names[task], value=task.result())
+    timed_out = sorted(pending, key=lambda task: names[task])
+    await _cancel(pending)
+    pending = set()
+    for task in timed_out:
+      yield FanOutResult(
+          names[task],
+          error=TimeoutError(f"{names[task]} did not finish in {timeout}s"),
+      )
+  finally:
+    await _cancel(pending)
+
+
+async def _cancel(tasks: set[asyncio.Future]) -> None:
+  for task in tasks:
+    task.cancel()
+  await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Currency conversion with a local table of exchange rates.
+
+Checking an offer priced in one currency against a mandate in another needs
+an exchange rate, but not a network call per check. The rates are read from
+a JSON file, giving the value of one unit of a base currency in each other
+currency:
+
+  {"base": "GBP",
+   "as_of": "2025-09-01T00:00:00Z",
+   "rates": {"EUR": 1.17, "USD": 1.35}}
+
+The table is kept in memory. The file is checked for changes at most every
+_REFRESH_INTERVAL_SECONDS, when rates are used, and reloaded if it changed,
+so that whatever updates the file (e.g. a cron job) needs no restart. If the
+table's as_of is older than the staleness bound, conversions fail rather than
+use outdated rates. A table without an as_of, like the sample rates shipped
+with the samples, never goes stale.
+
+The file is named by the AP2_FX_RATES_PATH environment variable, and defaults
+to the sample rates in fx_rates.json.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+# How often the rates file is checked for changes.
+_REFRESH_INTERVAL_SECONDS = float(
+    os.environ.get("AP2_FX_REFRESH_INTERVAL_SECONDS", "60")
+)
+# How old the rates may be before conversions fail.
+_MAX_STALENESS_SECONDS = float(
+    os.environ.get("AP2_FX_MAX_STALENESS_SECONDS", str(24 * 60 * 60))
+)
+_DEFAULT_RATES_PATH = os.path.join(os.path.dirname(__file__), "fx_rates.json")
+
+
+class FxError(ValueError):
+  """Raised when an amount cannot be converted."""
+
+
+@dataclasses.dataclass(frozen=True)
+class RateTable:
+  """The exchange rates of a base currency, at a point in time."""
+
+  base: str
+  rates: dict[str, decimal.Decimal]
+  as_of: datetime.datetime | None = None
+
+  @classmethod
+  def from_json(cls, data: Any) -> "RateTable":
+    """Parses a table of rates.
+
+    Raises:
+      ValueError: If the table is malformed.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("rates"), dict):
+      raise ValueError("Expected an object with a base and rates.")
+    base = str(data["base"]).upper()
+    rates = {
+        currency.upper(): decimal.Decimal(str(rate))
+        for currency, rate in data["rates"].items()
+    }
+    if any(rate <= 0 for rate in rates.values()):
+      raise ValueError("Exchange rates must be positive.")
+    rates[base] = decimal.Decimal(1)
+    as_of = None
+    if data.get("as_of"):
+      as_of = datetime.datetime.fromisoformat(
+          data["as_of"].replace("Z", "+00:00")
+      )
+      if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=datetime.timezone.utc)
+    return cls(base, rates, as_of)
+
+  def rate(self, from_currency: str, to_currency: str) -> decimal.Decimal:
+    """Returns the value of one unit of a currency in another.
+
+    Raises:
+      FxError: If either currency is not in the table.
+    """
+    try:
+      return (
+          self.rates[to_currency.upper()] / self.rates[from_currency.upper()]
+      )
+    except KeyError as e:
+      raise FxError(f"No exchange rate for {e.args[0]}") from None
+
+
+class FxService:
+  """Converts amounts with the rates of a file, reloaded when it changes."""
+
+  def __init__(
+      self,
+      path: str,
+      refresh_interval_seconds: float = _REFRESH_INTERVAL_SECONDS,
+      max_staleness_seconds: float = _MAX_STALENESS_SECONDS,
+  ):
+    """Initialization.
+
+    Args:
+      path: The JSON file of rates.
+      refresh_interval_seconds: How often the file is checked for changes.
+      max_staleness_seconds: How old the rates may be before conversions fail.
+    """
+    self._path = path
+    self._refresh_interval_seconds = refresh_interval_seconds
+    self._max_staleness_seconds = max_staleness_seconds
+    self._lock = threading.Lock()
+    self._table: RateTable | None = None
+    self._mtime: float | None = None
+    self._next_refresh = 0.0
+
+  def table(self) -> RateTable:
+    """Returns the current rates, reloading them if the file changed.
+
+    Raises:
+      FxError: If the rates could not be loaded, or are stale.
+    """
+    if time.monotonic() >= self._next_refresh:
+      self._refresh()
+    table = self._table
+    if table is None:
+      raise FxError(f"No exchange rates could be loaded from {self._path}")
+    if table.as_of is not None:
+      age = datetime.datetime.now(datetime.timezone.utc) - table.as_of
+      if age.total_seconds() > self._max_staleness_seconds:
+        raise FxError(f"The exchange rates as of {table.as_of} are stale")
+    return table
+
+  def convert(
+      self, amount: float, from_currency: str, to_currency: str
+  ) -> float:
+    """Converts an amount from one currency to another.
+
+    Raises:
+      FxError: If there is no current rate between the currencies.
+    """
+    if from_currency.upper() == to_currency.upper():
+      return amount
+    rate = self.table().rate(from_currency, to_currency)
+    return float(decimal.Decimal(str(amount)) * rate)
+
+  def _refresh(self) -> None:
+    with self._lock:
+      if time.monotonic() < self._next_refresh:
+        return
+      self._next_refresh = time.monotonic() + self._refresh_interval_seconds
+      try:
+        mtime = os.stat(self._path).st_mtime
+        if mtime == self._mtime:
+          return
+        with open(self._path, "r", encoding="utf-8") as f:
+          self._table = RateTable.from_json(json.load(f))
+        self._mtime = mtime
+        logging.info("Loaded exchange rates from %s", self._path)
+      except (OSError, ValueError) as e:
+        # Keep the last good rates, e.g. while the file is being rewritten.
+        logging.warning(
+            "Failed to load exchange rates from %s: %s", self._path, e
+        )
+
+
+def get_fx_service() -> FxService:
+  """Returns the FxService shared by every caller in the process."""
+  global _fx_service
+  if _fx_service is None:
+    _fx_service = FxService(
+        os.environ.get("AP2_FX_RATES_PATH") or _DEFAULT_RATES_PATH
+    )
+  return _fx_service
+
+
+_fx_service: FxService | None = None
@@ -0,0 +1,148 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for fx."""
+
+import datetime
+import decimal
+import json
+import os
+import tempfile
+
+from absl.testing import absltest
+
+from common import fx
+
+_HOUR_SECONDS = 60 * 60
+_MAX_STALENESS_SECONDS = 2 * _HOUR_SECONDS
+
+
+def _rates(as_of: datetime.datetime | None = None, **rates: float) -> str:
+  table = {"base": "GBP", "rates": rates or {"EUR": 1.17, "USD": 1.35}}
+  if as_of is not None:
+    table["as_of"] = as_of.isoformat()
+  return json.dumps(table)
+
+
+def _hours_ago(hours: float) -> datetime.datetime:
+  return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+      hours=hours
+  )
+
+
+def _rewrite(path: str, text: str) -> None:
+  """Rewrites a file, and moves its mtime on, as a later write would."""
+  mtime = os.stat(path).st_mtime
+  with open(path, "w", encoding="utf-8") as f:
+    f.write(text)
+  os.utime(path, (mtime + 1, mtime + 1))
+
+
+class RateTableTest(absltest.TestCase):
+
+  def test_derives_cross_rates_from_the_base(self):
+    table = fx.RateTable.from_json(json.loads(_rates(EUR=1.25, USD=1.5)))
+
+    self.assertEqual(table.rate("EUR", "USD"), decimal.Decimal("1.2"))
+    self.assertEqual(table.rate("gbp", "eur"), decimal.Decimal("1.25"))
+
+  def test_raises_for_an_unknown_currency(self):
+    table = fx.RateTable.from_json(json.loads(_rates()))
+
+    with self.assertRaisesRegex(fx.FxError, "JPY"):
+      table.rate("GBP", "JPY")
+
+  def test_rejects_rates_that_are_not_positive(self):
+    with self.assertRaises(ValueError):
+      fx.RateTable.from_json(json.loads(_rates(EUR=0)))
+
+
+class FxServiceTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.tempdir = self.enter_context(tempfile.TemporaryDirectory())
+
+  def _service(self, rates: str, **kwargs) -> tuple[fx.FxService, str]:
+    path = os.path.join(self.tempdir, "fx_rates.json")
+    with open(path, "w", encoding="utf-8") as f:
+      f.write(rates)
+    kwargs.setdefault("refresh_interval_seconds", 0)
+    return fx.FxService(path, **kwargs), path
+
+  def test_converts_with_the_rates_of_the_file(self):
+    service, _ = self._service(_rates(EUR=1.25))
+
+    self.assertEqual(service.convert(100, "GBP", "EUR"), 125.0)
+    self.assertEqual(service.convert(100, "EUR", "eur"), 100)
+
+  def test_converts_with_recent_rates(self):
+    service, _ = self._service(
+        _rates(_hours_ago(1), EUR=1.25),
+        max_staleness_seconds=_MAX_STALENESS_SECONDS,
+    )
+
+    self.assertEqual(service.convert(100, "GBP", "EUR"), 125.0)
+
+  def test_fails_with_stale_rates(self):
+    service, _ = self._service(
+        _rates(_hours_ago(3)), max_staleness_seconds=_MAX_STALENESS_SECONDS
+    )
+
+    with self.assertRaisesRegex(fx.FxError, "stale"):
+      service.convert(100, "GBP", "EUR")
+
+  def test_rates_without_an_as_of_never_go_stale(self):
+    service, _ = self._service(_rates(), max_staleness_seconds=0)
+
+    self.assertIsNotNone(service.table())
+
+  def test_reloads_the_file_when_it_changes(self):
+    service, path = self._service(
+        _rates(_hours_ago(3)), max_staleness_seconds=_MAX_STALENESS_SECONDS
+    )
+    with self.assertRaises(fx.FxError):
+      service.table()
+
+    _rewrite(path, _rates(_hours_ago(0), EUR=1.5))
+
+    self.assertEqual(service.convert(100, "GBP", "EUR"), 150.0)
+
+  def test_keeps_the_last_good_rates_if_the_file_is_malformed(self):
+    service, path = self._service(_rates(EUR=1.25))
+    service.table()
+
+    _rewrite(path, "{")
+
+    self.assertEqual(service.convert(100, "GBP", "EUR"), 125.0)
+
+  def test_does_not_check_the_file_before_the_refresh_interval(self):
+    service, path = self._service(
+        _rates(EUR=1.25), refresh_interval_seconds=_HOUR_SECONDS
+    )
+    service.table()
+
+    _rewrite(path, _rates(EUR=1.5))
+
+    self.assertEqual(service.convert(100, "GBP", "EUR"), 125.0)
+
+  def test_fails_if_the_file_cannot_be_loaded(self):
+    service = fx.FxService(os.path.join(self.tempdir, "missing.json"))
+
+    with self.assertRaises(fx.FxError):
+      service.table()
+
+
+if __name__ == "__main__":
+  absltest.main()
@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A small orchestration helper for running dependent agent hops.
+
+Completing a payment involves several hops between agents (e.g. fetching a
+payment credential, calling the issuer, forwarding the receipt). Some of these
+hops depend on each other, while others are independent and can run at the
+same time.
+
+A HopGraph expresses these dependencies as a directed acyclic graph. Each hop
+starts as soon as all of the hops it depends on have finished, and all hops
+share a single deadline. If any hop fails, or the deadline is reached, every
+hop still in flight is cancelled.
+"""
+
+import asyncio
+from collections.abc import Iterable
+from collections.abc import Mapping
+import inspect
+from typing import Any, Callable, Self
+
+HopFunction = Callable[[Mapping[str, Any]], Any]
+
+
+class HopGraph:
+  """A set of named hops and the dependencies between them."""
+
+  def __init__(self):
+    self._hops: dict[str, HopFunction] = {}
+    self._dependencies: dict[str, tuple[str, ...]] = {}
+
+  def add(
+      self,
+      name: str,
+      hop: HopFunction,
+      depends_on: Iterable[str] = (),
+  ) -> Self:
+    """Adds a hop to the graph.
+
+    Args:
+      name: The unique name of the hop. Its result is published under this
+        name.
+      hop: A callable receiving the results of the hops it depends on, keyed by
+        hop name. It may return a value or an awaitable.
+      depends_on: The names of the hops that must finish before this one
+        starts. They must already have been added to the graph.
+
+    Returns:
+      The HopGraph instance.
+
+    Raises:
+      ValueError: If the name is already used or a dependency is unknown.
+    """
+    if name in self._hops:
+      raise ValueError(f"Hop '{name}' is already defined.")
+    dependencies = tuple(depends_on)
+    for dependency in dependencies:
+      if dependency not in self._hops:
+        raise ValueError(f"Hop '{name}' depends on unknown hop '{dependency}'.")
+    self._hops[name] = hop
+    self._dependencies[name] = dependencies
+    return self
+
+  async def run(self, timeout: float | None = None) -> dict[str, Any]:
+    """Runs every hop, starting each one as soon as its dependencies finish.
+
+    Because dependencies must be added before the hops that use them, the graph
+    is acyclic by construction.
+
+    Args:
+      timeout: The deadline, in seconds, shared by all of the hops. None means
+        no deadline.
+
+    Returns:
+      The result of every hop, keyed by hop name.
+
+    Raises:
+      TimeoutError: If the hops did not all finish before the deadline.
+      Exception: The first error raised by a hop. The remaining hops are
+        cancelled.
+    """
+    results: dict[str, Any] = {}
+    done = {name: asyncio.Event() for name in self._hops}
+
+    async def run_hop(name: str) -> None:
+      for dependency in self._dependencies[name]:
+        await done[dependency].wait()
+      result = self._hops[name](
+          {dependency: results[dependency]
+           for dependency in self._dependencies[name]}
+      )
+      if inspect.isawaitable(result):
+        result = await result
+      results[name] = result
+      done[name].set()
+
+    try:
+      async with asyncio.timeout(timeout):
+        async with asyncio.TaskGroup() as task_group:
+          for name in self._hops:
+            task_group.create_task(run_hop(name), name=f"hop:{name}")
+    except ExceptionGroup as e:
+      # Surface the original error rather than the group, so that callers can
+      # report it the same way as an error from a sequential flow.
+      raise e.exceptions[0] from e
+    return results
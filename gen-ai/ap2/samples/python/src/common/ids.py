@@ -0,0 +1,66 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Globally unique, time-ordered identifiers.
+
+IDs follow the ULID layout: a 48-bit millisecond timestamp followed by 80
+random bits, encoded as 26 characters of Crockford's base32. They sort in the
+order they were created, and IDs created by different processes or replicas do
+not collide.
+
+Within a process, IDs created in the same millisecond increment the random
+part, so that they remain strictly ordered.
+"""
+
+import secrets
+import threading
+import time
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_MAX_RANDOM = (1 << _RANDOM_BITS) - 1
+
+
+def new_ulid() -> str:
+  """Returns a new ULID string."""
+  with _lock:
+    global _last_timestamp_ms, _last_random
+    timestamp_ms = time.time_ns() // 1_000_000
+    if timestamp_ms <= _last_timestamp_ms:
+      # Same millisecond (or the clock went back): keep the order by
+      # incrementing the previous ID.
+      timestamp_ms = _last_timestamp_ms
+      random = _last_random + 1
+      if random > _MAX_RANDOM:
+        timestamp_ms += 1
+        random = secrets.randbits(_RANDOM_BITS)
+    else:
+      random = secrets.randbits(_RANDOM_BITS)
+    _last_timestamp_ms = timestamp_ms
+    _last_random = random
+  return _encode((timestamp_ms << _RANDOM_BITS) | random)
+
+
+def _encode(value: int) -> str:
+  """Encodes a 128-bit value as 26 characters of Crockford's base32."""
+  characters = []
+  for _ in range(26):
+    characters.append(_ALPHABET[value & 0x1F])
+    value >>= 5
+  return "".join(reversed(characters))
+
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_last_random = 0
@@ -0,0 +1,91 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental parsing of a JSON array streamed in chunks.
+
+When an LLM streams a JSON array, each element can be used as soon as its
+closing bracket arrives, rather than waiting for the whole array.
+"""
+
+import json
+from typing import Any
+
+
+class JsonArrayStreamParser:
+  """Parses the elements of a JSON array as its text arrives in chunks.
+
+  Only object and array elements are supported, which covers structured LLM
+  output such as a list of pydantic models.
+  """
+
+  def __init__(self):
+    self._element: list[str] = []
+    self._depth = 0
+    self._in_array = False
+    self._in_string = False
+    self._escaped = False
+    self._finished = False
+
+  @property
+  def finished(self) -> bool:
+    """True once the closing bracket of the array has been parsed."""
+    return self._finished
+
+  def feed(self, chunk: str) -> list[Any]:
+    """Parses the next chunk of text.
+
+    Args:
+      chunk: The next chunk of the streamed JSON text.
+
+    Returns:
+      The elements of the array completed by this chunk, in order.
+
+    Raises:
+      json.JSONDecodeError: If a completed element is not valid JSON.
+    """
+    elements = []
+    for char in chunk:
+      if self._finished:
+        break
+      if not self._in_array:
+        self._in_array = char == "["
+        continue
+      if self._depth == 0:
+        # Between elements: skip whitespace and commas until the next element
+        # starts or the array ends.
+        if char in "{[":
+          self._element.append(char)
+          self._depth = 1
+        elif char == "]":
+          self._finished = True
+        continue
+
+      self._element.append(char)
+      if self._in_string:
+        if self._escaped:
+          self._escaped = False
+        elif char == "\\":
+          self._escaped = True
+        elif char == '"':
+          self._in_string = False
+      elif char == '"':
+        self._in_string = True
+      elif char in "{[":
+        self._depth += 1
+      elif char in "}]":
+        self._depth -= 1
+        if self._depth == 0:
+          elements.append(json.loads("".join(self._element)))
+          self._element = []
+    return elements
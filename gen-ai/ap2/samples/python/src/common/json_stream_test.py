@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for json_stream."""
+
+import json
+
+from absl.testing import absltest
+
+from common.json_stream import JsonArrayStreamParser
+
+
+class JsonArrayStreamParserTest(absltest.TestCase):
+
+  def test_returns_each_element_once_its_chunk_completes_it(self):
+    parser = JsonArrayStreamParser()
+
+    self.assertEqual(parser.feed('[{"label": "a'), [])
+    self.assertEqual(parser.feed('"}, {"label"'), [{"label": "a"}])
+    self.assertEqual(parser.feed(': "b"}]'), [{"label": "b"}])
+    self.assertTrue(parser.finished)
+
+  def test_returns_every_element_completed_by_one_chunk(self):
+    parser = JsonArrayStreamParser()
+
+    elements = parser.feed('[{"a": 1}, {"a": 2}, [3, [4]]]')
+
+    self.assertEqual(elements, [{"a": 1}, {"a": 2}, [3, [4]]])
+
+  def test_parses_text_one_character_at_a_time(self):
+    text = '[{"a": {"b": [1, 2]}}, {"c": null}]'
+    parser = JsonArrayStreamParser()
+
+    elements = [element for char in text for element in parser.feed(char)]
+
+    self.assertEqual(elements, json.loads(text))
+
+  def test_ignores_brackets_and_escaped_quotes_in_strings(self):
+    parser = JsonArrayStreamParser()
+
+    elements = parser.feed(r'[{"label": "a \"}]\" {[ b"}]')
+
+    self.assertEqual(elements, [{"label": 'a "}]" {[ b'}])
+
+  def test_skips_text_around_the_array(self):
+    parser = JsonArrayStreamParser()
+
+    elements = parser.feed('```json\n[{"a": 1}]\n```\n[{"a": 2}]')
+
+    self.assertEqual(elements, [{"a": 1}])
+    self.assertTrue(parser.finished)
+
+  def test_finishes_on_an_empty_array(self):
+    parser = JsonArrayStreamParser()
+
+    self.assertEqual(parser.feed("[ ]"), [])
+    self.assertTrue(parser.finished)
+
+  def test_is_not_finished_before_the_closing_bracket(self):
+    parser = JsonArrayStreamParser()
+
+    parser.feed('[{"a": 1},')
+
+    self.assertFalse(parser.finished)
+
+  def test_raises_on_an_invalid_element(self):
+    parser = JsonArrayStreamParser()
+
+    with self.assertRaises(json.JSONDecodeError):
+      parser.feed('[{"a": 1,}]')
+
+
+if __name__ == "__main__":
+  absltest.main()
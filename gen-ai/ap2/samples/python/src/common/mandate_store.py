@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Mandates kept in agents' session state, with each distinct body once.
+
+Under each key, the session state holds the digest of each object, e.g.
+"sha256:9f86d0...". The JSON body of each distinct object is held once, under
+the "mandate_bodies" key, however many keys refer to it: e.g. the chosen
+CartMandate is also one of the cart_mandates. A body is dropped once no key
+refers to it.
+
+The bodies are part of the session state, so they are persisted and
+reloaded with it, and any worker serving the session can read them. Reading
+a key validates a fresh object from its JSON, which the caller is free to
+change; changes are only kept by putting the object in the state again.
+Callers that only read an object, e.g. the ID and total of a large cart, can
+get a TrustedView of it instead, which skips the validation.
+"""
+
+from collections.abc import Callable
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+import hashlib
+import json
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from ap2.types.trusted import TrustedView
+
+M = TypeVar("M", bound=BaseModel)
+
+_DIGEST_PREFIX = "sha256:"
+# The state key of the JSON bodies, by digest.
+_BODIES_KEY = "mandate_bodies"
+# The state key of the list of keys holding digests.
+_KEYS_KEY = "mandate_keys"
+
+
+def put_in_state(
+    state: MutableMapping[str, Any],
+    key: str,
+    value: BaseModel | list[BaseModel],
+) -> None:
+  """Stores an object, or a list of objects, under a session state key.
+
+  Args:
+    state: The session state, e.g. an ADK ToolContext's state.
+    key: The state key.
+    value: The object or list of objects. The state holds their digests.
+  """
+  # The state's values are replaced rather than changed in place, so that the
+  # ADK records the change.
+  bodies = dict(state.get(_BODIES_KEY) or {})
+  digests = []
+  for item in value if isinstance(value, list) else [value]:
+    body = item.model_dump_json()
+    digest = _DIGEST_PREFIX + hashlib.sha256(
+        f"{type(item).__name__}\0{body}".encode("utf-8")
+    ).hexdigest()
+    bodies[digest] = body
+    digests.append(digest)
+  state[key] = digests if isinstance(value, list) else digests[0]
+
+  keys = sorted(set(state.get(_KEYS_KEY) or ()) | {key})
+  state[_KEYS_KEY] = keys
+  referenced = set()
+  for state_key in keys:
+    referenced.update(_digests(state.get(state_key)))
+  state[_BODIES_KEY] = {
+      digest: body for digest, body in bodies.items() if digest in referenced
+  }
+
+
+def get_from_state(
+    state: Mapping[str, Any], key: str, model: type[M]
+) -> M | list[M] | None:
+  """Returns the object, or list of objects, stored under a state key.
+
+  Args:
+    state: The session state, e.g. an ADK ToolContext's state.
+    key: The state key.
+    model: The pydantic model of the objects.
+
+  Returns:
+    The object or list of objects, or None if the key is not set.
+
+  Raises:
+    RuntimeError: If the state does not hold the body of an object.
+  """
+  return _load(state, key, model.model_validate_json)
+
+
+def view_from_state(
+    state: Mapping[str, Any], key: str, model: type[M]
+) -> TrustedView[M] | list[TrustedView[M]] | None:
+  """Returns read-only views of the object, or objects, under a state key.
+
+  The bodies were dumped from validated objects by put_in_state, so they are
+  not validated again. The fields that are not models hold their JSON values.
+
+  Args:
+    state: The session state, e.g. an ADK ToolContext's state.
+    key: The state key.
+    model: The pydantic model of the objects.
+
+  Returns:
+    The view or list of views, or None if the key is not set.
+
+  Raises:
+    RuntimeError: If the state does not hold the body of an object.
+  """
+  return _load(state, key, lambda body: TrustedView(model, json.loads(body)))
+
+
+def _load(
+    state: Mapping[str, Any], key: str, parse: Callable[[str], Any]
+) -> Any:
+  """Parses the body of each digest under a state key."""
+  digests = state.get(key)
+  if digests is None:
+    return None
+  bodies = state.get(_BODIES_KEY) or {}
+
+  def load(digest: str) -> Any:
+    body = bodies.get(digest)
+    if body is None:
+      raise RuntimeError(
+          f"The {key} in the session state refers to {digest}, which is not"
+          " in the session state."
+      )
+    return parse(body)
+
+  if isinstance(digests, list):
+    return [load(digest) for digest in digests]
+  return load(digests)
+
+
+def _digests(value: Any) -> list[str]:
+  return [
+      digest
+      for digest in (value if isinstance(value, list) else [value])
+      if isinstance(digest, str) and digest.startswith(_DIGEST_PREFIX)
+  ]
@@ -14,13 +14,53 @@
 
 """Helper functions for working with A2A Message objects."""
 
+from collections.abc import Iterable, Sequence
 from typing import Any
 
 from pydantic import BaseModel
 
 
+class DataParts(Sequence[dict[str, Any]]):
+    """A read-only sequence of data parts, indexed by key.
+
+    The index is built once, when a request is parsed, so that each lookup by
+    key is O(1) rather than a scan of every data part. It is a Sequence, so it
+    can be used wherever a list of data parts is read.
+    """
+
+    def __init__(self, data_parts: Iterable[dict[str, Any]]):
+        """Initialization.
+
+        Args:
+          data_parts: The data parts, in message order.
+        """
+        self._data_parts = list(data_parts)
+        self._values_by_key: dict[str, list[Any]] = {}
+        for data_part in self._data_parts:
+            for data_key, value in data_part.items():
+                self._values_by_key.setdefault(data_key, []).append(value)
+
+    def __getitem__(self, index):
+        return self._data_parts[index]
+
+    def __len__(self) -> int:
+        return len(self._data_parts)
+
+    def __repr__(self) -> str:
+        return f'DataParts({self._data_parts!r})'
+
+    def first(self, data_key: str) -> Any | None:
+        """Returns the value for the first occurrence of the key, or None."""
+        values = self._values_by_key.get(data_key)
+        return values[0] if values else None
+
+    def all(self, data_key: str) -> list[Any]:
+        """Returns all values for the key, in message order."""
+        return list(self._values_by_key.get(data_key, ()))
+
+
 def find_data_part(
-    data_key: str, data_parts: list[dict[str, Any]]
+    data_key: str, data_parts: Sequence[dict[str, Any]]
 ) -> Any | None:
     """Returns the value for the first occurrence of the key in the data parts.
 
@@ -31,6 +71,9 @@ def find_data_part(
     Returns:
       The value for the first occurrence of the key in the data parts, or None.
     """
+    if isinstance(data_parts, DataParts):
+        return data_parts.first(data_key)
+
     for data_part in data_parts:
         if data_key in data_part:
             return data_part[data_key]
@@ -39,7 +82,7 @@ def find_data_part(
 
 
 def find_data_parts(
-    data_key: str, data_parts: list[dict[str, Any]]
+    data_key: str, data_parts: Sequence[dict[str, Any]]
 ) -> list[Any]:
     """Returns a list of all values for the given key in the data parts.
 
@@ -50,6 +93,9 @@ def find_data_parts(
     Returns:
       A list of all values for the given key in the data parts.
     """
+    if isinstance(data_parts, DataParts):
+        return data_parts.all(data_key)
+
     data_parts_with_key = []
     for data_part in data_parts:
         if data_key in data_part:
@@ -60,7 +106,7 @@ def find_data_parts(
 
 def parse_canonical_object(
     data_key: str,
-    data_parts: list[dict[str, Any]],
+    data_parts: Sequence[dict[str, Any]],
     canonical_object_model: BaseModel,
 ) -> Any:
     """Converts the data part value for the given key to a canonical object.
@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prometheus metrics of the role servers.
+
+Each module declares the metrics it records, once, at import:
+
+  _TOOL_LATENCY = metrics.histogram(
+      "ap2_tool_latency_seconds", "Latency of tool calls.", ("tool",)
+  )
+  ...
+  with _TOOL_LATENCY.labels(tool_name).time():
+    await tool(...)
+
+Gauges may either be set, or read from a function when they are scraped,
+e.g. the size of a store:
+
+  metrics.gauge("ap2_cart_store_entries", "...").set_function(
+      lambda: len(_cart_mandates))
+
+The metrics are prometheus_client metrics, in its default registry. Every
+role server run with common.server serves them at /metrics, in the Prometheus
+text format. prometheus_client is optional, from the samples' `metrics`
+extra; without it, the metrics are not recorded, and /metrics answers 404.
+"""
+
+from collections.abc import Callable, Sequence
+import contextlib
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.responses import Response
+
+# The path at which the metrics are served.
+METRICS_PATH = "/metrics"
+
+# From 5 ms to 60 s, to cover both local tools and calls to Gemini.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class _DisabledMetric:
+  """Stands in for any metric, recording nothing, without prometheus_client."""
+
+  def labels(self, *values: str) -> "_DisabledMetric":  # pylint: disable=unused-argument
+    return self
+
+  def inc(self, amount: float = 1.0) -> None:
+    pass
+
+  def set(self, value: float) -> None:
+    pass
+
+  def set_function(self, function: Callable[[], float]) -> None:
+    pass
+
+  def observe(self, value: float) -> None:
+    pass
+
+  def time(self) -> contextlib.AbstractContextManager[None]:
+    return contextlib.nullcontext()
+
+
+def counter(
+    name: str, documentation: str, labelnames: Sequence[str] = ()
+) -> Any:
+  """Creates a prometheus_client.Counter, e.g. of errors."""
+  client = _prometheus_client()
+  if client is None:
+    return _DisabledMetric()
+  return client.Counter(name, documentation, labelnames)
+
+
+def gauge(
+    name: str, documentation: str, labelnames: Sequence[str] = ()
+) -> Any:
+  """Creates a prometheus_client.Gauge, e.g. of the size of a store."""
+  client = _prometheus_client()
+  if client is None:
+    return _DisabledMetric()
+  return client.Gauge(name, documentation, labelnames)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Any:
+  """Creates a prometheus_client.Histogram, e.g. of latencies."""
+  client = _prometheus_client()
+  if client is None:
+    return _DisabledMetric()
+  return client.Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+async def handle_metrics(request: Request) -> Response:  # pylint: disable=unused-argument
+  """Serves the metrics of the process's registry."""
+  client = _prometheus_client()
+  if client is None:
+    return PlainTextResponse(
+        "Metrics require prometheus-client: pip install prometheus-client\n",
+        status_code=404,
+    )
+  return Response(
+      client.generate_latest(), media_type=client.CONTENT_TYPE_LATEST
+  )
+
+
+def _prometheus_client():
+  """Returns the prometheus_client module, or None if it is not installed."""
+  try:
+    import prometheus_client  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    return None
+  return prometheus_client
@@ -14,9 +14,12 @@
 
 """Wrapper for the A2A client."""
 
+import asyncio
 import httpx
 import logging
+import time
 import uuid
+import weakref
 
 from a2a import types as a2a_types
 from a2a.client.card_resolver import A2ACardResolver
@@ -25,9 +28,21 @@ from a2a.client.client import ClientConfig
 from a2a.client.client_factory import ClientFactory
 from a2a.client.client_task_manager import ClientTaskManager
 from a2a.extensions.common import HTTP_EXTENSION_HEADER
+from opentelemetry.trace import SpanKind
+
+from common import compact_encoding
+from common import metrics
+from common import tracing
+from common.a2a_extension_utils import COMPACT_ENCODING_EXTENSION_URI
 
 DEFAULT_TIMEOUT = 600.0
 
+_REMOTE_CALL_LATENCY = metrics.histogram(
+    "ap2_remote_agent_call_latency_seconds",
+    "Latency of messages sent to other agents, by remote agent and outcome.",
+    ("remote", "outcome"),
+)
+
 
 class PaymentRemoteA2aClient():
   """Wrapper for the A2A client.
@@ -35,6 +50,13 @@ class PaymentRemoteA2aClient():
   Always assumes the AgentCard is at base_url + {AGENT_CARD_WELL_KNOWN_PATH}.
 
   Provides convenience for establishing connection and for sending messages.
+
+  If the compact encoding is requested, and the remote agent supports it, the
+  ap2.types payloads of sent messages are encoded, and those of the returned
+  task's artifacts are decoded, so that callers only ever see plain data.
+
+  Each message is sent in a span, whose trace context is added to the
+  message's metadata, so that the remote agent continues the trace.
   """
 
   def __init__(
@@ -42,6 +64,7 @@ class PaymentRemoteA2aClient():
       name: str,
       base_url: str,
       required_extensions: set[str] | None = None,
+      compact_encoding_requested: bool = compact_encoding.ENABLED_BY_DEFAULT,
   ):
     """Initializes the PaymentRemoteA2aClient.
 
@@ -49,6 +72,8 @@ class PaymentRemoteA2aClient():
       name: The name of the agent.
       base_url: The base URL where the remote agent is hosted.
       required_extensions: A set of extension URIs that the client requires.
+      compact_encoding_requested: Whether to use the compact encoding with
+        remote agents that support it.
     """
 
     self._httpx_client = httpx.AsyncClient(
@@ -63,6 +88,7 @@ class PaymentRemoteA2aClient():
     self._base_url = base_url
     self._agent_card = None
     self._client_required_extensions = required_extensions or set()
+    self._compact_encoding_requested = compact_encoding_requested
 
   async def get_agent_card(self) -> a2a_types.AgentCard:
     """Get agent card."""
@@ -78,7 +104,31 @@ class PaymentRemoteA2aClient():
       self, message: a2a_types.Message
   ) -> a2a_types.Task:
     """Retrieves the A2A client, sends the message, and returns the event."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+      with tracing.span(
+          f"send_message {self._name}",
+          kind=SpanKind.CLIENT,
+          attributes={"ap2.remote_agent": self._name},
+      ):
+        task = await self._send_a2a_message(tracing.inject(message))
+      outcome = "ok"
+      return task
+    finally:
+      _REMOTE_CALL_LATENCY.labels(self._name, outcome).observe(
+          time.perf_counter() - start
+      )
+
+  async def _send_a2a_message(
+      self, message: a2a_types.Message
+  ) -> a2a_types.Task:
     my_a2a_client: Client = await self._get_a2a_client()
+    use_compact_encoding = await self._uses_compact_encoding()
+    if use_compact_encoding:
+      message = message.model_copy(
+          update={"parts": compact_encoding.encode_parts(message.parts)}
+      )
 
     task_manager = ClientTaskManager()
 
@@ -92,6 +142,9 @@ class PaymentRemoteA2aClient():
     task = task_manager.get_task()
     if task is None:
       raise RuntimeError(f"No response from {self._name}")
+    if use_compact_encoding:
+      for artifact in task.artifacts or []:
+        artifact.parts = compact_encoding.decode_parts(artifact.parts)
     logging.info(
         "Response received from %s for (context_id, task_id): (%s, %s)",
         self._name,
@@ -103,11 +156,24 @@ class PaymentRemoteA2aClient():
   async def _get_a2a_client(self) -> Client:
     """Get A2A client."""
     agent_card = await self.get_agent_card()
+    extensions = set(self._client_required_extensions)
+    if await self._uses_compact_encoding():
+      extensions.add(COMPACT_ENCODING_EXTENSION_URI)
     self._httpx_client.headers[HTTP_EXTENSION_HEADER] = ", ".join(
-        self._client_required_extensions
+        sorted(extensions)
     )
     return self._a2a_client_factory.create(agent_card)
 
+  async def _uses_compact_encoding(self) -> bool:
+    """Returns True if both this client and the remote agent use it."""
+    if not self._compact_encoding_requested:
+      return False
+    agent_card = await self.get_agent_card()
+    return compact_encoding.is_available() and any(
+        extension.uri == COMPACT_ENCODING_EXTENSION_URI
+        for extension in agent_card.capabilities.extensions or []
+    )
+
   def _create_agent_message(
       self,
       message: str,
@@ -118,3 +184,48 @@ class PaymentRemoteA2aClient():
         parts=[a2a_types.Part(root=a2a_types.TextPart(text=str(message)))],
         role=a2a_types.Role.agent,
     )
+
+
+def get_shared_client(
+    name: str,
+    base_url: str,
+    required_extensions: set[str] | None = None,
+) -> PaymentRemoteA2aClient:
+  """Returns a PaymentRemoteA2aClient shared by every caller on the event loop.
+
+  Creating a client per request opens a new connection pool and fetches the
+  remote AgentCard again. Sharing the client keeps both for as long as the
+  running event loop. The connections of an httpx.AsyncClient belong to the
+  loop that opened them, so each loop has its own clients, which are dropped
+  with the loop.
+
+  Args:
+    name: The name of the agent.
+    base_url: The base URL where the remote agent is hosted.
+    required_extensions: A set of extension URIs that the client requires.
+
+  Returns:
+    The client for the given base URL and set of required extensions.
+
+  Raises:
+    RuntimeError: If there is no running event loop.
+  """
+  clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+  key = (base_url, frozenset(required_extensions or ()))
+  client = clients.get(key)
+  if client is None:
+    client = PaymentRemoteA2aClient(
+        name=name,
+        base_url=base_url,
+        required_extensions=required_extensions,
+    )
+    clients[key] = client
+  return client
+
+
+# The shared clients of each running event loop, by base URL and required
+# extensions.
+_shared_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[tuple[str, frozenset[str]], PaymentRemoteA2aClient],
+] = weakref.WeakKeyDictionary()
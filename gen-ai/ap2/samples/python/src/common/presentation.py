@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rich console output for the interactive demos, off for servers.
+
+The demos narrate each step with Rich panels, e.g. the mandate as indented
+JSON. Building and printing those costs more than the step itself on a
+server's hot path, where nobody reads them. Output is passed as a function
+building it, which is only called if output is enabled:
+
+  presentation.show(lambda: Panel(mandate.model_dump_json(indent=2)))
+
+The AP2_CONSOLE environment variable selects the output: "rich" to render
+it, or "none" to skip it. By default, it is rendered only if stdout is a
+terminal.
+"""
+
+from collections.abc import Callable
+import os
+import sys
+from typing import Any
+
+from rich.console import Console
+
+
+def enabled() -> bool:
+  """Returns True if output is rendered."""
+  return _console is not None
+
+
+def show(render: Callable[[], Any], **print_kwargs: Any) -> None:
+  """Renders output to the console, if enabled.
+
+  Args:
+    render: Returns the output, e.g. a string of console markup or a Rich
+      renderable. It is not called if output is disabled.
+    **print_kwargs: Passed to `Console.print`.
+  """
+  if _console is not None:
+    _console.print(render(), **print_kwargs)
+
+
+def _create_console() -> Console | None:
+  setting = os.environ.get("AP2_CONSOLE", "").lower()
+  if setting == "rich" or (not setting and sys.stdout.isatty()):
+    return Console()
+  return None
+
+
+_console = _create_console()
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Starts the role servers of a scenario, and stops them when it ends.
+
+Rather than sleeping for a guessed warm-up time, the supervisor polls the
+AgentCard of each server until it is served, so a scenario starts as soon as
+its servers are ready, and fails with a clear error if one of them exits or
+does not become ready in time:
+
+  async with ProcessSupervisor(
+      [RoleServer("roles.merchant_agent_flights",
+                  "http://localhost:8004/a2a/flights_merchant")],
+      log_dir=".logs",
+  ):
+    await run_demo()
+
+On exit, including on an error or a KeyboardInterrupt, the servers are sent
+SIGTERM, then killed if they have not stopped after a grace period.
+"""
+
+import asyncio
+from collections.abc import Mapping, Sequence
+import contextlib
+import dataclasses
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+import httpx
+
+_STARTUP_TIMEOUT_SECONDS = 60.0
+_SHUTDOWN_GRACE_SECONDS = 10.0
+# Readiness is polled quickly at first, then backs off up to the maximum.
+_INITIAL_POLL_INTERVAL_SECONDS = 0.05
+_MAX_POLL_INTERVAL_SECONDS = 0.5
+
+
+@dataclasses.dataclass(frozen=True)
+class RoleServer:
+  """A role server to run: its module, and the URL of its A2A endpoint."""
+
+  module: str
+  base_url: str
+  log_file: str | None = None
+
+  @property
+  def log_name(self) -> str:
+    return self.log_file or f"{self.module}.log"
+
+
+class ProcessSupervisor:
+  """Runs role servers as child processes, for the duration of a scenario."""
+
+  def __init__(
+      self,
+      servers: Sequence[RoleServer],
+      log_dir: str | os.PathLike[str],
+      cwd: str | os.PathLike[str] | None = None,
+      env: Mapping[str, str] | None = None,
+      startup_timeout_seconds: float = _STARTUP_TIMEOUT_SECONDS,
+  ):
+    """Initialization.
+
+    Args:
+      servers: The role servers to run.
+      log_dir: Where the servers write their logs, one file each.
+      cwd: The working directory of the servers.
+      env: The environment of the servers; defaults to this process's.
+      startup_timeout_seconds: How long to wait for every server to be ready.
+    """
+    self._servers = list(servers)
+    self._log_dir = log_dir
+    self._cwd = cwd
+    self._env = dict(os.environ if env is None else env)
+    self._env["PYTHONUNBUFFERED"] = "1"
+    self._startup_timeout_seconds = startup_timeout_seconds
+    self._processes: list[subprocess.Popen] = []
+
+  def log_path(self, server: RoleServer) -> str:
+    """Returns the path of the log file of a server."""
+    return os.path.join(self._log_dir, server.log_name)
+
+  async def __aenter__(self) -> "ProcessSupervisor":
+    self.start()
+    try:
+      await self.wait_until_ready()
+    except BaseException:
+      await self.stop()
+      raise
+    return self
+
+  async def __aexit__(self, *exc_info) -> None:
+    await self.stop()
+
+  def start(self) -> None:
+    """Starts the servers, using the same interpreter as this process."""
+    os.makedirs(self._log_dir, exist_ok=True)
+    for server in self._servers:
+      with open(self.log_path(server), "wb") as log:
+        self._processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", server.module],
+                cwd=self._cwd,
+                env=self._env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        )
+
+  async def wait_until_ready(self) -> None:
+    """Waits until every server serves its AgentCard.
+
+    Raises:
+      RuntimeError: If a server exits before it is ready.
+      TimeoutError: If a server is not ready in time.
+    """
+    deadline = time.monotonic() + self._startup_timeout_seconds
+    async with httpx.AsyncClient(timeout=1.0) as client:
+      waits = [
+          asyncio.create_task(
+              self._wait_until_server_ready(client, server, process, deadline)
+          )
+          for server, process in zip(self._servers, self._processes)
+      ]
+      try:
+        await asyncio.gather(*waits)
+      finally:
+        # If a server failed, stop waiting for the others.
+        for wait in waits:
+          wait.cancel()
+        await asyncio.gather(*waits, return_exceptions=True)
+
+  async def stop(self) -> None:
+    """Stops the servers, killing those that do not stop in time."""
+    processes, self._processes = self._processes, []
+    for process in processes:
+      if process.poll() is None:
+        process.terminate()
+    for process in processes:
+      try:
+        await asyncio.to_thread(process.wait, _SHUTDOWN_GRACE_SECONDS)
+      except subprocess.TimeoutExpired:
+        logging.warning("Killing %s, which did not stop", process.args)
+        process.kill()
+        await asyncio.to_thread(process.wait)
+
+  async def _wait_until_server_ready(
+      self,
+      client: httpx.AsyncClient,
+      server: RoleServer,
+      process: subprocess.Popen,
+      deadline: float,
+  ) -> None:
+    url = server.base_url.rstrip("/") + AGENT_CARD_WELL_KNOWN_PATH
+    interval = _INITIAL_POLL_INTERVAL_SECONDS
+    while True:
+      with contextlib.suppress(httpx.TransportError):
+        response = await client.get(url)
+        if response.status_code == 200:
+          return
+      if process.poll() is not None:
+        raise RuntimeError(
+            f"{server.module} exited with code {process.returncode}; see"
+            f" {self.log_path(server)}"
+        )
+      if time.monotonic() > deadline:
+        raise TimeoutError(
+            f"{server.module} was not ready after"
+            f" {self._startup_timeout_seconds} s; see {self.log_path(server)}"
+        )
+      await asyncio.sleep(interval)
+      interval = min(_MAX_POLL_INTERVAL_SECONDS, interval * 2)
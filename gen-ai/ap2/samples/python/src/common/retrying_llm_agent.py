@@ -16,50 +16,176 @@
 
 This implementation enhances the ADK's LlmAgent by automatically retrying
 requests and surfacing errors captured from the LLM.
+
+Only transient errors are retried: rate limiting (429), server errors (5xx)
+and failed connections. Other errors, e.g. an invalid request, would fail
+again, so they are surfaced at once.
+
+Retries wait for an exponential backoff with full jitter, so that agents
+failing together do not retry together. They are also limited by a retry
+budget shared by every agent in the process, as in gRPC's retry throttling:
+while most requests are failing, retrying them would only add load to an
+overloaded server, so the errors are surfaced instead.
+
+A retry resumes the invocation rather than replaying it: the ADK rebuilds the
+model's request from the session, which already holds the events delivered
+before the error. Only partial events, which the session does not keep, may
+be generated again; those the user has already seen are not delivered twice.
 """
 
+import asyncio
+import random
+import threading
+
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.events.event import Event
+from google.genai import errors as genai_errors
+import httpx
 from typing_extensions import AsyncGenerator, override
 
+# The HTTP status codes of the errors worth retrying.
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+_INITIAL_BACKOFF_SECONDS = 1.0
+_MAX_BACKOFF_SECONDS = 30.0
+
+# The retry budget, as in gRPC's retry throttling: each failure spends a
+# token, each success earns _TOKENS_PER_SUCCESS, and retries are only allowed
+# while more than half of _MAX_TOKENS remain.
+_MAX_TOKENS = 10.0
+_TOKENS_PER_SUCCESS = 0.1
+
 
 class RetryingLlmAgent(LlmAgent):
   """An LLM agent that surfaces errors to the user and then retries."""
 
-  def __init__(self, *args, max_retries: int = 1, **kwargs):
+  def __init__(
+      self,
+      *args,
+      max_retries: int = 1,
+      initial_backoff_seconds: float = _INITIAL_BACKOFF_SECONDS,
+      max_backoff_seconds: float = _MAX_BACKOFF_SECONDS,
+      **kwargs,
+  ):
     super().__init__(*args, **kwargs)
     self._max_retries = max_retries
+    self._initial_backoff_seconds = initial_backoff_seconds
+    self._max_backoff_seconds = max_backoff_seconds
 
   async def _retry_async(
-      self, ctx: InvocationContext, retries_left: int = 0
+      self, ctx: InvocationContext
   ) -> AsyncGenerator[Event, None]:
-    if retries_left <= 0:
-      yield Event(
-          author=ctx.agent.name,
-          invocation_id=ctx.invocation_id,
-          error_message=(
-              "Maximum retries exhausted. The remote Gemini server failed to"
-              " respond. Please try again later."
-          ),
-      )
-    else:
+    # The partial events delivered since the last complete one, which a retry
+    # may generate again.
+    unfinished: list[str] = []
+    for attempt in range(self._max_retries + 1):
+      # The events of the previous attempt this one may repeat, in order.
+      repeatable = list(unfinished)
       try:
         async for event in super()._run_async_impl(ctx):
+          key = _replay_key(event)
+          if repeatable and repeatable[0] == key:
+            repeatable.pop(0)
+            continue
+          if repeatable:
+            # The retry diverged from what the user has seen.
+            repeatable = []
+            unfinished = []
+          unfinished = unfinished + [key] if event.partial else []
           yield event
       except Exception as e:  # pylint: disable=broad-exception-caught
+        if not _is_retryable(e):
+          yield Event(
+              author=ctx.agent.name,
+              invocation_id=ctx.invocation_id,
+              error_message="Gemini server error.",
+              custom_metadata={"error": str(e)},
+          )
+          return
+        if attempt == self._max_retries:
+          break
+        if not _retry_budget.spend():
+          yield Event(
+              author=ctx.agent.name,
+              invocation_id=ctx.invocation_id,
+              error_message=(
+                  "The remote Gemini server is overloaded. Please try again"
+                  " later."
+              ),
+              custom_metadata={"error": str(e)},
+          )
+          return
+        delay = random.uniform(
+            0,
+            min(
+                self._max_backoff_seconds,
+                self._initial_backoff_seconds * 2**attempt,
+            ),
+        )
         yield Event(
             author=ctx.agent.name,
             invocation_id=ctx.invocation_id,
             error_message="Gemini server error. Retrying...",
-            custom_metadata={"error": str(e)},
+            custom_metadata={"error": str(e), "retry_in_seconds": delay},
         )
-        async for event in self._retry_async(ctx, retries_left - 1):
-          yield event
+        await asyncio.sleep(delay)
+      else:
+        _retry_budget.earn()
+        return
+    yield Event(
+        author=ctx.agent.name,
+        invocation_id=ctx.invocation_id,
+        error_message=(
+            "Maximum retries exhausted. The remote Gemini server failed to"
+            " respond. Please try again later."
+        ),
+    )
 
   @override
   async def _run_async_impl(
       self, ctx: InvocationContext
   ) -> AsyncGenerator[Event, None]:
-    async for event in self._retry_async(ctx, retries_left=self._max_retries):
+    async for event in self._retry_async(ctx):
       yield event
+
+
+class _RetryBudget:
+  """A token bucket limiting the retries of every agent in the process."""
+
+  def __init__(self, max_tokens: float, tokens_per_success: float):
+    self._max_tokens = max_tokens
+    self._tokens_per_success = tokens_per_success
+    self._tokens = max_tokens
+    self._lock = threading.Lock()
+
+  def spend(self) -> bool:
+    """Records a failure, and returns whether it may be retried."""
+    with self._lock:
+      self._tokens = max(0.0, self._tokens - 1)
+      return self._tokens > self._max_tokens / 2
+
+  def earn(self) -> None:
+    """Records a success."""
+    with self._lock:
+      self._tokens = min(
+          self._max_tokens, self._tokens + self._tokens_per_success
+      )
+
+
+def _is_retryable(error: Exception) -> bool:
+  """Returns True if the error is transient, so worth retrying."""
+  if isinstance(error, genai_errors.APIError):
+    return error.code in _RETRYABLE_STATUS_CODES
+  return isinstance(
+      error, (httpx.TransportError, ConnectionError, asyncio.TimeoutError)
+  )
+
+
+def _replay_key(event: Event) -> str:
+  """Returns what the user sees of an event, to recognize it if repeated."""
+  content = event.content.model_dump_json() if event.content else ""
+  return f"{event.author}\0{event.partial}\0{content}"
+
+
+_retry_budget = _RetryBudget(_MAX_TOKENS, _TOKENS_PER_SUCCESS)
@@ -19,6 +19,7 @@ this server operates without the Google ADK. Instead, it directly uses an
 AgentCard and AgentExecutor to launch a Uvicorn server.
 """
 
+import contextlib
 import json
 import logging
 import os
@@ -35,16 +36,31 @@ from starlette.requests import Request
 from starlette.responses import Response
 import uvicorn
 
+from . import compact_encoding
+from . import metrics
+from . import tracing
 from . import watch_log
+from .a2a_extension_utils import COMPACT_ENCODING_EXTENSION_URI
 from .base_server_executor import BaseServerExecutor
 
 # Constant for the A2A extensions header
 A2A_EXTENSIONS_HEADER = "X-A2A-Extensions"
 
+_TASK_STORE_TASKS = metrics.gauge(
+    "ap2_task_store_tasks", "The number of A2A tasks in the task store."
+)
+_WATCH_LOG_QUEUE_DEPTH = metrics.gauge(
+    "ap2_watch_log_queue_depth",
+    "The number of records waiting to be written to watch.log.",
+)
+
 
 def load_local_agent_card(file_path: str) -> AgentCard:
   """Loads the AgentCard from the specified file path.
 
+  The compact encoding extension is dropped from the card if msgpack is not
+  installed, so that clients do not use it.
+
   Args:
       file_path: The directory where the agent.json file is located.
 
@@ -54,7 +70,15 @@ def load_local_agent_card(file_path: str) -> AgentCard:
   card_path = os.path.join(os.path.dirname(file_path), "agent.json")
   with open(card_path, "r", encoding="utf-8") as f:
     data = json.load(f)
-  return AgentCard.model_validate(data)
+  agent_card = AgentCard.model_validate(data)
+  extensions = agent_card.capabilities.extensions
+  if extensions and not compact_encoding.is_available():
+    agent_card.capabilities.extensions = [
+        extension
+        for extension in extensions
+        if extension.uri != COMPACT_ENCODING_EXTENSION_URI
+    ]
+  return agent_card
 
 
 def run_agent_blocking(
@@ -66,6 +90,9 @@ def run_agent_blocking(
 ) -> None:
   """Launches a Uvicorn server for an agent and block the current thread.
 
+  Besides the A2A endpoints, the server serves its Prometheus metrics at
+  /metrics.
+
   Args:
       port: TCP port to bind to.
       agent_card: The AgentCard object describing the agent.
@@ -76,9 +103,12 @@ def run_agent_blocking(
   # Add a file handler to the logger for watch.log.
   logger = logging.getLogger(__name__)
   logger.addHandler(watch_log.create_file_handler())
+  _WATCH_LOG_QUEUE_DEPTH.set_function(watch_log.queue_depth)
+  tracing.configure_if_enabled(agent_card.name)
 
   # Build the Starlette app and add middlewares.
   app = _build_starlette_app(agent_card, executor=executor, rpc_url=rpc_url)
+  app.add_route(metrics.METRICS_PATH, metrics.handle_metrics, methods=["GET"])
   _add_middlewares(app, logger)
 
   # Start the server.
@@ -113,6 +143,10 @@ class _LoggingMiddleware(BaseHTTPMiddleware):
     super().__init__(*args, **kwargs)
 
   async def dispatch(self, request: Request, call_next) -> Response:
+    # Scrapes of the metrics are not agent requests.
+    if request.url.path == metrics.METRICS_PATH:
+      return await call_next(request)
+
     self._logger.info("\n\n\n")
     self._logger.info("---------- New Agent Request Received---------")
 
@@ -190,20 +224,36 @@ def _build_starlette_app(
   if executor is None:
     raise ValueError("executor must be supplied")
 
+  task_store = InMemoryTaskStore()
+  _TASK_STORE_TASKS.set_function(lambda: len(task_store.tasks))
   handler = DefaultRequestHandler(
       agent_executor=executor,
-      task_store=InMemoryTaskStore(),
+      task_store=task_store,
       request_context_builder=SimpleRequestContextBuilder(),
   )
 
   app = A2AStarletteApplication(
       agent_card=agent_card, http_handler=handler
   ).build(
-      rpc_url=rpc_url, agent_card_url=f"{rpc_url}{AGENT_CARD_WELL_KNOWN_PATH}"
+      rpc_url=rpc_url,
+      agent_card_url=f"{rpc_url}{AGENT_CARD_WELL_KNOWN_PATH}",
+      lifespan=_lifespan,
   )
   return app
 
 
+@contextlib.asynccontextmanager
+async def _lifespan(app):  # pylint: disable=unused-argument
+  """Writes out the buffered watch log and spans when the server stops.
+
+  Uvicorn re-raises the signal that stopped it after shutting down, so the
+  process's atexit handlers do not run.
+  """
+  yield
+  watch_log.close()
+  tracing.flush()
+
+
 def _add_middlewares(app, logger: logging.Logger) -> None:
   """Add middlewares to the Starlette app."""
   app.add_middleware(
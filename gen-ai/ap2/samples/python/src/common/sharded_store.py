@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-memory key/value store split into independently locked shards.
+
+Each key belongs to one shard, chosen by a stable hash of the key, and each
+shard has its own lock. Requests for different users' keys rarely touch the
+same shard, so they do not contend with each other, whether they run on the
+event loop or in worker threads.
+
+The shard of a key is the same in every process, so a load balancer may also
+use `shard_of` to route a key's requests to the replica holding it.
+"""
+
+import threading
+import zlib
+from typing import Generic, TypeVar
+
+from common.ttl_store import TtlStore
+
+V = TypeVar("V")
+
+
+class ShardedStore(Generic[V]):
+  """A lock-striped store of TtlStore shards."""
+
+  def __init__(
+      self,
+      ttl_seconds: float,
+      shard_count: int = 16,
+      max_entries_per_shard: int = 10_000,
+  ):
+    """Initialization.
+
+    Args:
+      ttl_seconds: How long an entry remains valid after it is set.
+      shard_count: The number of shards.
+      max_entries_per_shard: The maximum number of entries kept per shard.
+    """
+    self._shards = [
+        TtlStore[V](ttl_seconds, max_entries_per_shard)
+        for _ in range(shard_count)
+    ]
+    self._locks = [threading.Lock() for _ in range(shard_count)]
+
+  def shard_of(self, key: str) -> int:
+    """Returns the index of the shard holding the key."""
+    return zlib.crc32(key.encode("utf-8")) % len(self._shards)
+
+  def get(self, key: str) -> V | None:
+    """Returns the value for the key, or None if it is missing or expired."""
+    shard = self.shard_of(key)
+    with self._locks[shard]:
+      return self._shards[shard].get(key)
+
+  def set(self, key: str, value: V) -> None:
+    """Sets the value for the key."""
+    shard = self.shard_of(key)
+    with self._locks[shard]:
+      self._shards[shard].set(key, value)
+
+  def pop(self, key: str) -> V | None:
+    """Removes the key and returns its value, or None if missing or expired."""
+    shard = self.shard_of(key)
+    with self._locks[shard]:
+      return self._shards[shard].pop(key)
+
+  def __len__(self) -> int:
+    return sum(len(shard) for shard in self._shards)
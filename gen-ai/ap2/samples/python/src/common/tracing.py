@@ -0,0 +1,228 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OpenTelemetry tracing of a purchase across the agents.
+
+A purchase goes from the shopping agent to the merchant, the payment
+processor and the credentials provider. To follow it as one trace, the W3C
+trace context (the traceparent and tracestate fields) of the sending span is
+put in the metadata of each A2A message sent with PaymentRemoteA2aClient, and
+the agent receiving it continues the trace:
+
+  shopping agent     send_message merchant_agent
+  merchant agent       handle_message
+                         resolve_tool
+                         execute_tool initiate_payment
+                           send_message merchant_payment_processor_agent
+  ...
+
+The trace context is in the message rather than an HTTP header, so that it
+is logged to the watch log with the rest of the message, and would survive
+another A2A transport.
+
+Spans are only recorded if the AP2_TRACE_EXPORTER environment variable
+selects where they are exported:
+
+  * "jsonl": appended to a file, one JSON object per span, named by
+    AP2_TRACE_JSONL_PATH (by default, .logs/traces.jsonl). Every process may
+    append to the same file.
+  * "otlp": sent to an OpenTelemetry collector over OTLP/HTTP, at
+    OTEL_EXPORTER_OTLP_ENDPOINT (by default, http://localhost:4318). This
+    requires the opentelemetry-exporter-otlp-proto-http package, from the
+    samples' `tracing` extra.
+
+Otherwise, spans are not recorded, but the trace context of a received
+message is still passed on to the messages the agent sends.
+"""
+
+from collections.abc import Mapping, Sequence
+import contextlib
+import json
+import logging
+import os
+import threading
+from typing import Any
+
+from a2a import types as a2a_types
+from opentelemetry import context as otel_context
+from opentelemetry import propagate
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.trace import SpanKind
+
+_EXPORTER = os.environ.get("AP2_TRACE_EXPORTER", "").lower()
+_JSONL_PATH = os.environ.get("AP2_TRACE_JSONL_PATH", ".logs/traces.jsonl")
+
+_tracer = trace.get_tracer(__name__)
+
+
+class JsonlSpanExporter(SpanExporter):
+  """Appends finished spans to a file, one JSON object per line."""
+
+  def __init__(self, path: str):
+    """Initialization.
+
+    Args:
+      path: The file to append to. Its directory is created if needed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    self._lock = threading.Lock()
+    self._file = open(path, "a", encoding="utf-8")
+
+  def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+    lines = "".join(json.dumps(_span_to_dict(span)) + "\n" for span in spans)
+    with self._lock:
+      if self._file.closed:
+        return SpanExportResult.FAILURE
+      # One write per batch, so that processes appending to the same file do
+      # not interleave their lines.
+      self._file.write(lines)
+      self._file.flush()
+    return SpanExportResult.SUCCESS
+
+  def shutdown(self) -> None:
+    with self._lock:
+      self._file.close()
+
+
+def configure_if_enabled(service_name: str) -> None:
+  """Records the process's spans, if AP2_TRACE_EXPORTER selects an exporter.
+
+  Args:
+    service_name: Names the process in the exported spans, e.g. the agent.
+
+  Raises:
+    ValueError: If AP2_TRACE_EXPORTER is not a known exporter.
+    ImportError: If the OTLP exporter is selected, but not installed.
+  """
+  global _processor
+  if not _EXPORTER or _processor is not None:
+    return
+  processor = BatchSpanProcessor(_create_exporter())
+  provider = trace.get_tracer_provider()
+  if isinstance(provider, TracerProvider):
+    # The ADK, or its host, already set up tracing; add to its exporters.
+    provider.add_span_processor(processor)
+  else:
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name})
+    )
+    provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+  _processor = processor
+  logging.info("Exporting %s traces to %s", service_name, _EXPORTER)
+
+
+def flush() -> None:
+  """Exports the spans recorded so far.
+
+  Spans are otherwise exported in batches, and when the process exits
+  normally, which a server stopped by a signal may not do.
+  """
+  if _processor is not None:
+    _processor.force_flush()
+
+
+def span(
+    name: str,
+    *,
+    kind: SpanKind = SpanKind.INTERNAL,
+    parent: otel_context.Context | None = None,
+    attributes: Mapping[str, Any] | None = None,
+) -> contextlib.AbstractContextManager[trace.Span]:
+  """Starts a span as the current span, for the duration of a block.
+
+  An exception raised by the block is recorded on the span, which is marked
+  as failed.
+
+  Args:
+    name: The name of the span.
+    kind: The kind of the span.
+    parent: The context of the parent span; defaults to the current one.
+    attributes: The attributes of the span.
+
+  Returns:
+    A context manager yielding the span.
+  """
+  return _tracer.start_as_current_span(
+      name, context=parent, kind=kind, attributes=attributes
+  )
+
+
+def inject(message: a2a_types.Message) -> a2a_types.Message:
+  """Returns the message, with the current trace context in its metadata."""
+  metadata = dict(message.metadata or {})
+  propagate.inject(metadata)
+  if metadata == (message.metadata or {}):
+    return message
+  return message.model_copy(update={"metadata": metadata})
+
+
+def extract(message: a2a_types.Message | None) -> otel_context.Context:
+  """Returns the context of the trace a received message is part of."""
+  metadata = message.metadata if message is not None else None
+  return propagate.extract(metadata or {})
+
+
+def current_trace_id() -> str | None:
+  """Returns the ID of the current trace in hex, or None if there is none."""
+  span_context = trace.get_current_span().get_span_context()
+  if not span_context.is_valid:
+    return None
+  return trace.format_trace_id(span_context.trace_id)
+
+
+def _create_exporter() -> SpanExporter:
+  if _EXPORTER == "jsonl":
+    return JsonlSpanExporter(_JSONL_PATH)
+  if _EXPORTER == "otlp":
+    try:
+      # pylint: disable-next=g-import-not-at-top
+      from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+      raise ImportError(
+          "The otlp trace exporter requires opentelemetry-exporter-otlp: pip"
+          " install opentelemetry-exporter-otlp-proto-http"
+      ) from e
+    return OTLPSpanExporter()
+  raise ValueError(
+      f"Unknown AP2_TRACE_EXPORTER {_EXPORTER!r}; expected jsonl or otlp"
+  )
+
+
+def _span_to_dict(span_data: ReadableSpan) -> dict[str, Any]:
+  span_context = span_data.get_span_context()
+  parent = span_data.parent
+  return {
+      "name": span_data.name,
+      "service": span_data.resource.attributes.get("service.name"),
+      "kind": span_data.kind.name,
+      "trace_id": trace.format_trace_id(span_context.trace_id),
+      "span_id": trace.format_span_id(span_context.span_id),
+      "parent_span_id": (
+          trace.format_span_id(parent.span_id) if parent is not None else None
+      ),
+      "start_time_unix_nano": span_data.start_time,
+      "duration_ms": (span_data.end_time - span_data.start_time) / 1e6,
+      "status": span_data.status.status_code.name,
+      "attributes": dict(span_data.attributes or {}),
+  }
+
+
+_processor: BatchSpanProcessor | None = None
@@ -0,0 +1,91 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-memory key/value store whose entries expire after a time-to-live.
+
+Agents keep short-lived state (e.g. pending challenges, cached results) that
+must not grow without bound. Expired entries are dropped lazily on access, and
+the oldest entries are evicted once the store reaches its maximum size.
+"""
+
+from collections import OrderedDict
+import time
+from typing import Callable, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class TtlStore(Generic[V]):
+  """A bounded in-memory store whose entries expire after a time-to-live."""
+
+  def __init__(
+      self,
+      ttl_seconds: float,
+      max_entries: int = 10_000,
+      clock: Callable[[], float] = time.monotonic,
+  ):
+    """Initialization.
+
+    Args:
+      ttl_seconds: How long an entry remains valid after it is set.
+      max_entries: The maximum number of entries kept. The oldest entries are
+        evicted first once this is reached.
+      clock: Returns the current time in seconds. Overridable for testing.
+    """
+    self._ttl_seconds = ttl_seconds
+    self._max_entries = max_entries
+    self._clock = clock
+    self._entries: OrderedDict[str, tuple[float, V]] = OrderedDict()
+
+  def get(self, key: str) -> V | None:
+    """Returns the value for the key, or None if it is missing or expired."""
+    entry = self._entries.get(key)
+    if entry is None:
+      return None
+    expires_at, value = entry
+    if expires_at <= self._clock():
+      del self._entries[key]
+      return None
+    return value
+
+  def set(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+    """Sets the value for the key.
+
+    Args:
+      key: The key to set.
+      value: The value to store.
+      ttl_seconds: Overrides the store's time-to-live for this entry.
+    """
+    ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
+    self._entries.pop(key, None)
+    self._entries[key] = (self._clock() + ttl, value)
+    self._evict()
+
+  def pop(self, key: str) -> V | None:
+    """Removes the key and returns its value, or None if missing or expired."""
+    value = self.get(key)
+    self._entries.pop(key, None)
+    return value
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def _evict(self) -> None:
+    """Drops expired entries from the front, then the oldest over capacity."""
+    now = self._clock()
+    while self._entries:
+      key, (expires_at, _) = next(iter(self._entries.items()))
+      if expires_at > now and len(self._entries) <= self._max_entries:
+        break
+      del self._entries[key]
@@ -18,9 +18,16 @@ The watch.log file is a log file meant to be watched in parallel with running a
 scenario.  It will contain all the requests and responses to/from the agent
 that are sent to/from the client, so engineers can see what is happening
 between the servers in real time.
+
+Records are written to the file by a background thread, through a queue, so
+that logging large mandates does not block the event loop on disk writes.
 """
 
+import atexit
 import logging
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+import queue
 from typing import Any
 
 from a2a.server.agent_execution.context import RequestContext
@@ -32,16 +39,38 @@ from ap2.types.mandate import PAYMENT_MANDATE_DATA_KEY
 _logger = logging.getLogger(__name__)
 
 
-def create_file_handler() -> logging.FileHandler:
-  """Creates a file handler to the logger for watch.log.
+def create_file_handler() -> logging.Handler:
+  """Creates a handler to the logger for watch.log.
+
+  The handlers share one queue, and one thread writing it to the file.
 
   Returns:
-      A logging.FileHandler instance configured for 'watch.log'.
+      A logging.Handler instance queueing records for 'watch.log'.
   """
-  file_handler = logging.FileHandler(".logs/watch.log")
-  file_handler.setLevel(logging.INFO)
-  file_handler.setFormatter(logging.Formatter("%(message)s"))
-  return file_handler
+  global _listener
+  if _listener is None:
+    file_handler = logging.FileHandler(".logs/watch.log")
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = QueueListener(_queue, file_handler)
+    _listener.start()
+    # Write the records still queued when the process exits.
+    atexit.register(close)
+  handler = QueueHandler(_queue)
+  handler.setLevel(logging.INFO)
+  return handler
+
+
+def close() -> None:
+  """Writes the records still queued to watch.log, and stops writing it."""
+  global _listener
+  if _listener is not None:
+    _listener.stop()
+    _listener = None
+
+
+def queue_depth() -> int:
+  """Returns the number of records waiting to be written to watch.log."""
+  return _queue.qsize()
 
 
 def log_a2a_message_parts(
@@ -113,3 +142,7 @@ def _log_extra_data(data_parts: list[dict[str, Any]]) -> None:
       _logger.info("\n")
       _logger.info("[Data Part: %s] ", key)
       _logger.info(value)
+
+
+_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+_listener: QueueListener | None = None
@@ -18,12 +18,14 @@ from collections.abc import Sequence
 
 from absl import app
 from roles.credentials_provider_agent.agent_executor import CredentialsProviderExecutor
+from common import fake_gemini
 from common import server
 
 AGENT_PORT = 8002
 
 
 def main(argv: Sequence[str]) -> None:
+  fake_gemini.use_if_configured()
   agent_card = server.load_local_agent_card(__file__)
   server.run_agent_blocking(
       port=AGENT_PORT,
@@ -19,11 +19,13 @@ from collections.abc import Sequence
 from absl import app
 
 from roles.merchant_agent.agent_executor import MerchantAgentExecutor
+from common import fake_gemini
 from common import server
 
 AGENT_MERCHANT_PORT = 8001
 
 def main(argv: Sequence[str]) -> None:
+  fake_gemini.use_if_configured()
   agent_card = server.load_local_agent_card(__file__)
   server.run_agent_blocking(
       port=AGENT_MERCHANT_PORT,
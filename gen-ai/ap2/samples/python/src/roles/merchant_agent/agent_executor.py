@@ -80,7 +80,7 @@ class MerchantAgentExecutor(BaseServerExecutor):
   async def _handle_request(
       self,
       text_parts: list[str],
-      data_parts: list[dict[str, Any]],
+      data_parts: message_utils.DataParts,
       updater: TaskUpdater,
       current_task: Task | None,
   ) -> None:
@@ -96,7 +96,7 @@ class MerchantAgentExecutor(BaseServerExecutor):
     await super()._handle_request(text_parts, data_parts, updater, current_task)
 
   async def _validate_shopping_agent(
-      self, data_parts: list[dict[str, Any]], updater: TaskUpdater
+      self, data_parts: message_utils.DataParts, updater: TaskUpdater
   ) -> None:
     """Validates that the incoming request is from a trusted Shopping Agent.
 
@@ -17,31 +17,53 @@
 A CartMandate may be updated multiple times during the course of a shopping
 journey. This storage system is used to persist CartMandates between
 interactions between the shopper and merchant agents.
+
+CartMandates and risk data are kept in separate sharded stores, so that
+concurrent shopping journeys do not contend on a single lock, and a cart ID can
+never clash with a context ID.
 """
 
 from typing import Optional
 
 from ap2.types.mandate import CartMandate
+from common import metrics
+from common.sharded_store import ShardedStore
+
+# Entries are kept for longer than a cart's 30 minute expiry, then dropped so
+# that abandoned carts do not accumulate.
+_ENTRY_TTL_SECONDS = 2 * 60 * 60
+
+_STORE_ENTRIES = metrics.gauge(
+    "ap2_cart_store_entries",
+    "The number of entries in the merchant's stores, including expired entries"
+    " not yet dropped.",
+    ("store",),
+)
 
 
 def get_cart_mandate(cart_id: str) -> Optional[CartMandate]:
   """Get a cart mandate by cart ID."""
-  return _store.get(cart_id)
+  return _cart_mandates.get(cart_id)
 
 
 def set_cart_mandate(cart_id: str, cart_mandate: CartMandate) -> None:
   """Set a cart mandate by cart ID."""
-  _store[cart_id] = cart_mandate
+  _cart_mandates.set(cart_id, cart_mandate)
 
 
 def set_risk_data(context_id: str, risk_data: str) -> None:
   """Set risk data by context ID."""
-  _store[context_id] = risk_data
+  _risk_data.set(context_id, risk_data)
 
 
 def get_risk_data(context_id: str) -> Optional[str]:
   """Get risk data by context ID."""
-  return _store.get(context_id)
+  return _risk_data.get(context_id)
 
 
-_store = {}
+_cart_mandates: ShardedStore[CartMandate] = ShardedStore(_ENTRY_TTL_SECONDS)
+_risk_data: ShardedStore[str] = ShardedStore(_ENTRY_TTL_SECONDS)
+_STORE_ENTRIES.labels("cart_mandates").set_function(
+    lambda: len(_cart_mandates)
+)
+_STORE_ENTRIES.labels("risk_data").set_function(lambda: len(_risk_data))
@@ -14,13 +14,19 @@
 
 """A sub-agent that offers items from its 'catalog'.
 
-This agent fabricates catalog content based on the user's request.
+If a local product catalog is configured, products matching the user's request
+are offered from it. Otherwise, or if nothing matches, this agent fabricates
+catalog content based on the user's request.
 """
 
+import contextlib
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
-from typing import Any
+import functools
+import logging
+import os
+from typing import Any, AsyncIterator
 
 from a2a.server.tasks.task_updater import TaskUpdater
 from a2a.types import DataPart
@@ -31,6 +37,8 @@ from google import genai
 from pydantic import ValidationError
 
 from .. import storage
+from .catalog_cache import CatalogCache
+from .product_catalog import ProductCatalog
 from ap2.types.mandate import CART_MANDATE_DATA_KEY
 from ap2.types.mandate import CartContents
 from ap2.types.mandate import CartMandate
@@ -42,8 +50,43 @@ from ap2.types.payment_request import PaymentMethodData
 from ap2.types.payment_request import PaymentOptions
 from ap2.types.payment_request import PaymentRequest
 from common import message_utils
+from common.ids import new_ulid
+from common.json_stream import JsonArrayStreamParser
 from common.system_utils import DEBUG_MODE_INSTRUCTIONS
 
+# The number of items offered when the request does not specify one.
+_DEFAULT_ITEM_COUNT = 3
+_MAX_ITEM_COUNT = 10
+
+# Generated items are offered again for the same intent for this long.
+_CATALOG_CACHE_TTL_SECONDS = float(
+    os.environ.get("MERCHANT_CATALOG_CACHE_TTL_SECONDS", "300")
+)
+# If set, intents whose words are at least this similar share cached items.
+_CATALOG_CACHE_SIMILARITY_THRESHOLD = os.environ.get(
+    "MERCHANT_CATALOG_CACHE_SIMILARITY_THRESHOLD"
+)
+
+# If set, products are searched for in this local catalog file (CSV, JSONL or
+# Parquet) before any are generated by the LLM.
+_PRODUCT_CATALOG_PATH = os.environ.get("MERCHANT_CATALOG_PATH")
+# Whether to also match misspelled or partial words, using a vector index.
+_PRODUCT_CATALOG_VECTOR_INDEX = os.environ.get(
+    "MERCHANT_CATALOG_VECTOR_INDEX", ""
+).lower() in ("1", "true")
+
+# The merchant named in the CartMandates of LLM-generated items.
+_GENERATED_ITEMS_MERCHANT_NAME = "Generic Merchant"
+
+_catalog_cache = CatalogCache(
+    _CATALOG_CACHE_TTL_SECONDS,
+    similarity_threshold=(
+        float(_CATALOG_CACHE_SIMILARITY_THRESHOLD)
+        if _CATALOG_CACHE_SIMILARITY_THRESHOLD
+        else None
+    ),
+)
+
 
 async def find_items_workflow(
     data_parts: list[dict[str, Any]],
@@ -51,59 +94,171 @@ async def find_items_workflow(
     current_task: Task | None,
 ) -> None:
   """Finds products that match the user's IntentMandate."""
-  llm_client = genai.Client()
-
   intent_mandate = message_utils.parse_canonical_object(
       INTENT_MANDATE_DATA_KEY, data_parts, IntentMandate
   )
+
+  try:
+    item_count = _get_item_count(data_parts)
+    current_time = datetime.now(timezone.utc)
+    # Each CartMandate is added as soon as its PaymentItem is available,
+    # rather than after the whole list has been generated.
+    async with contextlib.aclosing(
+        _find_items(intent_mandate, item_count)
+    ) as items:
+      async for item, merchant_name in items:
+        await _create_and_add_cart_mandate_artifact(
+            item, merchant_name, current_time, updater
+        )
+    risk_data = _collect_risk_data(updater)
+    await updater.add_artifact([
+        Part(root=DataPart(data={"risk_data": risk_data})),
+    ])
+    await updater.complete()
+  except ValidationError as e:
+    error_message = updater.new_agent_message(
+        parts=[Part(root=TextPart(text=f"Invalid CartMandate list: {e}"))]
+    )
+    await updater.failed(message=error_message)
+    return
+  except ValueError as e:
+    # An invalid item_count, or generated items that are not valid JSON.
+    error_message = updater.new_agent_message(
+        parts=[Part(root=TextPart(text=f"Failed to find items: {e}"))]
+    )
+    await updater.failed(message=error_message)
+    return
+
+
+async def _find_items(
+    intent_mandate: IntentMandate, item_count: int
+) -> AsyncIterator[tuple[PaymentItem, str]]:
+  """Finds PaymentItems for an intent.
+
+  Items come from the local product catalog if any of its products match.
+  Otherwise they come from the cache, or are generated by the LLM.
+
+  Args:
+    intent_mandate: The user's IntentMandate.
+    item_count: The number of items to find.
+
+  Yields:
+    Up to item_count tuples of a PaymentItem and the name of the merchant
+    selling it, each as soon as it is available.
+  """
+  product_catalog = _get_product_catalog()
+  if product_catalog is not None:
+    products = product_catalog.search(intent_mandate, item_count)
+    if products:
+      for product in products:
+        yield product.to_payment_item(), product.merchant
+      return
+
   intent = intent_mandate.natural_language_description
+  cached_items = _catalog_cache.get(intent, item_count)
+  if cached_items is not None:
+    for item in cached_items:
+      yield item, _GENERATED_ITEMS_MERCHANT_NAME
+    return
+
   prompt = f"""
-        Based on the user's request for '{intent}', your task is to generate 3
-        complete, unique and realistic PaymentItem JSON objects.
+        Based on the user's request for '{intent}', your task is to generate
+        {item_count} complete, unique and realistic PaymentItem JSON objects.
 
         You MUST exclude all branding from the PaymentItem `label` field.
 
     %s
         """ % DEBUG_MODE_INSTRUCTIONS
 
-  llm_response = llm_client.models.generate_content(
+  generated_items = []
+  async with contextlib.aclosing(
+      _stream_items(genai.Client(), prompt)
+  ) as items:
+    async for item in items:
+      generated_items.append(item)
+      yield item, _GENERATED_ITEMS_MERCHANT_NAME
+      if len(generated_items) >= item_count:
+        break
+  if generated_items:
+    _catalog_cache.put(intent, item_count, generated_items)
+
+
+async def _stream_items(
+    llm_client: genai.Client, prompt: str
+) -> AsyncIterator[PaymentItem]:
+  """Generates PaymentItems, yielding each one as soon as it is complete.
+
+  Args:
+    llm_client: The LLM client.
+    prompt: The prompt asking for a list of PaymentItems.
+
+  Yields:
+    The PaymentItems in the order they are generated.
+
+  Raises:
+    json.JSONDecodeError: If the generated JSON is not valid.
+    ValidationError: If a generated item is not a valid PaymentItem.
+  """
+  parser = JsonArrayStreamParser()
+  stream = await llm_client.aio.models.generate_content_stream(
       model="gemini-2.5-flash",
       contents=prompt,
       config={
           "response_mime_type": "application/json",
           "response_schema": list[PaymentItem],
-      }
+      },
   )
   try:
-    items: list[PaymentItem] = llm_response.parsed
+    async for chunk in stream:
+      for element in parser.feed(chunk.text or ""):
+        yield PaymentItem.model_validate(element)
+  finally:
+    # Stops the generation if the caller stops reading early.
+    await stream.aclose()
 
-    current_time = datetime.now(timezone.utc)
-    item_count = 0
-    for item in items:
-      item_count += 1
-      await _create_and_add_cart_mandate_artifact(
-          item, item_count, current_time, updater
-      )
-    risk_data = _collect_risk_data(updater)
-    updater.add_artifact([
-        Part(root=DataPart(data={"risk_data": risk_data})),
-    ])
-    await updater.complete()
-  except ValidationError as e:
-    error_message = updater.new_agent_message(
-        parts=[Part(root=TextPart(text=f"Invalid CartMandate list: {e}"))]
-    )
-    await updater.failed(message=error_message)
-    return
+
+@functools.cache
+def _get_product_catalog() -> ProductCatalog | None:
+  """Loads the local product catalog on first use, if one is configured."""
+  if not _PRODUCT_CATALOG_PATH:
+    return None
+  product_catalog = ProductCatalog.from_file(
+      _PRODUCT_CATALOG_PATH, vector_index=_PRODUCT_CATALOG_VECTOR_INDEX
+  )
+  logging.info(
+      "Loaded %d products from %s.", len(product_catalog), _PRODUCT_CATALOG_PATH
+  )
+  return product_catalog
+
+
+def _get_item_count(data_parts: list[dict[str, Any]]) -> int:
+  """Returns the number of items requested, within the supported range.
+
+  Raises:
+    ValueError: If the item count is not an integer.
+  """
+  item_count = message_utils.find_data_part("item_count", data_parts)
+  if not item_count:
+    return _DEFAULT_ITEM_COUNT
+  try:
+    item_count = int(item_count)
+  except (TypeError, ValueError):
+    raise ValueError(f"Invalid item_count: {item_count!r}") from None
+  return max(1, min(item_count, _MAX_ITEM_COUNT))
 
 
 async def _create_and_add_cart_mandate_artifact(
     item: PaymentItem,
-    item_count: int,
+    merchant_name: str,
     current_time: datetime,
     updater: TaskUpdater,
 ) -> None:
-  """Creates a CartMandate and adds it as an artifact."""
+  """Creates a CartMandate and adds it as an artifact.
+
+  Cart and order IDs are unique across requests, merchant replicas and
+  restarts, so that concurrent shoppers never share a cart.
+  """
+  cart_id = new_ulid()
   payment_request = PaymentRequest(
       method_data=[
           PaymentMethodData(
@@ -114,22 +269,23 @@ async def _create_and_add_cart_mandate_artifact(
           )
       ],
       details=PaymentDetailsInit(
-          id=f"order_{item_count}",
+          id=f"order_{cart_id}",
           display_items=[item],
           total=PaymentItem(
               label="Total",
-              amount=item.amount,
+              # Copied, so that updating the total leaves the item unchanged.
+              amount=item.amount.model_copy(),
           ),
       ),
       options=PaymentOptions(request_shipping=True),
   )
 
   cart_contents = CartContents(
-      id=f"cart_{item_count}",
+      id=f"cart_{cart_id}",
       user_cart_confirmation_required=True,
       payment_request=payment_request,
       cart_expiry=(current_time + timedelta(minutes=30)).isoformat(),
-      merchant_name="Generic Merchant",
+      merchant_name=merchant_name,
   )
 
   cart_mandate = CartMandate(contents=cart_contents)
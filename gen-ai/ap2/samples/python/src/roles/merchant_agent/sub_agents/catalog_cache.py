@@ -0,0 +1,127 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A cache of the PaymentItems generated for a shopping intent.
+
+Many shoppers describe their intent the same way (e.g. "a coffee maker"), so
+the items generated for one IntentMandate can be offered again for the next,
+without calling the LLM.
+
+Intents are normalized before lookup, so that case, punctuation and spacing do
+not matter. Optionally, an intent may also match a cached intent whose words
+are similar enough (Jaccard similarity of the word sets).
+
+Only the PaymentItems are cached. Each request still builds its own
+CartMandates, with new cart IDs, from fresh copies of the items.
+"""
+
+import re
+
+from ap2.types.payment_request import PaymentItem
+from common.ttl_store import TtlStore
+
+_NON_WORD_CHARACTERS = re.compile(r"[\W_]+")
+
+
+class CatalogCache:
+  """A TTL-bounded cache of generated PaymentItems, keyed by intent."""
+
+  def __init__(
+      self,
+      ttl_seconds: float,
+      similarity_threshold: float | None = None,
+      max_entries: int = 10_000,
+  ):
+    """Initialization.
+
+    Args:
+      ttl_seconds: How long generated items may be offered again.
+      similarity_threshold: If set, an intent without an exact match may use
+        the items of the most similar cached intent, provided their
+        similarity is at least this value (between 0 and 1).
+      max_entries: The maximum number of intents cached.
+    """
+    self._similarity_threshold = similarity_threshold
+    self._items: TtlStore[list[dict]] = TtlStore(ttl_seconds, max_entries)
+    # The words of each cached intent, for similarity lookups.
+    self._words: dict[str, frozenset[str]] = {}
+
+  def get(self, intent: str, item_count: int) -> list[PaymentItem] | None:
+    """Returns fresh copies of the items cached for an intent.
+
+    Args:
+      intent: The natural language description of the user's intent.
+      item_count: The number of items requested.
+
+    Returns:
+      The cached PaymentItems, or None if there are none.
+    """
+    normalized_intent = normalize_intent(intent)
+    items = self._items.get(_key(normalized_intent, item_count))
+    if items is None and self._similarity_threshold is not None:
+      items = self._get_similar(normalized_intent, item_count)
+    if items is None:
+      return None
+    return [PaymentItem.model_validate(item) for item in items]
+
+  def put(
+      self, intent: str, item_count: int, items: list[PaymentItem]
+  ) -> None:
+    """Caches the items generated for an intent.
+
+    Args:
+      intent: The natural language description of the user's intent.
+      item_count: The number of items requested.
+      items: The generated PaymentItems.
+    """
+    normalized_intent = normalize_intent(intent)
+    key = _key(normalized_intent, item_count)
+    self._items.set(key, [item.model_dump() for item in items])
+    if self._similarity_threshold is not None:
+      self._words[key] = frozenset(normalized_intent.split())
+
+  def _get_similar(
+      self, normalized_intent: str, item_count: int
+  ) -> list[dict] | None:
+    """Returns the items of the most similar cached intent, if similar enough."""
+    words = frozenset(normalized_intent.split())
+    best_items = None
+    best_similarity = self._similarity_threshold
+    for key, cached_words in list(self._words.items()):
+      cached_items = self._items.get(key)
+      if cached_items is None:
+        del self._words[key]
+        continue
+      if not key.startswith(f"{item_count}:"):
+        continue
+      similarity = _jaccard_similarity(words, cached_words)
+      if similarity >= best_similarity:
+        best_items = cached_items
+        best_similarity = similarity
+    return best_items
+
+
+def normalize_intent(intent: str) -> str:
+  """Normalizes an intent's case, punctuation and spacing."""
+  return " ".join(_NON_WORD_CHARACTERS.sub(" ", intent.casefold()).split())
+
+
+def _key(normalized_intent: str, item_count: int) -> str:
+  return f"{item_count}:{normalized_intent}"
+
+
+def _jaccard_similarity(a: frozenset[str], b: frozenset[str]) -> float:
+  if not a and not b:
+    return 1.0
+  return len(a & b) / len(a | b)
@@ -0,0 +1,334 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local, indexed product catalog for the merchant agent.
+
+Products are loaded from a CSV, JSONL or Parquet file with the columns:
+  sku, label, price (required)
+  description, currency, merchant, refund_period (optional)
+
+An inverted index from words to products answers IntentMandate searches
+in-process. Results are ranked by the inverse document frequency of the
+matching words, and filtered by the mandate's `skus`, `merchants` and
+`requires_refundability` fields.
+
+If numpy is installed, scores are accumulated and filtered as arrays, which
+keeps searches fast for catalogs of millions of products. An optional vector
+index of hashed character trigrams, which requires numpy, matches intents with
+misspelled or partial words when the inverted index finds nothing.
+
+Parquet files require pyarrow. Both are in the samples' `catalog` extra.
+"""
+
+import array
+import collections
+import csv
+import dataclasses
+import json
+import math
+import os
+import re
+import zlib
+
+from ap2.types.mandate import IntentMandate
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentItem
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    ["a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"]
+)
+_VECTOR_DIMENSIONS = 64
+_MIN_VECTOR_SIMILARITY = 0.5
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Product:
+  """A product offered by the merchant."""
+
+  sku: str
+  label: str
+  price: float
+  description: str = ""
+  currency: str = "USD"
+  merchant: str = "Generic Merchant"
+  refund_period: int = 30
+
+  def to_payment_item(self) -> PaymentItem:
+    """Returns the PaymentItem offering this product."""
+    return PaymentItem(
+        label=self.label,
+        amount=PaymentCurrencyAmount(currency=self.currency, value=self.price),
+        refund_period=self.refund_period,
+    )
+
+
+class ProductCatalog:
+  """An in-memory product catalog with an inverted index for search."""
+
+  def __init__(self, products: list[Product], vector_index: bool = False):
+    """Initialization.
+
+    Args:
+      products: The products in the catalog.
+      vector_index: Whether to also build the trigram vector index, used when
+        no product contains the intent's words.
+    """
+    self._products = products
+    self._index_by_sku = {
+        product.sku: index for index, product in enumerate(products)
+    }
+    postings = collections.defaultdict(lambda: array.array("I"))
+    for index, product in enumerate(products):
+      for word in set(_words(f"{product.label} {product.description}")):
+        postings[word].append(index)
+    self._postings = dict(postings)
+
+    # Per-product arrays used to filter scores, if numpy is installed.
+    self._np = _import_numpy()
+    if self._np is not None:
+      np = self._np
+      self._refundable = np.fromiter(
+          (product.refund_period > 0 for product in products),
+          dtype=bool,
+          count=len(products),
+      )
+      self._merchant_codes: dict[str, int] = {}
+      self._merchant_of = np.fromiter(
+          (
+              self._merchant_codes.setdefault(
+                  product.merchant.casefold(), len(self._merchant_codes)
+              )
+              for product in products
+          ),
+          dtype=np.int32,
+          count=len(products),
+      )
+
+    self._vectors = None
+    if vector_index:
+      if self._np is None:
+        raise ImportError(
+            "The product catalog vector index requires numpy: pip install numpy"
+        )
+      self._vectors = _build_vectors(products, self._np)
+
+  def __len__(self) -> int:
+    return len(self._products)
+
+  @classmethod
+  def from_file(cls, path: str, vector_index: bool = False) -> "ProductCatalog":
+    """Loads a catalog from a CSV, JSONL or Parquet file.
+
+    Args:
+      path: The path of the file. Its format is determined by its extension.
+      vector_index: Whether to also build the trigram vector index.
+
+    Returns:
+      The loaded ProductCatalog.
+
+    Raises:
+      ValueError: If the file format is not supported.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+      rows = _read_csv(path)
+    elif extension in (".jsonl", ".ndjson"):
+      rows = _read_jsonl(path)
+    elif extension == ".parquet":
+      rows = _read_parquet(path)
+    else:
+      raise ValueError(f"Unsupported catalog file format: {extension}")
+    return cls([_product_from_row(row) for row in rows], vector_index)
+
+  def search(self, intent_mandate: IntentMandate, limit: int) -> list[Product]:
+    """Finds the products best matching an IntentMandate.
+
+    If the mandate lists SKUs, only those products are considered, and they
+    are returned even when they contain none of the intent's words.
+
+    Args:
+      intent_mandate: The user's IntentMandate.
+      limit: The maximum number of products to return.
+
+    Returns:
+      Up to `limit` products, best match first.
+    """
+    idfs = self._idfs(intent_mandate.natural_language_description)
+    if intent_mandate.skus:
+      scores = self._score_skus(intent_mandate.skus, idfs)
+    elif idfs and self._np is not None:
+      return self._search_arrays(intent_mandate, idfs, limit)
+    else:
+      scores = {}
+      for word, idf in idfs.items():
+        for index in self._postings[word]:
+          scores[index] = scores.get(index, 0.0) + idf
+    if not scores and self._vectors is not None and not intent_mandate.skus:
+      scores = self._score_vectors(intent_mandate.natural_language_description)
+
+    allowed_merchants = {
+        merchant.casefold() for merchant in intent_mandate.merchants or []
+    }
+    ranked = sorted(scores.items(), key=lambda score: (-score[1], score[0]))
+    results = []
+    for index, _ in ranked:
+      product = self._products[index]
+      if allowed_merchants and product.merchant.casefold() not in (
+          allowed_merchants
+      ):
+        continue
+      if intent_mandate.requires_refundability and product.refund_period <= 0:
+        continue
+      results.append(product)
+      if len(results) >= limit:
+        break
+    return results
+
+  def _idfs(self, text: str) -> dict[str, float]:
+    """Returns the inverse document frequency of the text's indexed words."""
+    idfs = {}
+    for word in set(_words(text)):
+      postings = self._postings.get(word)
+      if postings:
+        idfs[word] = math.log(1 + len(self._products) / len(postings))
+    return idfs
+
+  def _score_skus(
+      self, skus: list[str], idfs: dict[str, float]
+  ) -> dict[int, float]:
+    """Scores the products with the given SKUs."""
+    scores = {}
+    for sku in skus:
+      index = self._index_by_sku.get(sku)
+      if index is None:
+        continue
+      product = self._products[index]
+      words = set(_words(f"{product.label} {product.description}"))
+      scores[index] = sum(idf for word, idf in idfs.items() if word in words)
+    return scores
+
+  def _search_arrays(
+      self,
+      intent_mandate: IntentMandate,
+      idfs: dict[str, float],
+      limit: int,
+  ) -> list[Product]:
+    """Scores, filters and ranks the matching products using numpy."""
+    np = self._np
+    scores = np.zeros(len(self._products), dtype=np.float64)
+    for word, idf in idfs.items():
+      scores[np.frombuffer(self._postings[word], dtype=np.uint32)] += idf
+
+    if intent_mandate.requires_refundability:
+      scores[~self._refundable] = 0
+    if intent_mandate.merchants:
+      merchant_codes = [
+          self._merchant_codes[merchant.casefold()]
+          for merchant in intent_mandate.merchants
+          if merchant.casefold() in self._merchant_codes
+      ]
+      scores[~np.isin(self._merchant_of, merchant_codes)] = 0
+
+    candidates = np.flatnonzero(scores)
+    if len(candidates) > limit:
+      # Keeps every candidate tied with the last of the best, so that ties are
+      # broken by catalog order as in the pure Python search.
+      threshold = np.partition(scores[candidates], -limit)[-limit]
+      candidates = candidates[scores[candidates] >= threshold]
+    ranked = sorted(
+        candidates.tolist(), key=lambda index: (-scores[index], index)
+    )
+    return [self._products[index] for index in ranked[:limit]]
+
+  def _score_vectors(self, text: str) -> dict[int, float]:
+    """Scores the products whose trigram vectors are similar to the text."""
+    np = self._np
+    similarities = self._vectors @ _trigram_vector(text, np)
+    candidates = np.flatnonzero(similarities >= _MIN_VECTOR_SIMILARITY)
+    return {int(index): float(similarities[index]) for index in candidates}
+
+
+def _words(text: str) -> list[str]:
+  """Splits text into lowercase words, without stop words."""
+  return [word for word in _WORD.findall(text.lower()) if word not in _STOP_WORDS]
+
+
+def _trigram_vector(text: str, np):
+  """Returns the normalized hashed character trigram vector of the text."""
+  vector = np.zeros(_VECTOR_DIMENSIONS, dtype=np.float32)
+  for word in _words(text):
+    padded = f" {word} "
+    for i in range(len(padded) - 2):
+      trigram = padded[i : i + 3].encode("utf-8")
+      vector[zlib.crc32(trigram) % _VECTOR_DIMENSIONS] += 1.0
+  norm = np.linalg.norm(vector)
+  return vector / norm if norm else vector
+
+
+def _build_vectors(products: list[Product], np):
+  """Builds the matrix of product label trigram vectors."""
+  vectors = np.empty((len(products), _VECTOR_DIMENSIONS), dtype=np.float32)
+  for index, product in enumerate(products):
+    vectors[index] = _trigram_vector(product.label, np)
+  return vectors
+
+
+def _import_numpy():
+  """Returns the numpy module, or None if it is not installed."""
+  try:
+    import numpy  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    return None
+  return numpy
+
+
+def _product_from_row(row: dict) -> Product:
+  """Creates a Product from a row of the catalog file.
+
+  Missing optional columns, or empty values in them, take the Product defaults.
+  """
+  optional_fields = {
+      field: row[field]
+      for field in ("description", "currency", "merchant", "refund_period")
+      if row.get(field) not in (None, "")
+  }
+  if "refund_period" in optional_fields:
+    optional_fields["refund_period"] = int(optional_fields["refund_period"])
+  return Product(
+      sku=str(row["sku"]),
+      label=str(row["label"]),
+      price=float(row["price"]),
+      **optional_fields,
+  )
+
+
+def _read_csv(path: str) -> list[dict]:
+  with open(path, "r", encoding="utf-8", newline="") as f:
+    return list(csv.DictReader(f))
+
+
+def _read_jsonl(path: str) -> list[dict]:
+  with open(path, "r", encoding="utf-8") as f:
+    return [json.loads(line) for line in f if line.strip()]
+
+
+def _read_parquet(path: str) -> list[dict]:
+  try:
+    import pyarrow.parquet as pq  # pylint: disable=g-import-not-at-top
+  except ImportError as e:
+    raise ImportError(
+        "Parquet catalogs require pyarrow: pip install pyarrow"
+    ) from e
+  return pq.read_table(path).to_pylist()
@@ -18,6 +18,7 @@ Each agent uses individual tools to handle distinct tasks throughout the
 shopping and purchasing process.
 """
 
+import asyncio
 import logging
 
 from pydantic import ValidationError
@@ -25,6 +26,7 @@ from typing import Any
 
 from a2a.server.tasks.task_updater import TaskUpdater
 from a2a.types import DataPart
+from a2a.types import Message
 from a2a.types import Part
 from a2a.types import Task
 from a2a.types import TextPart
@@ -38,19 +40,28 @@ from ap2.types.payment_receipt import PAYMENT_RECEIPT_DATA_KEY
 from ap2.types.payment_receipt import PaymentReceipt
 from ap2.types.payment_request import PaymentCurrencyAmount
 from ap2.types.payment_request import PaymentItem
+from common import agent_registry
 from common import artifact_utils
 from common import message_utils
 from common.a2a_extension_utils import EXTENSION_URI
 from common.a2a_message_builder import A2aMessageBuilder
-from common.payment_remote_a2a_client import PaymentRemoteA2aClient
 
-# A map of payment method types to their corresponding processor agent URLs.
-# This is the set of linked Merchant Payment Processor Agents this Merchant
-# is integrated with.
+# A map of payment method types to the registry roles of their processor
+# agents. This is the set of linked Merchant Payment Processor Agents this
+# Merchant is integrated with.
 _PAYMENT_PROCESSORS_BY_PAYMENT_METHOD_TYPE = {
-    "CARD": "http://localhost:8003/a2a/merchant_payment_processor_agent",
+    "CARD": "merchant_payment_processor_agent",
 }
 
+agent_registry.get_registry().register_default(
+    "merchant_payment_processor_agent",
+    ["http://localhost:8003/a2a/merchant_payment_processor_agent"],
+)
+
+# The deadline for the processor to initiate a payment. This includes the
+# processor's own hops to the credentials provider.
+_PAYMENT_TIMEOUT_SECONDS = 300.0
+
 # A placeholder for a JSON Web Token (JWT) used for merchant authorization.
 _FAKE_JWT = "eyJhbGciOiJSUzI1NiIsImtpZIwMjQwOTA..."
 
@@ -100,29 +111,25 @@ async def update_cart(
         ContactAddress.model_validate(shipping_address)
     )
 
-    # Add new shipping and tax costs to the PaymentRequest:
+    payment_request = cart_mandate.contents.payment_request
+
+    # Add new shipping and tax costs to the PaymentRequest, in the currency
+    # of the cart:
+    currency = payment_request.details.total.amount.currency
     tax_and_shipping_costs = [
         PaymentItem(
             label="Shipping",
-            amount=PaymentCurrencyAmount(currency="USD", value=2.00),
+            amount=PaymentCurrencyAmount(currency=currency, value=2.00),
         ),
         PaymentItem(
             label="Tax",
-            amount=PaymentCurrencyAmount(currency="USD", value=1.50),
+            amount=PaymentCurrencyAmount(currency=currency, value=1.50),
         ),
     ]
 
-    payment_request = cart_mandate.contents.payment_request
-
-    if payment_request.details.display_items is None:
-      payment_request.details.display_items = tax_and_shipping_costs
-    else:
-      payment_request.details.display_items.extend(tax_and_shipping_costs)
-
-    # Recompute the total amount of the PaymentRequest:
-    payment_request.details.total.amount.value = sum(
-        item.amount.value for item in payment_request.details.display_items
-    )
+    # Adds the costs to the total of the PaymentRequest in exact minor units,
+    # without summing the items already in the cart again.
+    payment_request.details.add_display_items(tax_and_shipping_costs)
 
     # A base64url-encoded JSON Web Token (JWT) that digitally signs the cart
     # contents by the merchant's private key.
@@ -172,58 +179,37 @@ async def initiate_payment(
   payment_method_type = (
       payment_mandate.payment_mandate_contents.payment_response.method_name
   )
-  processor_url = _PAYMENT_PROCESSORS_BY_PAYMENT_METHOD_TYPE.get(
+  processor_role = _PAYMENT_PROCESSORS_BY_PAYMENT_METHOD_TYPE.get(
       payment_method_type
   )
 
-  if not processor_url:
+  if not processor_role:
     await _fail_task(
         updater, f"No payment processor found for method: {payment_method_type}"
     )
     return
 
-  payment_processor_agent = PaymentRemoteA2aClient(
-      name="payment_processor_agent",
-      base_url=processor_url,
+  payment_processor_agent = agent_registry.get_registry().client(
+      processor_role,
       required_extensions={
           EXTENSION_URI,
       },
   )
-
-  message_builder = (
-      A2aMessageBuilder()
-      .set_context_id(updater.context_id)
-      .add_text("initiate_payment")
-      .add_data(PAYMENT_MANDATE_DATA_KEY, payment_mandate.model_dump())
-      .add_data("risk_data", risk_data)
-      .add_data("debug_mode", debug_mode)
-  )
-
   challenge_response = (
       message_utils.find_data_part("challenge_response", data_parts) or ""
   )
-  if challenge_response:
-    message_builder.add_data("challenge_response", challenge_response)
 
-  payment_processor_task_id = _get_payment_processor_task_id(current_task)
-  if payment_processor_task_id:
-    message_builder.set_task_id(payment_processor_task_id)
-
-  task = await payment_processor_agent.send_a2a_message(message_builder.build())
-
-  # Pass the payment receipt back to the shopping agent if it exists.
-  payment_receipts = artifact_utils.find_canonical_objects(
-      task.artifacts, PAYMENT_RECEIPT_DATA_KEY, PaymentReceipt
+  message = _build_payment_processor_message(
+      payment_mandate,
+      risk_data,
+      challenge_response,
+      updater,
+      current_task,
+      debug_mode,
   )
-  if payment_receipts:
-    payment_receipt = artifact_utils.only(payment_receipts)
-    await updater.add_artifact([
-        Part(
-            root=DataPart(
-                data={PAYMENT_RECEIPT_DATA_KEY: payment_receipt.model_dump()}
-            )
-        )
-    ])
+  async with asyncio.timeout(_PAYMENT_TIMEOUT_SECONDS):
+    task = await payment_processor_agent.send_a2a_message(message)
+    await _forward_payment_receipt(task, updater)
 
   await updater.update_status(
       state=task.status.state,
@@ -268,6 +254,59 @@ async def dpc_finish(
   await updater.complete()
 
 
+def _build_payment_processor_message(
+    payment_mandate: PaymentMandate,
+    risk_data: Any,
+    challenge_response: str,
+    updater: TaskUpdater,
+    current_task: Task | None,
+    debug_mode: bool = False,
+) -> Message:
+  """Builds the message asking the payment processor to initiate a payment.
+
+  Args:
+    payment_mandate: The PaymentMandate to be paid.
+    risk_data: The risk data collected during the shopping journey.
+    challenge_response: The response to a transaction challenge, if any.
+    updater: The TaskUpdater of the merchant's task.
+    current_task: The current task, used to find the processor's task ID.
+    debug_mode: Whether the agent is in debug mode.
+
+  Returns:
+    The message to be sent to the payment processor.
+  """
+  message_builder = (
+      A2aMessageBuilder()
+      .set_context_id(updater.context_id)
+      .add_text("initiate_payment")
+      .add_data(PAYMENT_MANDATE_DATA_KEY, payment_mandate.model_dump())
+      .add_data("risk_data", risk_data)
+      .add_data("debug_mode", debug_mode)
+  )
+  if challenge_response:
+    message_builder.add_data("challenge_response", challenge_response)
+
+  payment_processor_task_id = _get_payment_processor_task_id(current_task)
+  if payment_processor_task_id:
+    message_builder.set_task_id(payment_processor_task_id)
+  return message_builder.build()
+
+
+async def _forward_payment_receipt(task: Task, updater: TaskUpdater) -> None:
+  """Passes the payment receipt back to the shopping agent if it exists."""
+  payment_receipt = artifact_utils.only_canonical_object(
+      task.artifacts, PAYMENT_RECEIPT_DATA_KEY, PaymentReceipt, required=False
+  )
+  if payment_receipt:
+    await updater.add_artifact([
+        Part(
+            root=DataPart(
+                data={PAYMENT_RECEIPT_DATA_KEY: payment_receipt.model_dump()}
+            )
+        )
+    ])
+
+
 def _get_payment_processor_task_id(task: Task | None) -> str | None:
   """Returns the task ID of the payment processor task, if it exists.
 
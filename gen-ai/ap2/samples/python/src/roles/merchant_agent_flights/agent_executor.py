@@ -26,11 +26,14 @@ class FlightMerchantExecutor(BaseServerExecutor):
     _system_prompt = """
     You are a merchant agent responsible for selling flights.
     Your only job is to receive purchase requests and validate them.
-    Always use the 'process_purchase_request' tool.
+    Use the 'evaluate_flight_offers' tool when asked to evaluate a list of
+    candidate flight offers, and the 'process_purchase_request' tool for a
+    purchase request.
     """
 
     def __init__(self, supported_extensions: list[dict[str, Any]] = None):
         agent_tools = [
             tools.process_purchase_request,
+            tools.evaluate_flight_offers,
         ]
         super().__init__(supported_extensions, agent_tools, self._system_prompt)
@@ -0,0 +1,343 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declarative rules checking flight offers against a structured mandate.
+
+The constraints of a StructuredIntentMandate are compiled once into a set of
+rules, each checking one field of an offer (a flight_details dict):
+
+  * Equals: the field equals a value, ignoring case for strings.
+  * InRange: the field is within inclusive bounds.
+  * OneOf: the field is one of a set of values, ignoring case for strings.
+  * PriceCap: the price, in the mandate's currency, is at most a cap. Prices
+    are compared exactly, in minor units of the currency, and converted from
+    the offer's currency if a converter is given, e.g. common.fx.
+
+An offer gives its price either as a "price" and a "currency", or as a
+"price_gbp".
+
+Checking an offer evaluates every rule in one pass and reports every
+violation, rather than stopping at the first one. Many offers can be checked
+at once, e.g. to pre-filter a merchant's inventory:
+
+  rules = compile_constraints(mandate.constraints)
+  allowed = rules.filter(offers)
+"""
+
+import abc
+from collections.abc import Callable, Iterable, Mapping
+import dataclasses
+import functools
+from typing import Any
+
+from ap2.types import money
+from roles.shopping_agent_flights.custom_mandate import FlightConstraints
+
+# Converts an amount from one currency to another:
+# convert(amount, from_currency, to_currency). Raises a ValueError if it
+# cannot.
+CurrencyConverter = Callable[[float, str, str], float]
+
+# The offer fields holding the price, and its currency.
+PRICE_FIELD = "price"
+CURRENCY_FIELD = "currency"
+# The offer field holding the price in pounds sterling, if the others are not
+# set.
+PRICE_GBP_FIELD = "price_gbp"
+
+
+@dataclasses.dataclass(frozen=True)
+class Violation:
+    """A field of an offer that breaks a rule of the mandate."""
+
+    rule: str
+    field: str
+    actual: Any
+    message: str
+
+
+@dataclasses.dataclass(frozen=True)
+class Rule(abc.ABC):
+    """A check of one field of an offer."""
+
+    name: str
+    field: str
+
+    def extract(self, offer: Mapping[str, Any]) -> Any:
+        """Returns the value the rule checks from an offer.
+
+        Raises:
+          KeyError: If the offer does not have the value; its argument is the
+            missing field.
+        """
+        return offer[self.field]
+
+    @abc.abstractmethod
+    def allows(self, value: Any) -> bool:
+        """Returns True if the value keeps to the rule."""
+
+    @abc.abstractmethod
+    def check(self, value: Any) -> str | None:
+        """Returns why the value breaks the rule, or None if it does not."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Equals(Rule):
+    """The field equals a value, ignoring case for strings."""
+
+    expected: Any
+
+    def __post_init__(self):
+        object.__setattr__(self, "_normalized", _normalize(self.expected))
+
+    def allows(self, value: Any) -> bool:
+        return _normalize(value) == self._normalized
+
+    def check(self, value: Any) -> str | None:
+        if self.allows(value):
+            return None
+        return f"expected '{self.expected}', but the offer has '{value}'"
+
+
+@dataclasses.dataclass(frozen=True)
+class InRange(Rule):
+    """The field is within inclusive bounds; either may be None."""
+
+    minimum: float | None = None
+    maximum: float | None = None
+
+    def allows(self, value: Any) -> bool:
+        return self.check(value) is None
+
+    def check(self, value: Any) -> str | None:
+        if not _is_number(value):
+            return f"expected a number, but the offer has '{value}'"
+        if self.minimum is not None and value < self.minimum:
+            return f"{value} is below the minimum of {self.minimum}"
+        if self.maximum is not None and value > self.maximum:
+            return f"{value} is above the maximum of {self.maximum}"
+        return None
+
+
+@dataclasses.dataclass(frozen=True)
+class OneOf(Rule):
+    """The field is one of a set of values, ignoring case for strings."""
+
+    allowed: frozenset[Any]
+
+    def allows(self, value: Any) -> bool:
+        return _normalize(value) in self.allowed
+
+    def check(self, value: Any) -> str | None:
+        if self.allows(value):
+            return None
+        return (
+            f"'{value}' is not one of {', '.join(sorted(map(str, self.allowed)))}"
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class PriceCap(Rule):
+    """The price, converted to the cap's currency, is at most the cap.
+
+    The value checked is a (price, currency) pair.
+    """
+
+    currency: str
+    max_minor_units: int
+    convert: CurrencyConverter | None = None
+
+    def __post_init__(self):
+        object.__setattr__(
+            self, "_scale", 10 ** money.minor_unit_exponent(self.currency)
+        )
+
+    def extract(self, offer: Mapping[str, Any]) -> tuple[Any, str]:
+        if PRICE_FIELD in offer:
+            # A price without its currency is not assumed to be in pounds.
+            if CURRENCY_FIELD not in offer:
+                raise KeyError(CURRENCY_FIELD)
+            return offer[PRICE_FIELD], str(offer[CURRENCY_FIELD]).upper()
+        if PRICE_GBP_FIELD in offer:
+            return offer[PRICE_GBP_FIELD], "GBP"
+        raise KeyError(PRICE_FIELD)
+
+    def price(self, value: tuple[Any, str]) -> float:
+        """Returns a price in the cap's currency.
+
+        Raises:
+          ValueError: If the price is not a number, or cannot be converted.
+        """
+        price, currency = value
+        if not _is_number(price):
+            raise ValueError(f"expected a price, but the offer has '{price}'")
+        if currency == self.currency:
+            return price
+        if self.convert is None:
+            raise ValueError(
+                f"the price is in {currency}, which cannot be compared with a"
+                f" cap in {self.currency}"
+            )
+        return self.convert(price, currency, self.currency)
+
+    def allows(self, value: tuple[Any, str]) -> bool:
+        try:
+            price = self.price(value)
+        except ValueError:
+            return False
+        # Most prices are far from the cap, and the float comparison is
+        # enough; only those within a minor unit of it are rounded exactly.
+        scaled = price * self._scale
+        if scaled < self.max_minor_units - 1:
+            return True
+        return (
+            scaled <= self.max_minor_units + 1
+            and money.to_minor_units(price, self.currency)
+            <= self.max_minor_units
+        )
+
+    def check(self, value: tuple[Any, str]) -> str | None:
+        if self.allows(value):
+            return None
+        try:
+            price = self.price(value)
+        except ValueError as e:
+            return str(e)
+        cap = money.from_minor_units(self.max_minor_units, self.currency)
+        offered = f"{value[0]:g} {value[1]}"
+        if value[1] != self.currency:
+            offered += f" ({price:.2f} {self.currency})"
+        return f"{offered} exceeds the limit of {cap:g} {self.currency}"
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledConstraints:
+    """The rules of a mandate's constraints, ready to check offers."""
+
+    rules: tuple[Rule, ...]
+
+    def evaluate(self, offer: Mapping[str, Any]) -> list[Violation]:
+        """Returns every violation of the rules by an offer."""
+        violations = []
+        for rule in self.rules:
+            try:
+                value = rule.extract(offer)
+            except KeyError as e:
+                missing = e.args[0] if e.args else rule.field
+                violations.append(
+                    Violation(
+                        rule.name,
+                        rule.field,
+                        None,
+                        f"{rule.name}: the offer has no {missing}",
+                    )
+                )
+                continue
+            reason = rule.check(value)
+            if reason is not None:
+                violations.append(
+                    Violation(
+                        rule.name, rule.field, value, f"{rule.name}: {reason}"
+                    )
+                )
+        return violations
+
+    def evaluate_many(
+        self, offers: Iterable[Mapping[str, Any]]
+    ) -> list[list[Violation]]:
+        """Returns the violations of each offer, in the same order."""
+        return [self.evaluate(offer) for offer in offers]
+
+    def allows(self, offer: Mapping[str, Any]) -> bool:
+        """Returns True if the offer keeps to every rule.
+
+        This stops at the first violation, without reporting it, so it is
+        faster than `evaluate` for rejecting offers.
+        """
+        for rule in self.rules:
+            try:
+                if not rule.allows(rule.extract(offer)):
+                    return False
+            except KeyError:
+                return False
+        return True
+
+    def filter(
+        self, offers: Iterable[Mapping[str, Any]]
+    ) -> list[Mapping[str, Any]]:
+        """Returns the offers that keep to every rule, in the same order."""
+        return [offer for offer in offers if self.allows(offer)]
+
+    def price(self, offer: Mapping[str, Any]) -> float:
+        """Returns the price of an allowed offer in the mandate's currency."""
+        (price_cap,) = (r for r in self.rules if isinstance(r, PriceCap))
+        return price_cap.price(price_cap.extract(offer))
+
+
+def compile_constraints(
+    constraints: FlightConstraints, convert: CurrencyConverter | None = None
+) -> CompiledConstraints:
+    """Compiles the constraints of a structured mandate into rules.
+
+    The rules of identical constraints are compiled once, and shared.
+
+    Args:
+      constraints: The constraints of the mandate.
+      convert: Converts prices to the mandate's currency, if they differ.
+
+    Returns:
+      The rules.
+    """
+    return _compile(constraints.model_dump_json(), convert)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(
+    constraints_json: str, convert: CurrencyConverter | None
+) -> CompiledConstraints:
+    constraints = FlightConstraints.model_validate_json(constraints_json)
+    rules: list[Rule] = [
+        Equals("Destination Mismatch", "destination", constraints.destination),
+        PriceCap(
+            "Price Exceeds Limit",
+            PRICE_FIELD,
+            currency=constraints.currency.upper(),
+            max_minor_units=money.to_minor_units(
+                constraints.max_price, constraints.currency
+            ),
+            convert=convert,
+        ),
+    ]
+    if constraints.allowed_carriers is not None:
+        rules.append(
+            OneOf(
+                "Carrier Not Allowed",
+                "carrier",
+                frozenset(map(_normalize, constraints.allowed_carriers)),
+            )
+        )
+    if constraints.max_stops is not None:
+        rules.append(
+            InRange("Too Many Stops", "stops", maximum=constraints.max_stops)
+        )
+    return CompiledConstraints(tuple(rules))
+
+
+def _is_number(value: Any) -> bool:
+    # A bool is an int in Python, but True is not a price or a count of stops.
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _normalize(value: Any) -> Any:
+    return value.casefold() if isinstance(value, str) else value
@@ -0,0 +1,198 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for mandate_rules."""
+
+from absl.testing import absltest
+
+from roles.merchant_agent_flights import mandate_rules
+from roles.shopping_agent_flights.custom_mandate import FlightConstraints
+
+
+def _convert(amount: float, from_currency: str, to_currency: str) -> float:
+    rates = {("GBP", "EUR"): 1.25, ("USD", "EUR"): 0.5}
+    try:
+        return amount * rates[(from_currency, to_currency)]
+    except KeyError:
+        raise ValueError(f"No rate from {from_currency}") from None
+
+
+def _offer(**fields):
+    offer = {
+        "destination": "Paris",
+        "price": 400,
+        "currency": "EUR",
+        "carrier": "BA",
+        "stops": 0,
+    }
+    offer.update(fields)
+    return {key: value for key, value in offer.items() if value is not None}
+
+
+class CompileConstraintsTest(absltest.TestCase):
+
+    def test_compiles_a_rule_per_constraint(self):
+        rules = mandate_rules.compile_constraints(
+            FlightConstraints(
+                destination="Paris",
+                max_price=500,
+                currency="EUR",
+                allowed_carriers=["BA"],
+                max_stops=1,
+            )
+        )
+
+        self.assertEqual(
+            [type(rule) for rule in rules.rules],
+            [
+                mandate_rules.Equals,
+                mandate_rules.PriceCap,
+                mandate_rules.OneOf,
+                mandate_rules.InRange,
+            ],
+        )
+
+    def test_leaves_out_the_rules_of_unset_constraints(self):
+        rules = mandate_rules.compile_constraints(
+            FlightConstraints(destination="Paris", max_price=500)
+        )
+
+        self.assertEqual(
+            [type(rule) for rule in rules.rules],
+            [mandate_rules.Equals, mandate_rules.PriceCap],
+        )
+
+    def test_compiles_identical_constraints_once(self):
+        first = mandate_rules.compile_constraints(
+            FlightConstraints(destination="Paris", max_price=500)
+        )
+        second = mandate_rules.compile_constraints(
+            FlightConstraints(destination="Paris", max_price=500)
+        )
+
+        self.assertIs(first, second)
+
+    def test_rule_must_implement_its_checks(self):
+        with self.assertRaises(TypeError):
+            mandate_rules.Rule("Rule", "field")
+
+
+class CompiledConstraintsTest(absltest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rules = mandate_rules.compile_constraints(
+            FlightConstraints(
+                destination="paris",
+                max_price=500,
+                currency="EUR",
+                allowed_carriers=["BA", "AF"],
+                max_stops=1,
+            ),
+            convert=_convert,
+        )
+
+    def test_allows_an_offer_within_every_constraint(self):
+        offer = _offer(destination="PARIS", carrier="af")
+
+        self.assertEqual(self.rules.evaluate(offer), [])
+        self.assertTrue(self.rules.allows(offer))
+
+    def test_reports_every_violation(self):
+        offer = _offer(destination="Rome", price=600, carrier="LH", stops=2)
+
+        violations = self.rules.evaluate(offer)
+
+        self.assertEqual(
+            [violation.message for violation in violations],
+            [
+                "Destination Mismatch: expected 'paris', but the offer has"
+                " 'Rome'",
+                "Price Exceeds Limit: 600 EUR exceeds the limit of 500 EUR",
+                "Carrier Not Allowed: 'LH' is not one of af, ba",
+                "Too Many Stops: 2 is above the maximum of 1",
+            ],
+        )
+        self.assertFalse(self.rules.allows(offer))
+
+    def test_compares_prices_at_the_cap_exactly(self):
+        self.assertTrue(self.rules.allows(_offer(price=500.00)))
+        self.assertTrue(self.rules.allows(_offer(price=0.1 + 499.9)))
+        self.assertFalse(self.rules.allows(_offer(price=500.01)))
+
+    def test_converts_prices_in_another_currency(self):
+        self.assertTrue(self.rules.allows(_offer(price=400, currency="gbp")))
+        self.assertEqual(
+            self.rules.evaluate(_offer(price=401, currency="GBP"))[0].message,
+            "Price Exceeds Limit: 401 GBP (501.25 EUR) exceeds the limit of"
+            " 500 EUR",
+        )
+
+    def test_reads_a_price_in_pounds(self):
+        offer = _offer(price=None, currency=None, price_gbp=400)
+
+        self.assertTrue(self.rules.allows(offer))
+        self.assertEqual(self.rules.price(offer), 500.0)
+
+    def test_reports_a_price_that_cannot_be_converted(self):
+        violations = self.rules.evaluate(_offer(currency="JPY"))
+
+        self.assertEqual(
+            [violation.message for violation in violations],
+            ["Price Exceeds Limit: No rate from JPY"],
+        )
+
+    def test_reports_a_missing_price_or_currency(self):
+        self.assertEqual(
+            self.rules.evaluate(_offer(price=None, currency=None))[0].message,
+            "Price Exceeds Limit: the offer has no price",
+        )
+        self.assertEqual(
+            self.rules.evaluate(_offer(currency=None))[0].message,
+            "Price Exceeds Limit: the offer has no currency",
+        )
+
+    def test_rejects_booleans_as_numbers(self):
+        self.assertFalse(self.rules.allows(_offer(price=True)))
+        self.assertFalse(self.rules.allows(_offer(stops=False)))
+
+    def test_filter_keeps_the_allowed_offers_in_order(self):
+        offers = [
+            _offer(price=450),
+            _offer(destination="Rome"),
+            _offer(price=300),
+        ]
+
+        self.assertEqual(self.rules.filter(offers), [offers[0], offers[2]])
+
+    def test_evaluate_many_returns_the_violations_of_each_offer(self):
+        results = self.rules.evaluate_many([_offer(), _offer(stops=3)])
+
+        self.assertEqual(results[0], [])
+        self.assertEqual([v.rule for v in results[1]], ["Too Many Stops"])
+
+    def test_without_a_converter_rejects_another_currency(self):
+        rules = mandate_rules.compile_constraints(
+            FlightConstraints(destination="Paris", max_price=500)
+        )
+
+        self.assertEqual(
+            rules.evaluate(_offer(price=10, currency="EUR"))[0].message,
+            "Price Exceeds Limit: the price is in EUR, which cannot be"
+            " compared with a cap in GBP",
+        )
+
+
+if __name__ == "__main__":
+    absltest.main()
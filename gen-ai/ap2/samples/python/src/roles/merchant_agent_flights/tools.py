@@ -16,16 +16,20 @@
 from typing import Any
 
 from a2a.server.tasks.task_updater import TaskUpdater
-from a2a.types import Part, Task, TextPart
+from a2a.types import DataPart, Part, Task, TextPart
 from ap2.types.mandate import INTENT_MANDATE_DATA_KEY
+from common import fx
 from common import message_utils
-from rich.console import Console
+from common import presentation
+from rich.markup import escape
 from rich.panel import Panel
 
-
-
+from roles.merchant_agent_flights.mandate_rules import compile_constraints
 from roles.shopping_agent_flights.custom_mandate import StructuredIntentMandate
 
+# The DataPart key of the list of candidate flights to evaluate.
+FLIGHT_OFFERS_DATA_KEY = "flight_offers"
+
 
 async def process_purchase_request(
     data_parts: list[dict[str, Any]],
@@ -33,21 +37,14 @@ async def process_purchase_request(
     current_task: Task | None,
 ) -> None:
     """Processes a flight purchase by validating against structured mandate fields."""
-    console = Console()
-    console.print(
-        "[bold blue]Flight Merchant:[/bold blue] Received purchase request..."
+    presentation.show(
+        lambda: "[bold blue]Flight Merchant:[/bold blue] Received purchase"
+        " request..."
     )
 
     try:
         # --- CHANGE: Validate against our custom structured model ---
-        mandate_data = message_utils.find_data_part(
-            INTENT_MANDATE_DATA_KEY, data_parts
-        )
-        if not mandate_data:
-            raise ValueError("IntentMandate not found in request.")
-        structured_mandate = StructuredIntentMandate.model_validate(
-            mandate_data
-        )
+        structured_mandate = _find_structured_mandate(data_parts)
 
         flight_details = message_utils.find_data_part(
             "flight_details", data_parts
@@ -55,72 +52,118 @@ async def process_purchase_request(
         if not flight_details:
             raise ValueError("Missing flight_details in request.")
 
-        console.print(
-            "[bold blue]Flight Merchant:[/bold blue] Verifying purchase"
+        presentation.show(
+            lambda: "[bold blue]Flight Merchant:[/bold blue] Verifying purchase"
             " against [yellow]structured[/yellow] IntentMandate fields..."
         )
 
-        # 1. Validate destination
-        mandate_destination = structured_mandate.constraints.destination
-        if flight_details["destination"].lower() != mandate_destination.lower():
-            msg = (
-                "Purchase Blocked: Destination Mismatch. Agent tried to book a"
-                f" flight to '{flight_details['destination']}', but the signed"
-                " mandate only authorizes"
-                f" '{mandate_destination}'."
-            )
-            panel = Panel(
-                f"Attempted Destination: [red]{flight_details['destination']}[/red]\n"
-                "Mandate Constraint: "
-                f"[green]{mandate_destination}[/green]\n\n"
-                "[bold]Result: VIOLATION DETECTED[/bold]",
-                title="[red]Purchase Blocked by Merchant[/red]",
-                border_style="red",
-            )
-            console.print(panel)
-            await _fail_task(updater, msg)
-            return
-
-        # 2. Validate price
-        mandate_max_price = structured_mandate.constraints.max_price
-        if flight_details["price_gbp"] > mandate_max_price:
-            msg = (
-                "Purchase Blocked: Price Exceeds Limit. Agent tried to book for"
-                f" {flight_details['price_gbp']} GBP, but the signed mandate"
-                " only authorizes up to"
-                f" {mandate_max_price} GBP."
+        violations = compile_constraints(
+            structured_mandate.constraints, convert=fx.get_fx_service().convert
+        ).evaluate(flight_details)
+        if violations:
+            msg = "Purchase Blocked: " + " ".join(
+                f"{violation.message}." for violation in violations
             )
-            panel = Panel(
-                f"Attempted Price: [red]{flight_details['price_gbp']} GBP[/red]\n"
-                "Mandate Constraint: "
-                f"[green]<= {mandate_max_price} GBP[/green]\n\n"
-                "[bold]Result: VIOLATION DETECTED[/bold]",
-                title="[red]Purchase Blocked by Merchant[/red]",
-                border_style="red",
+            presentation.show(
+                lambda: Panel(
+                    "\n".join(
+                        f"[red]{escape(violation.message)}[/red]"
+                        for violation in violations
+                    )
+                    + "\n\n[bold]Result: VIOLATION DETECTED[/bold]",
+                    title="[red]Purchase Blocked by Merchant[/red]",
+                    border_style="red",
+                )
             )
-            console.print(panel)
             await _fail_task(updater, msg)
             return
 
         # If all checks pass
         success_msg = "Verification successful. Purchase approved!"
-        panel = Panel(
-            "All purchase details are consistent with the user's signed"
-            " structured IntentMandate.",
-            title="[green]✔ Purchase Approved by Merchant[/green]",
-            border_style="green",
+        presentation.show(
+            lambda: Panel(
+                "All purchase details are consistent with the user's signed"
+                " structured IntentMandate.",
+                title="[green]✔ Purchase Approved by Merchant[/green]",
+                border_style="green",
+            )
         )
-        console.print(panel)
         success_message = updater.new_agent_message(
             parts=[Part(root=TextPart(text=success_msg))]
         )
         await updater.complete(message=success_message)
 
     except Exception as e:
-        console.print(f"[bold red]ERROR:[/bold red] {e}")
+        presentation.show(
+            lambda: f"[bold red]ERROR:[/bold red] {escape(str(e))}"
+        )
         await _fail_task(updater, str(e))
 
 
+async def evaluate_flight_offers(
+    data_parts: list[dict[str, Any]],
+    updater: TaskUpdater,
+    current_task: Task | None,
+) -> None:
+    """Checks a list of candidate flights against the mandate in one request.
+
+    Returns the allowed flights, cheapest first, and the violations of the
+    others, so that a shopping agent can choose a fare it is authorized to
+    book without a round trip per candidate.
+    """
+    try:
+        structured_mandate = _find_structured_mandate(data_parts)
+        offers = message_utils.find_data_part(FLIGHT_OFFERS_DATA_KEY, data_parts)
+        if not isinstance(offers, list):
+            raise ValueError(f"Missing {FLIGHT_OFFERS_DATA_KEY} in request.")
+
+        rules = compile_constraints(
+            structured_mandate.constraints, convert=fx.get_fx_service().convert
+        )
+        allowed_offers = []
+        rejected_offers = []
+        for offer, violations in zip(offers, rules.evaluate_many(offers)):
+            if violations:
+                rejected_offers.append({
+                    "offer": offer,
+                    "violations": [violation.message for violation in violations],
+                })
+            else:
+                allowed_offers.append(offer)
+        allowed_offers.sort(key=rules.price)
+
+        presentation.show(
+            lambda: "[bold blue]Flight Merchant:[/bold blue] Evaluated"
+            f" {len(offers)} offers; {len(allowed_offers)} allowed by the"
+            " mandate."
+        )
+        await updater.add_artifact([
+            Part(root=DataPart(data={
+                "allowed_offers": allowed_offers,
+                "rejected_offers": rejected_offers,
+            }))
+        ])
+        await updater.complete()
+
+    except Exception as e:
+        presentation.show(
+            lambda: f"[bold red]ERROR:[/bold red] {escape(str(e))}"
+        )
+        await _fail_task(updater, str(e))
+
+
+def _find_structured_mandate(
+    data_parts: list[dict[str, Any]],
+) -> StructuredIntentMandate:
+    """Returns the structured IntentMandate of a request."""
+    mandate_data = message_utils.find_data_part(
+        INTENT_MANDATE_DATA_KEY, data_parts
+    )
+    if not mandate_data:
+        raise ValueError("IntentMandate not found in request.")
+    return StructuredIntentMandate.model_validate(mandate_data)
+
+
 async def _fail_task(updater: TaskUpdater, error_text: str) -> None:
     """Helper function to fail a task with a given error message."""
     error_message = updater.new_agent_message(
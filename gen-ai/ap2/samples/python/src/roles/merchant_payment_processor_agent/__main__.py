@@ -19,11 +19,13 @@ from collections.abc import Sequence
 from absl import app
 
 from roles.merchant_payment_processor_agent.agent_executor import PaymentProcessorExecutor
+from common import fake_gemini
 from common import server
 
 AGENT_PAYMENT_PROCESSOR_PORT = 8003
 
 def main(argv: Sequence[str]) -> None:
+  fake_gemini.use_if_configured()
   agent_card = server.load_local_agent_card(__file__)
   server.run_agent_blocking(
       port=AGENT_PAYMENT_PROCESSOR_PORT,
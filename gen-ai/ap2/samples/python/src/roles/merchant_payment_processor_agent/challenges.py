@@ -0,0 +1,293 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Transaction challenges raised before a payment is completed.
+
+A challenge would normally be raised by the issuer, but we don't have an issuer
+in the demo, so the payment processor raises it.
+
+The ChallengeEngine decides, per payment, whether a challenge is needed at all:
+  * Low-risk payments skip the challenge entirely, saving a full round trip
+    with the user.
+  * Other payments receive an OTP challenge.
+  * Payments without any risk signals receive a step-up challenge.
+
+For each challenge awaiting a response, only a compact PendingChallenge record
+is kept, keyed by task ID. It holds a digest of the expected response and the
+number of attempts made, and it expires after a time-to-live.
+"""
+
+import abc
+import dataclasses
+import enum
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from typing import Any, Callable
+
+from ap2.types.mandate import PaymentMandate
+from common.ttl_store import TtlStore
+
+# Payments with a risk score below this threshold skip the challenge. With
+# score_risk, the default skips payments of less than 100 that have risk data.
+# A threshold of 0 challenges every payment.
+_RISK_SKIP_THRESHOLD = float(
+    os.environ.get("PAYMENT_PROCESSOR_RISK_SKIP_THRESHOLD", "0.1")
+)
+
+# Payments with a risk score at or above this threshold get a step-up
+# challenge instead of an OTP.
+_STEP_UP_THRESHOLD = 1.0
+
+# Payment amounts at or above this value are scored as high risk.
+_HIGH_RISK_AMOUNT = 1000.0
+
+_CHALLENGE_TTL_SECONDS = 300.0
+_MAX_ATTEMPTS = 3
+
+
+class ChallengeOutcome(enum.Enum):
+  """The result of checking a challenge response."""
+
+  VERIFIED = "verified"
+  INCORRECT = "incorrect"
+  LOCKED_OUT = "locked_out"
+  NOT_FOUND = "not_found"
+
+
+@dataclasses.dataclass(slots=True)
+class PendingChallenge:
+  """The state kept for a challenge that is awaiting a response."""
+
+  challenge_type: str
+  payment_mandate_id: str
+  response_digest: str
+  attempts: int = 0
+
+
+class Challenge(abc.ABC):
+  """A way of asking the user to confirm a payment."""
+
+  challenge_type: str
+
+  @abc.abstractmethod
+  def issue(self, payment_mandate: PaymentMandate) -> tuple[dict[str, Any], str]:
+    """Issues the challenge for a payment.
+
+    Args:
+      payment_mandate: The PaymentMandate being challenged.
+
+    Returns:
+      A tuple of the challenge data to send to the user, and the response that
+      is expected back.
+    """
+
+
+class OtpChallenge(Challenge):
+  """A one-time password sent to the phone number on file."""
+
+  challenge_type = "otp"
+
+  def __init__(self, code_factory: Callable[[], str] = lambda: "123"):
+    """Initialization.
+
+    Args:
+      code_factory: Creates the one-time password. Defaults to the fixed demo
+        code.
+    """
+    self._code_factory = code_factory
+
+  def issue(self, payment_mandate: PaymentMandate) -> tuple[dict[str, Any], str]:
+    code = self._code_factory()
+    challenge_data = {
+        "type": self.challenge_type,
+        "display_text": (
+            "The payment method issuer sent a verification code to the phone "
+            "number on file, please enter it below. It will be shared with the "
+            "issuer so they can authorize the transaction."
+            f"(Demo only hint: the code is {code})"
+        ),
+    }
+    return challenge_data, code
+
+
+class StepUpChallenge(Challenge):
+  """A re-authentication of the user on the issuer's trusted surface."""
+
+  challenge_type = "step_up"
+
+  def issue(self, payment_mandate: PaymentMandate) -> tuple[dict[str, Any], str]:
+    confirmation_code = f"{secrets.randbelow(1_000_000):06d}"
+    challenge_data = {
+        "type": self.challenge_type,
+        "display_text": (
+            "The payment method issuer requires additional verification. "
+            "Please sign in to the issuer's app to approve the transaction, "
+            "then enter the confirmation code it shows below."
+            f"(Demo only hint: the code is {confirmation_code})"
+        ),
+    }
+    return challenge_data, confirmation_code
+
+
+def score_risk(payment_mandate: PaymentMandate, risk_data: Any) -> float:
+  """Scores the risk of a payment between 0 (lowest) and 1 (highest).
+
+  This is a placeholder for the issuer's risk engine. Payments without any risk
+  data are the riskiest; otherwise the score grows with the payment amount.
+
+  Args:
+    payment_mandate: The PaymentMandate being scored.
+    risk_data: The risk data collected during the shopping journey.
+
+  Returns:
+    The risk score.
+  """
+  if not risk_data:
+    return 1.0
+  amount = (
+      payment_mandate.payment_mandate_contents.payment_details_total.amount
+  )
+  return min(amount.value / _HIGH_RISK_AMOUNT, 0.99)
+
+
+class ChallengeEngine:
+  """Decides on, issues and verifies transaction challenges."""
+
+  def __init__(
+      self,
+      otp_challenge: Challenge | None = None,
+      step_up_challenge: Challenge | None = None,
+      risk_scorer: Callable[[PaymentMandate, Any], float] = score_risk,
+      skip_threshold: float = _RISK_SKIP_THRESHOLD,
+      step_up_threshold: float = _STEP_UP_THRESHOLD,
+      ttl_seconds: float = _CHALLENGE_TTL_SECONDS,
+      max_attempts: int = _MAX_ATTEMPTS,
+      clock: Callable[[], float] = time.monotonic,
+  ):
+    """Initialization.
+
+    Args:
+      otp_challenge: The challenge for payments of ordinary risk.
+      step_up_challenge: The challenge for the riskiest payments.
+      risk_scorer: Scores the risk of a payment between 0 and 1.
+      skip_threshold: Payments scoring below this skip the challenge.
+      step_up_threshold: Payments scoring at or above this get a step-up
+        challenge.
+      ttl_seconds: How long a challenge remains open for a response.
+      max_attempts: The number of incorrect responses allowed before the
+        payment is locked out.
+      clock: Returns the current time in seconds. Overridable for testing.
+    """
+    self._otp_challenge = otp_challenge or OtpChallenge()
+    self._step_up_challenge = step_up_challenge or StepUpChallenge()
+    self._risk_scorer = risk_scorer
+    self._skip_threshold = skip_threshold
+    self._step_up_threshold = step_up_threshold
+    self._max_attempts = max_attempts
+    self._pending: TtlStore[PendingChallenge] = TtlStore(
+        ttl_seconds, clock=clock
+    )
+
+  def is_pending(self, task_id: str) -> bool:
+    """Returns True if the task has a challenge awaiting a response."""
+    return self._pending.get(task_id) is not None
+
+  def issue(
+      self, task_id: str, payment_mandate: PaymentMandate, risk_data: Any
+  ) -> dict[str, Any] | None:
+    """Issues a challenge for a payment, unless its risk is low enough.
+
+    Args:
+      task_id: The ID of the task completing the payment.
+      payment_mandate: The PaymentMandate being paid.
+      risk_data: The risk data collected during the shopping journey.
+
+    Returns:
+      The challenge data to send to the user, or None if no challenge is
+      needed.
+    """
+    risk_score = self._risk_scorer(payment_mandate, risk_data)
+    if risk_score < self._skip_threshold:
+      logging.info("Risk score %.2f is low, skipping challenge.", risk_score)
+      return None
+
+    if risk_score >= self._step_up_threshold:
+      challenge = self._step_up_challenge
+    else:
+      challenge = self._otp_challenge
+    challenge_data, expected_response = challenge.issue(payment_mandate)
+    self._pending.set(
+        task_id,
+        PendingChallenge(
+            challenge_type=challenge.challenge_type,
+            payment_mandate_id=(
+                payment_mandate.payment_mandate_contents.payment_mandate_id
+            ),
+            response_digest=_digest(expected_response),
+        ),
+    )
+    return challenge_data
+
+  def verify(
+      self,
+      task_id: str,
+      payment_mandate: PaymentMandate,
+      challenge_response: str,
+  ) -> ChallengeOutcome:
+    """Checks the response to the challenge pending for a task.
+
+    Args:
+      task_id: The ID of the task completing the payment.
+      payment_mandate: The PaymentMandate being paid. It must be the one the
+        challenge was issued for.
+      challenge_response: The response provided by the user.
+
+    Returns:
+      The outcome of the check. The pending challenge is discarded once it is
+      verified or locked out.
+    """
+    pending = self._pending.get(task_id)
+    if pending is None:
+      return ChallengeOutcome.NOT_FOUND
+
+    payment_mandate_id = (
+        payment_mandate.payment_mandate_contents.payment_mandate_id
+    )
+    if payment_mandate_id == pending.payment_mandate_id and hmac.compare_digest(
+        _digest(challenge_response), pending.response_digest
+    ):
+      self._pending.pop(task_id)
+      return ChallengeOutcome.VERIFIED
+
+    pending.attempts += 1
+    if pending.attempts >= self._max_attempts:
+      self._pending.pop(task_id)
+      return ChallengeOutcome.LOCKED_OUT
+    return ChallengeOutcome.INCORRECT
+
+  def attempts_remaining(self, task_id: str) -> int:
+    """Returns how many more responses the task's pending challenge accepts."""
+    pending = self._pending.get(task_id)
+    if pending is None:
+      return 0
+    return self._max_attempts - pending.attempts
+
+
+def _digest(challenge_response: str) -> str:
+  """Returns the digest of a challenge response."""
+  return hashlib.sha256(challenge_response.strip().encode("utf-8")).hexdigest()
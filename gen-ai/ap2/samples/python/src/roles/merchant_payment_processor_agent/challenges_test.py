@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for challenges."""
+
+from absl.testing import absltest
+
+from ap2.types.mandate import PaymentMandate
+from ap2.types.mandate import PaymentMandateContents
+from ap2.types.payment_request import PaymentCurrencyAmount
+from ap2.types.payment_request import PaymentItem
+from ap2.types.payment_request import PaymentResponse
+from roles.merchant_payment_processor_agent.challenges import ChallengeEngine
+from roles.merchant_payment_processor_agent.challenges import ChallengeOutcome
+from roles.merchant_payment_processor_agent.challenges import OtpChallenge
+
+_TTL_SECONDS = 300.0
+_CODE = "123"
+
+
+def _payment_mandate(
+    value: float = 500.0, payment_mandate_id: str = "pm_1"
+) -> PaymentMandate:
+  return PaymentMandate(
+      payment_mandate_contents=PaymentMandateContents(
+          payment_mandate_id=payment_mandate_id,
+          payment_details_id="order_1",
+          payment_details_total=PaymentItem(
+              label="Total",
+              amount=PaymentCurrencyAmount(currency="USD", value=value),
+          ),
+          payment_response=PaymentResponse(
+              request_id="order_1", method_name="CARD"
+          ),
+          merchant_agent="Generic Merchant",
+      )
+  )
+
+
+class ChallengeEngineTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.now = 1000.0
+    self.engine = ChallengeEngine(
+        otp_challenge=OtpChallenge(code_factory=lambda: _CODE),
+        skip_threshold=0.1,
+        ttl_seconds=_TTL_SECONDS,
+        max_attempts=3,
+        clock=lambda: self.now,
+    )
+
+  def test_low_risk_payment_skips_the_challenge(self):
+    challenge = self.engine.issue(
+        "task_1", _payment_mandate(value=20.0), "risk_data"
+    )
+
+    self.assertIsNone(challenge)
+    self.assertFalse(self.engine.is_pending("task_1"))
+
+  def test_issues_an_otp_for_a_payment_of_ordinary_risk(self):
+    challenge = self.engine.issue("task_1", _payment_mandate(), "risk_data")
+
+    self.assertEqual(challenge["type"], "otp")
+    self.assertTrue(self.engine.is_pending("task_1"))
+
+  def test_issues_a_step_up_for_a_payment_without_risk_data(self):
+    challenge = self.engine.issue("task_1", _payment_mandate(), None)
+
+    self.assertEqual(challenge["type"], "step_up")
+
+  def test_verifies_the_expected_response_once(self):
+    payment_mandate = _payment_mandate()
+    self.engine.issue("task_1", payment_mandate, "risk_data")
+
+    self.assertEqual(
+        self.engine.verify("task_1", payment_mandate, f" {_CODE} "),
+        ChallengeOutcome.VERIFIED,
+    )
+    self.assertEqual(
+        self.engine.verify("task_1", payment_mandate, _CODE),
+        ChallengeOutcome.NOT_FOUND,
+    )
+
+  def test_locks_out_after_the_maximum_number_of_attempts(self):
+    payment_mandate = _payment_mandate()
+    self.engine.issue("task_1", payment_mandate, "risk_data")
+
+    outcomes = [
+        self.engine.verify("task_1", payment_mandate, "wrong")
+        for _ in range(3)
+    ]
+
+    self.assertEqual(
+        outcomes,
+        [
+            ChallengeOutcome.INCORRECT,
+            ChallengeOutcome.INCORRECT,
+            ChallengeOutcome.LOCKED_OUT,
+        ],
+    )
+    self.assertFalse(self.engine.is_pending("task_1"))
+    self.assertEqual(
+        self.engine.verify("task_1", payment_mandate, _CODE),
+        ChallengeOutcome.NOT_FOUND,
+    )
+
+  def test_counts_the_attempts_remaining(self):
+    payment_mandate = _payment_mandate()
+    self.engine.issue("task_1", payment_mandate, "risk_data")
+
+    self.engine.verify("task_1", payment_mandate, "wrong")
+
+    self.assertEqual(self.engine.attempts_remaining("task_1"), 2)
+    self.assertEqual(self.engine.attempts_remaining("task_2"), 0)
+
+  def test_rejects_the_response_for_another_payment_mandate(self):
+    self.engine.issue("task_1", _payment_mandate(), "risk_data")
+
+    outcome = self.engine.verify(
+        "task_1", _payment_mandate(payment_mandate_id="pm_2"), _CODE
+    )
+
+    self.assertEqual(outcome, ChallengeOutcome.INCORRECT)
+
+  def test_challenge_expires_after_its_time_to_live(self):
+    payment_mandate = _payment_mandate()
+    self.engine.issue("task_1", payment_mandate, "risk_data")
+
+    self.now += _TTL_SECONDS - 1
+    self.assertTrue(self.engine.is_pending("task_1"))
+    self.now += 1
+
+    self.assertFalse(self.engine.is_pending("task_1"))
+    self.assertEqual(
+        self.engine.verify("task_1", payment_mandate, _CODE),
+        ChallengeOutcome.NOT_FOUND,
+    )
+
+
+if __name__ == "__main__":
+  absltest.main()
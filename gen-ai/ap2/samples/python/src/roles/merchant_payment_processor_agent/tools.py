@@ -28,8 +28,10 @@ from a2a.server.tasks.task_updater import TaskUpdater
 from a2a.types import DataPart
 from a2a.types import Part
 from a2a.types import Task
-from a2a.types import TaskState
 from a2a.types import TextPart
+
+from .challenges import ChallengeEngine
+from .challenges import ChallengeOutcome
 from ap2.types.mandate import PAYMENT_MANDATE_DATA_KEY
 from ap2.types.mandate import PaymentMandate
 from ap2.types.payment_receipt import PAYMENT_RECEIPT_DATA_KEY
@@ -39,7 +41,14 @@ from common import artifact_utils
 from common import message_utils
 from common.a2a_extension_utils import EXTENSION_URI
 from common.a2a_message_builder import A2aMessageBuilder
+from common.hop_graph import HopGraph
 from common.payment_remote_a2a_client import PaymentRemoteA2aClient
+from common.payment_remote_a2a_client import get_shared_client
+
+# The deadline shared by all of the hops needed to complete a payment.
+_PAYMENT_COMPLETION_TIMEOUT_SECONDS = 120.0
+
+_challenge_engine = ChallengeEngine()
 
 
 async def initiate_payment(
@@ -60,11 +69,12 @@ async def initiate_payment(
   challenge_response = (
       message_utils.find_data_part("challenge_response", data_parts) or ""
   )
+  risk_data = message_utils.find_data_part("risk_data", data_parts)
   await _handle_payment_mandate(
       PaymentMandate.model_validate(payment_mandate),
       challenge_response,
+      risk_data,
       updater,
-      current_task,
       debug_mode,
   )
 
@@ -72,27 +82,24 @@ async def initiate_payment(
 async def _handle_payment_mandate(
     payment_mandate: PaymentMandate,
     challenge_response: str,
+    risk_data: Any,
     updater: TaskUpdater,
-    current_task: Task | None,
     debug_mode: bool = False,
 ) -> None:
   """Handles a payment mandate.
 
-  If no task is present, it initiates a transaction challenge. If a task
-  requires input, it verifies the challenge response and completes the payment.
+  If the task has a challenge pending, it verifies the challenge response and
+  completes the payment. Otherwise, it raises a transaction challenge, or
+  completes the payment straight away if the payment is low risk.
 
   Args:
     payment_mandate: The payment mandate containing payment details.
     challenge_response: The response to a transaction challenge, if any.
+    risk_data: The risk data collected during the shopping journey.
     updater: The task updater for managing task state.
-    current_task: The current task, or None if it's a new payment.
     debug_mode: Whether the agent is in debug mode.
   """
-  if current_task is None:
-    await _raise_challenge(updater)
-    return
-
-  if current_task.status.state == TaskState.input_required:
+  if _challenge_engine.is_pending(updater.task_id):
     await _check_challenge_response_and_complete_payment(
         payment_mandate,
         challenge_response,
@@ -101,28 +108,35 @@ async def _handle_payment_mandate(
     )
     return
 
+  if challenge_response:
+    await updater.failed(
+        message=updater.new_agent_message(
+            _create_text_parts(
+                "Challenge expired. Please initiate the payment again."
+            )
+        )
+    )
+    return
+
+  challenge_data = _challenge_engine.issue(
+      updater.task_id, payment_mandate, risk_data
+  )
+  if challenge_data is None:
+    await _complete_payment(payment_mandate, updater, debug_mode)
+    return
+  await _raise_challenge(challenge_data, updater)
+
 
 async def _raise_challenge(
+    challenge_data: dict[str, Any],
     updater: TaskUpdater,
 ) -> None:
   """Raises a transaction challenge.
 
-  This challenge would normally be raised by the issuer, but we don't
-  have an issuer in the demo, so we raise the challenge here. For concreteness,
-  we are using an OTP challenge in this sample.
-
   Args:
+    challenge_data: The challenge issued by the challenge engine.
     updater: The task updater.
   """
-  challenge_data = {
-      "type": "otp",
-      "display_text": (
-          "The payment method issuer sent a verification code to the phone "
-          "number on file, please enter it below. It will be shared with the "
-          "issuer so they can authorize the transaction."
-          "(Demo only hint: the code is 123)"
-      ),
-  }
   text_part = TextPart(
       text="Please provide the challenge response to complete the payment."
   )
@@ -150,14 +164,30 @@ async def _check_challenge_response_and_complete_payment(
     updater: The task updater.
     debug_mode: Whether the agent is in debug mode.
   """
-  if _challenge_response_is_valid(challenge_response=challenge_response):
+  outcome = _challenge_engine.verify(
+      updater.task_id, payment_mandate, challenge_response
+  )
+  if outcome == ChallengeOutcome.VERIFIED:
     await _complete_payment(payment_mandate, updater, debug_mode)
     return
 
+  if outcome == ChallengeOutcome.INCORRECT:
+    attempts_remaining = _challenge_engine.attempts_remaining(updater.task_id)
+    message = updater.new_agent_message(
+        _create_text_parts(
+            "Challenge response incorrect. Attempts remaining:"
+            f" {attempts_remaining}."
+        )
+    )
+    await updater.requires_input(message=message)
+    return
+
   message = updater.new_agent_message(
-      _create_text_parts("Challenge response incorrect.")
+      _create_text_parts(
+          "Too many incorrect challenge responses. The payment was declined."
+      )
   )
-  await updater.requires_input(message=message)
+  await updater.failed(message=message)
 
 
 async def _complete_payment(
@@ -167,54 +197,58 @@ async def _complete_payment(
 ) -> None:
   """Completes the payment process.
 
+  Each hop depends on the one before: the payment credential is obtained, the
+  issuer is called, and the receipt is forwarded to the Credentials Provider.
+  The receipt is only returned to the caller once it has been forwarded, so
+  that a task that fails does not also carry a receipt.
+
   Args:
     payment_mandate: The payment mandate.
     updater: The task updater.
     debug_mode: Whether the agent is in debug mode.
   """
-  payment_mandate_id = (
-      payment_mandate.payment_mandate_contents.payment_mandate_id
-  )
   credentials_provider = _get_credentials_provider_client(payment_mandate)
-  payment_credential = await _request_payment_credential(
-      payment_mandate,
-      credentials_provider,
-      updater,
-      debug_mode,
+  graph = (
+      HopGraph()
+      .add(
+          "payment_credential",
+          lambda _: _request_payment_credential(
+              payment_mandate, credentials_provider, updater, debug_mode
+          ),
+      )
+      .add(
+          "payment_receipt",
+          lambda results: _call_issuer(
+              payment_mandate, results["payment_credential"]
+          ),
+          depends_on=["payment_credential"],
+      )
+      .add(
+          "forward_receipt",
+          lambda results: _send_payment_receipt_to_credentials_provider(
+              results["payment_receipt"],
+              credentials_provider,
+              updater,
+              debug_mode,
+          ),
+          depends_on=["payment_receipt"],
+      )
+      .add(
+          "publish_receipt",
+          lambda results: _add_payment_receipt_artifact(
+              results["payment_receipt"], updater
+          ),
+          depends_on=["payment_receipt", "forward_receipt"],
+      )
   )
+  await graph.run(timeout=_PAYMENT_COMPLETION_TIMEOUT_SECONDS)
 
-  logging.info(
-      "Calling issuer to complete payment for %s with payment credential %s...",
-      payment_mandate_id,
-      payment_credential,
-  )
-  # Call issuer to complete the payment
-  payment_receipt = _create_payment_receipt(payment_mandate)
-  await _send_payment_receipt_to_credentials_provider(
-      payment_receipt,
-      credentials_provider,
-      updater,
-      debug_mode,
-  )
-  await updater.add_artifact([
-      Part(
-          root=DataPart(
-              data={PAYMENT_RECEIPT_DATA_KEY: payment_receipt.model_dump()}
-          )
-      )
-  ])
   success_message = updater.new_agent_message(
       parts=_create_text_parts("{'status': 'success'}")
   )
   await updater.complete(message=success_message)
 
 
-def _challenge_response_is_valid(challenge_response: str) -> bool:
-  """Validates the challenge response."""
-
-  return challenge_response == "123"
-
-
 async def _request_payment_credential(
     payment_mandate: PaymentMandate,
     credentials_provider: PaymentRemoteA2aClient,
@@ -248,6 +282,28 @@ async def _request_payment_credential(
   return payment_credential
 
 
+def _call_issuer(
+    payment_mandate: PaymentMandate, payment_credential: dict[str, Any]
+) -> PaymentReceipt:
+  """Calls the issuer to complete the payment.
+
+  There is no issuer in the demo, so the payment receipt is created here.
+
+  Args:
+    payment_mandate: The PaymentMandate containing payment details.
+    payment_credential: The payment credential from the Credentials Provider.
+
+  Returns:
+    The PaymentReceipt for the completed payment.
+  """
+  logging.info(
+      "Calling issuer to complete payment for %s with payment credential %s...",
+      payment_mandate.payment_mandate_contents.payment_mandate_id,
+      payment_credential,
+  )
+  return _create_payment_receipt(payment_mandate)
+
+
 def _create_payment_receipt(payment_mandate: PaymentMandate) -> PaymentReceipt:
   """Creates a payment receipt.
 
@@ -292,7 +348,7 @@ def _get_credentials_provider_client(
       )
   )
   credentials_provider_url = token_object.get("url")
-  return PaymentRemoteA2aClient(
+  return get_shared_client(
       name="credentials_provider",
       base_url=credentials_provider_url,
       required_extensions={EXTENSION_URI},
@@ -324,6 +380,19 @@ async def _send_payment_receipt_to_credentials_provider(
   await credentials_provider.send_a2a_message(message_builder.build())
 
 
+async def _add_payment_receipt_artifact(
+    payment_receipt: PaymentReceipt, updater: TaskUpdater
+) -> None:
+  """Returns the payment receipt to the caller as a task artifact."""
+  await updater.add_artifact([
+      Part(
+          root=DataPart(
+              data={PAYMENT_RECEIPT_DATA_KEY: payment_receipt.model_dump()}
+          )
+      )
+  ])
+
+
 def _create_text_parts(*texts: str) -> list[Part]:
   """Helper to create text parts."""
   return [Part(root=TextPart(text=text)) for text in texts]
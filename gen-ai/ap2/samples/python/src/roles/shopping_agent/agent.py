@@ -26,9 +26,14 @@ from . import tools
 from .subagents.payment_method_collector.agent import payment_method_collector
 from .subagents.shipping_address_collector.agent import shipping_address_collector
 from .subagents.shopper.agent import shopper
+from common import fake_gemini
+from common import tracing
 from common.retrying_llm_agent import RetryingLlmAgent
 from common.system_utils import DEBUG_MODE_INSTRUCTIONS
 
+fake_gemini.use_if_configured()
+tracing.configure_if_enabled("shopping_agent")
+
 
 root_agent = RetryingLlmAgent(
     max_retries=5,
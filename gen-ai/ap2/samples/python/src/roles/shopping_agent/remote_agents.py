@@ -18,26 +18,65 @@ Clients request activation of the Agent Payments Protocol extension by including
 the X-A2A-Extensions header in each HTTP request.
 
 This registry serves as the initial allowlist of remote agents that the shopping
-agent trusts.
+agent trusts. Each role may be served by several replicas, listed in the file
+named by AP2_AGENT_REGISTRY_PATH; see common/agent_registry.py.
+
+The shopping agent searches every merchant agent in merchant_agent_clients for
+products. Additional merchant agents can be listed in the MERCHANT_AGENT_URLS
+environment variable, as comma-separated `name=url` pairs. Each name is a
+registry role, so its replicas can also be listed in the registry file.
 """
 
+import os
+
+from common import agent_registry
 from common.a2a_extension_utils import EXTENSION_URI
-from common.payment_remote_a2a_client import PaymentRemoteA2aClient
+
+_registry = agent_registry.get_registry()
+_registry.register_default(
+    "credentials_provider",
+    ["http://localhost:8002/a2a/credentials_provider"],
+)
+_registry.register_default(
+    "merchant_agent",
+    ["http://localhost:8001/a2a/merchant_agent"],
+)
 
 
-credentials_provider_client = PaymentRemoteA2aClient(
-    name="credentials_provider",
-    base_url="http://localhost:8002/a2a/credentials_provider",
+credentials_provider_client = _registry.client(
+    "credentials_provider",
     required_extensions={
         EXTENSION_URI,
     },
 )
 
 
-merchant_agent_client = PaymentRemoteA2aClient(
-    name="merchant_agent",
-    base_url="http://localhost:8001/a2a/merchant_agent",
+merchant_agent_client = _registry.client(
+    "merchant_agent",
     required_extensions={
         EXTENSION_URI,
     },
 )
+
+
+def _merchant_agent_clients() -> dict[str, agent_registry.BalancedA2aClient]:
+  """Returns the clients of the default and the configured merchant agents."""
+  clients = {"merchant_agent": merchant_agent_client}
+  for entry in os.environ.get("MERCHANT_AGENT_URLS", "").split(","):
+    if not entry.strip():
+      continue
+    name, separator, base_url = entry.partition("=")
+    if not separator:
+      raise ValueError(f"MERCHANT_AGENT_URLS entry is not name=url: {entry!r}")
+    _registry.register_default(name.strip(), [base_url.strip()])
+    clients[name.strip()] = _registry.client(
+        name.strip(),
+        required_extensions={
+            EXTENSION_URI,
+        },
+    )
+  return clients
+
+
+# The merchant agents the shopping agent searches, by name.
+merchant_agent_clients = _merchant_agent_clients()
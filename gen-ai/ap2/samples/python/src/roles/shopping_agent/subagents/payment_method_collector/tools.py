@@ -20,9 +20,11 @@ shopping and purchasing process.
 
 from google.adk.tools.tool_context import ToolContext
 
+from ap2.types.mandate import CartMandate
 from ap2.types.payment_request import PAYMENT_METHOD_DATA_DATA_KEY
 from common.a2a_message_builder import A2aMessageBuilder
 from common import artifact_utils
+from common import mandate_store
 from roles.shopping_agent.remote_agents import credentials_provider_client
 
 
@@ -41,7 +43,10 @@ async def get_payment_methods(
   Returns:
     A dictionary of the user's applicable payment methods.
   """
-  cart_mandate = tool_context.state["cart_mandate"]
+  # The cart is only read, so it is not validated again.
+  cart_mandate = mandate_store.view_from_state(
+      tool_context.state, "cart_mandate", CartMandate
+  )
   message_builder = (
       A2aMessageBuilder()
       .set_context_id(tool_context.state["shopping_context_id"])
@@ -51,7 +56,7 @@ async def get_payment_methods(
   for method_data in cart_mandate.contents.payment_request.method_data:
     message_builder.add_data(
         PAYMENT_METHOD_DATA_DATA_KEY,
-        method_data.model_dump(),
+        method_data.to_data(),
     )
   task = await credentials_provider_client.send_a2a_message(
       message_builder.build()
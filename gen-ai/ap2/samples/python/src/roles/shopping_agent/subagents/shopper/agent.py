@@ -16,7 +16,7 @@
 
 Once the agent has clarified the user's purchase intent, it constructs an
 IntentMandate object encapsulating this information.  The IntentMandate is sent
-to the merchant agent to find relevant products.
+to every merchant agent at once to find relevant products.
 
 In this sample, the merchant agent presents items for purchase in the form of
 multiple CartMandate objects, assuming the user will select one of the options.
@@ -75,7 +75,8 @@ shopper = RetryingLlmAgent(
 
       After the breakdown, leave a blank line and end with: "Shall I proceed?"
     5. Once the user confirms, use the 'find_products' tool. It will
-      return a list of `CartMandate` objects.
+      return a list of `CartMandate` objects from one or more merchants,
+      cheapest first.
     6. For each CartMandate object in the list, create a visually distinct entry
       that includes the following details from the object:
           Item: Display the item_name clearly and in bold.
@@ -21,17 +21,30 @@ shopping and purchasing process.
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+import logging
+import os
 
 from a2a.types import Artifact
+from a2a.types import Message
+from a2a.types import Task
 from google.adk.tools.tool_context import ToolContext
 
+from ap2.types import money
 from ap2.types.mandate import CART_MANDATE_DATA_KEY
 from ap2.types.mandate import CartMandate
 from ap2.types.mandate import INTENT_MANDATE_DATA_KEY
 from ap2.types.mandate import IntentMandate
 from common.a2a_message_builder import A2aMessageBuilder
 from common.artifact_utils import find_canonical_objects
-from roles.shopping_agent.remote_agents import merchant_agent_client
+from common import mandate_store
+from common.fan_out import fan_out
+from roles.shopping_agent.remote_agents import merchant_agent_clients
+
+# The deadline for all of the merchant agents to answer a product search.
+# Merchants that have not answered by then are left out of the results.
+_MERCHANT_SEARCH_TIMEOUT_SECONDS = float(
+    os.environ.get("MERCHANT_SEARCH_TIMEOUT_SECONDS", "120")
+)
 
 
 def create_intent_mandate(
@@ -65,26 +78,34 @@ def create_intent_mandate(
           datetime.now(timezone.utc) + timedelta(days=1)
       ).isoformat(),
   )
-  tool_context.state["intent_mandate"] = intent_mandate
+  mandate_store.put_in_state(
+      tool_context.state, "intent_mandate", intent_mandate
+  )
   return intent_mandate
 
 
 async def find_products(
     tool_context: ToolContext, debug_mode: bool = False
 ) -> list[CartMandate]:
-  """Calls the merchant agent to find products matching the user's intent.
+  """Calls the merchant agents to find products matching the user's intent.
+
+  Every merchant agent is searched at once. Merchants that fail or do not
+  answer before the deadline are skipped, and so are the carts of merchants
+  that the IntentMandate does not allow.
 
   Args:
     tool_context: The ADK supplied tool context.
     debug_mode: Whether the agent is in debug mode.
 
   Returns:
-    A list of CartMandate objects.
+    A list of CartMandate objects from all of the merchants, cheapest first.
 
   Raises:
-    RuntimeError: If the merchant agent fails to provide products.
+    RuntimeError: If no merchant agent provides products.
   """
-  intent_mandate = tool_context.state["intent_mandate"]
+  intent_mandate = mandate_store.get_from_state(
+      tool_context.state, "intent_mandate", IntentMandate
+  )
   if not intent_mandate:
     raise RuntimeError("No IntentMandate found in tool context state.")
   risk_data = _collect_risk_data(tool_context)
@@ -99,14 +120,48 @@ async def find_products(
       .add_data("shopping_agent_id", "trusted_shopping_agent")
       .build()
   )
-  task = await merchant_agent_client.send_a2a_message(message)
 
-  if task.status.state != "completed":
-    raise RuntimeError(f"Failed to find products: {task.status}")
-
-  tool_context.state["shopping_context_id"] = task.context_id
-  cart_mandates = _parse_cart_mandates(task.artifacts)
-  tool_context.state["cart_mandates"] = cart_mandates
+  cart_mandates: list[CartMandate] = []
+  merchant_agent_by_cart_id: dict[str, str] = {}
+  context_ids: dict[str, str] = {}
+  failures: dict[str, str] = {}
+  allowed_merchants = _allowed_merchants(intent_mandate)
+  calls = {
+      name: (lambda name=name: _search_merchant(name, message))
+      for name in merchant_agent_clients
+  }
+  async for result in fan_out(calls, timeout=_MERCHANT_SEARCH_TIMEOUT_SECONDS):
+    if not result.ok:
+      logging.warning("Merchant %s failed: %s", result.name, result.error)
+      failures[result.name] = str(result.error)
+      continue
+    task = result.value
+    carts = _parse_cart_mandates(task.artifacts)
+    logging.info("Merchant %s returned %d carts", result.name, len(carts))
+    context_ids[result.name] = task.context_id
+    for cart in carts:
+      if (
+          allowed_merchants is not None
+          and cart.contents.merchant_name.casefold() not in allowed_merchants
+      ):
+        logging.info(
+            "Skipping cart %s from merchant %s, which the mandate does not"
+            " allow",
+            cart.contents.id,
+            cart.contents.merchant_name,
+        )
+        continue
+      if cart.contents.id not in merchant_agent_by_cart_id:
+        merchant_agent_by_cart_id[cart.contents.id] = result.name
+        cart_mandates.append(cart)
+
+  if not context_ids:
+    raise RuntimeError(f"Failed to find products: {failures}")
+
+  cart_mandates = _rank_cart_mandates(cart_mandates)
+  tool_context.state["shopping_context_ids"] = context_ids
+  tool_context.state["merchant_agent_by_cart_id"] = merchant_agent_by_cart_id
+  mandate_store.put_in_state(tool_context.state, "cart_mandates", cart_mandates)
   return cart_mandates
 
 
@@ -117,15 +172,51 @@ def update_chosen_cart_mandate(cart_id: str, tool_context: ToolContext) -> str:
     cart_id: The ID of the chosen cart.
     tool_context: The ADK supplied tool context.
   """
-  cart_mandates: list[CartMandate] = tool_context.state.get("cart_mandates", [])
-  for cart in cart_mandates:
-    print(
-        f"Checking cart with ID: {cart.contents.id} with chosen ID: {cart_id}"
+  # The carts found are all in this map, so they need not be read back from
+  # the mandate store.
+  merchant_agent_by_cart_id: dict[str, str] = tool_context.state.get(
+      "merchant_agent_by_cart_id", {}
+  )
+  if cart_id not in merchant_agent_by_cart_id:
+    return f"CartMandate with ID {cart_id} not found."
+  # Later requests about the cart go to the merchant agent that made it.
+  merchant_agent = merchant_agent_by_cart_id[cart_id]
+  tool_context.state["chosen_cart_id"] = cart_id
+  tool_context.state["chosen_merchant_agent"] = merchant_agent
+  tool_context.state["shopping_context_id"] = tool_context.state[
+      "shopping_context_ids"
+  ][merchant_agent]
+  return f"CartMandate with ID {cart_id} selected."
+
+
+def _allowed_merchants(intent_mandate: IntentMandate) -> set[str] | None:
+  """Returns the casefolded merchants the mandate allows, or None for any."""
+  if not intent_mandate.merchants:
+    return None
+  return {merchant.casefold() for merchant in intent_mandate.merchants}
+
+
+async def _search_merchant(name: str, message: Message) -> Task:
+  """Sends the product search to a merchant agent."""
+  task = await merchant_agent_clients[name].send_a2a_message(message)
+  if task.status.state != "completed":
+    raise RuntimeError(f"Failed to find products: {task.status}")
+  return task
+
+
+def _rank_cart_mandates(
+    cart_mandates: list[CartMandate],
+) -> list[CartMandate]:
+  """Orders carts by their total, cheapest first, keeping arrival order."""
+
+  def total(cart: CartMandate) -> tuple[str, int]:
+    amount = cart.contents.payment_request.details.total.amount
+    return (
+        amount.currency,
+        money.to_minor_units(amount.value, amount.currency),
     )
-    if cart.contents.id == cart_id:
-      tool_context.state["chosen_cart_id"] = cart_id
-      return f"CartMandate with ID {cart_id} selected."
-  return f"CartMandate with ID {cart_id} not found."
+
+  return sorted(cart_mandates, key=total)
 
 
 def _parse_cart_mandates(artifacts: list[Artifact]) -> list[CartMandate]:
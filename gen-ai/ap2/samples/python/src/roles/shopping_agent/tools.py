@@ -22,11 +22,10 @@ from datetime import datetime
 from datetime import timezone
 import uuid
 
-from a2a.types import Artifact
 from google.adk.tools.tool_context import ToolContext
 
 from .remote_agents import credentials_provider_client
-from .remote_agents import merchant_agent_client
+from .remote_agents import merchant_agent_clients
 from ap2.types.contact_picker import ContactAddress
 from ap2.types.mandate import CART_MANDATE_DATA_KEY
 from ap2.types.mandate import CartMandate
@@ -36,8 +35,11 @@ from ap2.types.mandate import PaymentMandateContents
 from ap2.types.payment_receipt import PAYMENT_RECEIPT_DATA_KEY
 from ap2.types.payment_receipt import PaymentReceipt
 from ap2.types.payment_request import PaymentResponse
+from ap2.types.trusted import TrustedView
 from common import artifact_utils
+from common import mandate_store
 from common.a2a_message_builder import A2aMessageBuilder
+from common.agent_registry import BalancedA2aClient
 
 
 async def update_cart(
@@ -69,13 +71,16 @@ async def update_cart(
       .add_data("debug_mode", debug_mode)
       .build()
   )
+  merchant_agent_client = _chosen_merchant_agent_client(tool_context)
   task = await merchant_agent_client.send_a2a_message(message)
 
-  updated_cart_mandate = artifact_utils.only(
-      _parse_cart_mandates(task.artifacts)
+  updated_cart_mandate = artifact_utils.only_canonical_object(
+      task.artifacts, CART_MANDATE_DATA_KEY, CartMandate
   )
 
-  tool_context.state["cart_mandate"] = updated_cart_mandate
+  mandate_store.put_in_state(
+      tool_context.state, "cart_mandate", updated_cart_mandate
+  )
   tool_context.state["shipping_address"] = shipping_address
 
   return updated_cart_mandate
@@ -91,7 +96,9 @@ async def initiate_payment(tool_context: ToolContext, debug_mode: bool = False):
   Returns:
     The status of the payment initiation.
   """
-  payment_mandate = tool_context.state["signed_payment_mandate"]
+  payment_mandate = mandate_store.get_from_state(
+      tool_context.state, "signed_payment_mandate", PaymentMandate
+  )
   if not payment_mandate:
     raise RuntimeError("No signed payment mandate found in tool context state.")
   risk_data = tool_context.state["risk_data"]
@@ -108,6 +115,7 @@ async def initiate_payment(tool_context: ToolContext, debug_mode: bool = False):
       .add_data("debug_mode", debug_mode)
       .build()
   )
+  merchant_agent_client = _chosen_merchant_agent_client(tool_context)
   task = await merchant_agent_client.send_a2a_message(outgoing_message_builder)
   store_receipt_if_present(task, tool_context)
   tool_context.state["initiate_payment_task_id"] = task.id
@@ -130,7 +138,9 @@ async def initiate_payment_with_otp(
   Returns:
     The status of the payment initiation.
   """
-  payment_mandate = tool_context.state["signed_payment_mandate"]
+  payment_mandate = mandate_store.get_from_state(
+      tool_context.state, "signed_payment_mandate", PaymentMandate
+  )
   if not payment_mandate:
     raise RuntimeError("No signed payment mandate found in tool context state.")
   risk_data = tool_context.state["risk_data"]
@@ -150,6 +160,7 @@ async def initiate_payment_with_otp(
       .build()
   )
 
+  merchant_agent_client = _chosen_merchant_agent_client(tool_context)
   task = await merchant_agent_client.send_a2a_message(outgoing_message_builder)
   store_receipt_if_present(task, tool_context)
   return task.status
@@ -157,12 +168,13 @@ async def initiate_payment_with_otp(
 
 def store_receipt_if_present(task, tool_context: ToolContext) -> None:
   """Stores the payment receipt in state."""
-  payment_receipts = artifact_utils.find_canonical_objects(
-      task.artifacts, PAYMENT_RECEIPT_DATA_KEY, PaymentReceipt
+  payment_receipt = artifact_utils.only_canonical_object(
+      task.artifacts, PAYMENT_RECEIPT_DATA_KEY, PaymentReceipt, required=False
   )
-  if payment_receipts:
-    payment_receipt = artifact_utils.only(payment_receipts)
-    tool_context.state["payment_receipt"] = payment_receipt
+  if payment_receipt:
+    mandate_store.put_in_state(
+        tool_context.state, "payment_receipt", payment_receipt
+    )
 
 
 def create_payment_mandate(
@@ -180,7 +192,10 @@ def create_payment_mandate(
   Returns:
     The payment mandate.
   """
-  cart_mandate = tool_context.state["cart_mandate"]
+  # The cart is only read, so it is not validated again.
+  cart_mandate = mandate_store.view_from_state(
+      tool_context.state, "cart_mandate", CartMandate
+  )
 
   payment_request = cart_mandate.contents.payment_request
   shipping_address = tool_context.state["shipping_address"]
@@ -199,13 +214,15 @@ def create_payment_mandate(
           payment_mandate_id=uuid.uuid4().hex,
           timestamp=datetime.now(timezone.utc).isoformat(),
           payment_details_id=payment_request.details.id,
-          payment_details_total=payment_request.details.total,
+          payment_details_total=payment_request.details.total.to_model(),
           payment_response=payment_response,
           merchant_agent=cart_mandate.contents.merchant_name,
       ),
   )
 
-  tool_context.state["payment_mandate"] = payment_mandate
+  mandate_store.put_in_state(
+      tool_context.state, "payment_mandate", payment_mandate
+  )
   return payment_mandate
 
 
@@ -228,8 +245,12 @@ def sign_mandates_on_user_device(tool_context: ToolContext) -> str:
   Returns:
       A string representing the simulated user authorization signature (JWT).
   """
-  payment_mandate: PaymentMandate = tool_context.state["payment_mandate"]
-  cart_mandate: CartMandate = tool_context.state["cart_mandate"]
+  payment_mandate = mandate_store.get_from_state(
+      tool_context.state, "payment_mandate", PaymentMandate
+  )
+  cart_mandate = mandate_store.view_from_state(
+      tool_context.state, "cart_mandate", CartMandate
+  )
   cart_mandate_hash = _generate_cart_mandate_hash(cart_mandate)
   payment_mandate_hash = _generate_payment_mandate_hash(
       payment_mandate.payment_mandate_contents
@@ -240,7 +261,9 @@ def sign_mandates_on_user_device(tool_context: ToolContext) -> str:
   payment_mandate.user_authorization = (
       cart_mandate_hash + "_" + payment_mandate_hash
   )
-  tool_context.state["signed_payment_mandate"] = payment_mandate
+  mandate_store.put_in_state(
+      tool_context.state, "signed_payment_mandate", payment_mandate
+  )
   return payment_mandate.user_authorization
 
 
@@ -254,7 +277,9 @@ async def send_signed_payment_mandate_to_credentials_provider(
     tool_context: The ADK supplied tool context.
     debug_mode: Whether the agent is in debug mode.
   """
-  payment_mandate = tool_context.state["signed_payment_mandate"]
+  payment_mandate = mandate_store.get_from_state(
+      tool_context.state, "signed_payment_mandate", PaymentMandate
+  )
   if not payment_mandate:
     raise RuntimeError("No signed payment mandate found in tool context state.")
   risk_data = tool_context.state["risk_data"]
@@ -272,7 +297,16 @@ async def send_signed_payment_mandate_to_credentials_provider(
   return await credentials_provider_client.send_a2a_message(message)
 
 
-def _generate_cart_mandate_hash(cart_mandate: CartMandate) -> str:
+def _chosen_merchant_agent_client(
+    tool_context: ToolContext,
+) -> BalancedA2aClient:
+  """Returns the client of the merchant agent that made the chosen cart."""
+  return merchant_agent_clients[
+      tool_context.state.get("chosen_merchant_agent", "merchant_agent")
+  ]
+
+
+def _generate_cart_mandate_hash(cart_mandate: TrustedView[CartMandate]) -> str:
   """Generates a cryptographic hash of the CartMandate.
 
   This hash serves as a tamper-proof reference to the specific merchant-signed
@@ -283,8 +317,8 @@ def _generate_cart_mandate_hash(cart_mandate: CartMandate) -> str:
   canonical representation of the CartMandate object.
 
   Args:
-      cart_mandate: The complete CartMandate object, including the merchant's
-        authorization.
+      cart_mandate: A view of the complete CartMandate, including the
+        merchant's authorization.
 
   Returns:
       A string representing the hash of the cart mandate.
@@ -313,10 +347,3 @@ def _generate_payment_mandate_hash(
   return (
       "fake_payment_mandate_hash_" + payment_mandate_contents.payment_mandate_id
   )
-
-
-def _parse_cart_mandates(artifacts: list[Artifact]) -> list[CartMandate]:
-  """Parses a list of artifacts into a list of CartMandate objects."""
-  return artifact_utils.find_canonical_objects(
-      artifacts, CART_MANDATE_DATA_KEY, CartMandate
-  )
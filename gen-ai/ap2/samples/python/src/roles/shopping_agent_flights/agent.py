@@ -15,8 +15,13 @@
 """A shopping agent for booking flights in a human-not-present scenario."""
 
 from . import tools
+from common import fake_gemini
+from common import tracing
 from common.retrying_llm_agent import RetryingLlmAgent
 
+fake_gemini.use_if_configured()
+tracing.configure_if_enabled("flight_shopping_agent")
+
 
 flight_shopping_agent = RetryingLlmAgent(
     name="flight_shopping_agent",
@@ -42,9 +47,14 @@ flight_shopping_agent = RetryingLlmAgent(
         Use the destination "Paris" and a price of 195 GBP. Call the `execute_purchase`
         tool with these correct values.
     7.  Report the final outcome of the correct purchase attempt to the user.
+
+    If the user instead gives you several candidate flights to choose from,
+    call the `evaluate_flight_offers` tool once with all of them, and book the
+    cheapest allowed one with `execute_purchase`.
     """,
     tools=[
         tools.create_and_sign_intent_mandate,
         tools.execute_purchase,
+        tools.evaluate_flight_offers,
     ],
 )
@@ -14,6 +14,8 @@
 
 """Custom, structured IntentMandate for the flight booking demo."""
 
+from typing import Optional
+
 from ap2.types.mandate import IntentMandate
 from pydantic import BaseModel, Field
 
@@ -25,6 +27,14 @@ class FlightConstraints(BaseModel):
     currency: str = Field(
         "GBP", description="The 3-letter currency code (e.g., GBP)."
     )
+    allowed_carriers: Optional[list[str]] = Field(
+        None,
+        description="The airlines the flight may be with, or None for any.",
+    )
+    max_stops: Optional[int] = Field(
+        None,
+        description="The maximum number of stops, or None for any number.",
+    )
 
 
 class StructuredIntentMandate(IntentMandate):
@@ -14,16 +14,20 @@
 
 """Tools for the flight shopping agent."""
 from datetime import datetime, timedelta, timezone
+from typing import Any
 from .custom_mandate import FlightConstraints, StructuredIntentMandate
 
 from ap2.types.mandate import INTENT_MANDATE_DATA_KEY
+from common import presentation
 from common.a2a_extension_utils import EXTENSION_URI
 from common.a2a_message_builder import A2aMessageBuilder
+from common.artifact_utils import iter_data_parts
 from common.payment_remote_a2a_client import PaymentRemoteA2aClient
+from common.payment_remote_a2a_client import get_shared_client
 from google.adk.tools.tool_context import ToolContext
-from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm
+from roles.merchant_agent_flights.tools import FLIGHT_OFFERS_DATA_KEY
 
 
 def create_and_sign_intent_mandate(
@@ -33,10 +37,9 @@ def create_and_sign_intent_mandate(
     tool_context: ToolContext,
 ) -> str:
     """Creates a structured IntentMandate, asks the user to sign it, and stores it."""
-    console = Console()
-    console.print(
-        "[bold green]Shopping Agent:[/bold green] Creating structured AP2"
-        " IntentMandate..."
+    presentation.show(
+        lambda: "[bold green]Shopping Agent:[/bold green] Creating structured"
+        " AP2 IntentMandate..."
     )
 
     mandate = StructuredIntentMandate(
@@ -54,22 +57,24 @@ def create_and_sign_intent_mandate(
         ),
     )
 
-    panel = Panel(
-        mandate.model_dump_json(indent=2),
-        title="[yellow]Generated Structured AP2 IntentMandate[/yellow]",
-        border_style="yellow",
+    presentation.show(
+        lambda: Panel(
+            mandate.model_dump_json(indent=2),
+            title="[yellow]Generated Structured AP2 IntentMandate[/yellow]",
+            border_style="yellow",
+        )
     )
-    console.print(panel)
 
-    if Confirm.ask(
+    # A scripted run of the demo approves the mandate without asking.
+    if tool_context.state.get("auto_approve_mandate") or Confirm.ask(
         "[bold green]Shopping Agent:[/bold green] Please review the structured"
         " mandate. Do you approve and wish to sign it?"
     ):
         tool_context.state["signed_mandate"] = mandate
-        console.print("[green]✔ Mandate signed successfully.[/green]")
+        presentation.show(lambda: "[green]✔ Mandate signed successfully.[/green]")
         return "Mandate signed. The agent is now authorized to proceed."
     else:
-        console.print("[red]✖ Mandate rejected. Aborting.[/red]")
+        presentation.show(lambda: "[red]✖ Mandate rejected. Aborting.[/red]")
         return "User rejected the mandate."
 
 
@@ -77,9 +82,8 @@ async def execute_purchase(
     destination: str, price_gbp: int, tool_context: ToolContext
 ) -> str:
     """Attempts to purchase a flight by sending the request to the merchant agent."""
-    console = Console()
-    console.print("\n----------------------------------------------------")
-    console.print(
+    presentation.show(
+        lambda: "\n----------------------------------------------------\n"
         "[bold green]Shopping Agent:[/bold green] Attempting to book a flight"
         f" to [cyan]{destination}[/cyan] for [cyan]{price_gbp} GBP[/cyan]..."
     )
@@ -88,11 +92,7 @@ async def execute_purchase(
     if not signed_mandate:
         return "ERROR: Cannot execute purchase without a signed mandate."
 
-    flight_merchant = PaymentRemoteA2aClient(
-        name="flight_merchant",
-        base_url="http://localhost:8004/a2a/flights_merchant",
-        required_extensions={EXTENSION_URI},
-    )
+    flight_merchant = _flight_merchant_client()
 
     message = (
         A2aMessageBuilder()
@@ -111,3 +111,51 @@ async def execute_purchase(
         return f"SUCCESS: {task.status.message.parts[0].root.text}"
     else:
         return f"FAILURE: {task.status.message.parts[0].root.text}"
+
+
+async def evaluate_flight_offers(
+    candidate_flights: list[dict[str, Any]], tool_context: ToolContext
+) -> dict[str, Any]:
+    """Asks the merchant which candidate flights the signed mandate allows.
+
+    Every candidate is checked in a single request, rather than one purchase
+    attempt each.
+
+    Args:
+      candidate_flights: The candidate flights, each a dict with at least a
+        "destination", and a "price" and its "currency" (or a "price_gbp").
+      tool_context: The ADK supplied tool context.
+
+    Returns:
+      The allowed flights, cheapest first, under "allowed_offers", and the
+      others with the reasons they are not allowed, under "rejected_offers".
+    """
+    signed_mandate = tool_context.state.get("signed_mandate")
+    if not signed_mandate:
+        return {"error": "Cannot evaluate offers without a signed mandate."}
+    if not candidate_flights:
+        # The message builder drops an empty list, which the merchant would
+        # then reject as missing.
+        return {"allowed_offers": [], "rejected_offers": []}
+
+    message = (
+        A2aMessageBuilder()
+        .add_text("Evaluate these candidate flight offers.")
+        .add_data(INTENT_MANDATE_DATA_KEY, signed_mandate.model_dump())
+        .add_data(FLIGHT_OFFERS_DATA_KEY, candidate_flights)
+        .build()
+    )
+    task = await _flight_merchant_client().send_a2a_message(message)
+
+    if task.status.state != "completed":
+        return {"error": task.status.message.parts[0].root.text}
+    return next(iter_data_parts(task.artifacts), {})
+
+
+def _flight_merchant_client() -> PaymentRemoteA2aClient:
+    """Returns the flight merchant's client, shared on the running loop."""
+    return get_shared_client(
+        name="flight_merchant",
+        base_url="http://localhost:8004/a2a/flights_merchant",
+        required_extensions={EXTENSION_URI},
+    )
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixed-point money arithmetic for PaymentCurrencyAmounts.
+
+A PaymentCurrencyAmount carries its value as a float, so adding values
+accumulates binary rounding errors (0.1 + 0.2 != 0.3). Here, amounts are
+instead converted to an integer number of minor units of their currency (e.g.
+cents), added exactly, and converted back.
+
+Conversions round to the currency's minor unit, half to even, as defined by
+ISO 4217 (e.g. 2 decimal places for USD, 0 for JPY, 3 for KWD). Converting
+many amounts at once is vectorized with numpy, if it is installed.
+
+PaymentCurrencyAmount.value itself remains a float, rather than minor units
+or a Decimal, so that the JSON exchanged with other agents is unchanged: it
+stays a number, in major units. Only the arithmetic is exact. A value from
+`from_minor_units` is the float nearest to the exact amount, whose shortest
+repr, and so its JSON, is that amount, e.g. 0.3 rather than
+0.30000000000000004.
+"""
+
+from collections.abc import Sequence
+import decimal
+
+# The number of decimal places of the minor unit of each currency that does
+# not use 2, per ISO 4217.
+_NON_DEFAULT_EXPONENTS = {
+    # Currencies without a minor unit.
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0,
+    "KRW": 0, "PYG": 0, "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0,
+    "XAF": 0, "XOF": 0, "XPF": 0,
+    # Currencies with a minor unit of a thousandth.
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+    # Currencies with a minor unit of a ten thousandth.
+    "CLF": 4, "UYW": 4,
+}
+_DEFAULT_EXPONENT = 2
+
+# Values this close to half a minor unit are rounded with Decimal rather than
+# numpy, so that both give the same result.
+_HALF_UNIT_TOLERANCE = 1e-6
+
+
+def minor_unit_exponent(currency: str) -> int:
+  """Returns the number of decimal places of the currency's minor unit."""
+  return _NON_DEFAULT_EXPONENTS.get(currency.upper(), _DEFAULT_EXPONENT)
+
+
+def to_minor_units(value: float | decimal.Decimal | str, currency: str) -> int:
+  """Converts a value to an integer number of minor units of the currency.
+
+  Args:
+    value: The value, in major units (e.g. dollars).
+    currency: The three-letter ISO 4217 currency code.
+
+  Returns:
+    The value in minor units (e.g. cents), rounded half to even.
+  """
+  exponent = minor_unit_exponent(currency)
+  # Going through str() uses the shortest repr of a float, so that e.g. 2.675
+  # is treated as written rather than as 2.67499999...
+  scaled = decimal.Decimal(str(value)).scaleb(exponent)
+  return int(scaled.to_integral_value(rounding=decimal.ROUND_HALF_EVEN))
+
+
+def from_minor_units(units: int, currency: str) -> float:
+  """Converts an integer number of minor units back to a value.
+
+  Args:
+    units: The value in minor units (e.g. cents).
+    currency: The three-letter ISO 4217 currency code.
+
+  Returns:
+    The value in major units (e.g. dollars).
+  """
+  return float(decimal.Decimal(units).scaleb(-minor_unit_exponent(currency)))
+
+
+def values_to_minor_units(
+    values: Sequence[float], currency: str
+) -> list[int]:
+  """Converts many values to minor units of the same currency.
+
+  Gives the same results as `to_minor_units` for each value, but with numpy,
+  if it is installed, most of the values are converted at once.
+
+  Args:
+    values: The values, in major units.
+    currency: The three-letter ISO 4217 currency code.
+
+  Returns:
+    The values in minor units, in the same order.
+  """
+  np = _numpy()
+  if np is None or not values:
+    return [to_minor_units(value, currency) for value in values]
+
+  scaled = np.asarray(values, dtype=np.float64) * 10 ** minor_unit_exponent(
+      currency
+  )
+  units = np.rint(scaled)  # Rounds half to even.
+  fraction = scaled - np.floor(scaled)
+  ambiguous = np.flatnonzero(np.abs(fraction - 0.5) < _HALF_UNIT_TOLERANCE)
+  result = units.astype(np.int64).tolist()
+  for index in ambiguous.tolist():
+    result[index] = to_minor_units(values[index], currency)
+  return result
+
+
+def sum_values(values: Sequence[float], currency: str) -> float:
+  """Returns the exact sum of values of the same currency."""
+  return from_minor_units(
+      sum(values_to_minor_units(values, currency)), currency
+  )
+
+
+def _numpy():
+  """Returns the numpy module, or None if it is not installed."""
+  try:
+    import numpy  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    return None
+  return numpy
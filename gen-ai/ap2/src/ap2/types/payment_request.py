@@ -24,9 +24,11 @@ https://www.w3.org/TR/payment-request/
 
 from typing import Any, Dict, Optional
 
+from ap2.types import money
 from ap2.types.contact_picker import ContactAddress
 from pydantic import BaseModel
 from pydantic import Field
+from pydantic import PrivateAttr
 
 PAYMENT_METHOD_DATA_DATA_KEY = "payment_request.PaymentMethodData"
 
@@ -180,6 +182,98 @@ class PaymentDetailsInit(BaseModel):
   )
   total: PaymentItem = Field(..., description="The total payment amount.")
 
+  # The number of display items and their sum in minor units, as of the last
+  # change made through the methods below. Changing the items in any other
+  # way requires a call to recompute_total().
+  _running_total: Optional[tuple[int, int]] = PrivateAttr(None)
+
+  def add_display_items(self, items: list[PaymentItem]) -> None:
+    """Appends display items and adds their amounts to the total.
+
+    Args:
+      items: The items to append, in the currency of the total.
+
+    Raises:
+      ValueError: If an item is in a different currency than the total.
+    """
+    added_units = sum(self._to_minor_units(items))
+    count, units = self._ensure_running_total()
+    self.display_items.extend(items)
+    self._set_running_total(count + len(items), units + added_units)
+
+  def remove_display_item(self, label: str) -> PaymentItem:
+    """Removes the first display item with the label from the total.
+
+    Args:
+      label: The label of the item to remove.
+
+    Returns:
+      The removed item.
+
+    Raises:
+      KeyError: If there is no display item with the label.
+    """
+    count, units = self._ensure_running_total()
+    for index, item in enumerate(self.display_items):
+      if item.label == label:
+        del self.display_items[index]
+        (removed_units,) = self._to_minor_units([item])
+        self._set_running_total(count - 1, units - removed_units)
+        return item
+    raise KeyError(f"No display item labeled {label!r}")
+
+  def recompute_total(self) -> None:
+    """Sets the total to the exact sum of the display items.
+
+    Additions and removals through `add_display_items` and
+    `remove_display_item` only adjust the running total, which is not
+    checked against the items. This must be called after any other change
+    to the display items, e.g. replacing or repricing an item in place;
+    only a change in their number is detected.
+
+    Raises:
+      ValueError: If an item is in a different currency than the total.
+    """
+    self._set_running_total(
+        len(self.display_items), sum(self._to_minor_units(self.display_items))
+    )
+
+  def __eq__(self, other: Any) -> bool:
+    # The running total is a cache, so it does not affect equality.
+    if not isinstance(other, PaymentDetailsInit):
+      return NotImplemented
+    return type(self) is type(other) and self.__dict__ == other.__dict__
+
+  def _ensure_running_total(self) -> tuple[int, int]:
+    # Items appended to or removed from the list directly change its length,
+    # which invalidates the running total. Items replaced or repriced in place
+    # are not detected: checking every item would cost as much as summing
+    # them.
+    if (
+        self._running_total is None
+        or self._running_total[0] != len(self.display_items)
+    ):
+      self.recompute_total()
+    return self._running_total
+
+  def _set_running_total(self, count: int, units: int) -> None:
+    self._running_total = (count, units)
+    self.total.amount.value = money.from_minor_units(
+        units, self.total.amount.currency
+    )
+
+  def _to_minor_units(self, items: list[PaymentItem]) -> list[int]:
+    currency = self.total.amount.currency
+    for item in items:
+      if item.amount.currency != currency:
+        raise ValueError(
+            f"Display item {item.label!r} is in {item.amount.currency}, but"
+            f" the total is in {currency}."
+        )
+    return money.values_to_minor_units(
+        [item.amount.value for item in items], currency
+    )
+
 
 class PaymentRequest(BaseModel):
   """A request for payment.
@@ -0,0 +1,157 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read-only views of the AP2 types over already-validated data.
+
+Building a model validates every field of every nested object, even when only
+a field or two will be read, e.g. the total of a 1,000 item PaymentRequest.
+A TrustedView wraps the `model_dump()` data instead: creating one costs
+nothing, and each attribute is resolved only when it is read. Nested models
+are returned as views in turn.
+
+Views do not validate, so only create them over data that is validated
+elsewhere, or that is only inspected before being validated. Views are
+read-only; use `to_model()` to get a model that can be changed.
+"""
+
+import functools
+import inspect
+import types
+import typing
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+M = TypeVar("M", bound=BaseModel)
+
+# The kinds of field values.
+_RAW = "raw"
+_MODEL = "model"
+_LIST = "list"
+_UNION = "union"
+
+
+class TrustedView(Generic[M]):
+  """A lazy, read-only view of a model's data."""
+
+  __slots__ = ("_model", "_data")
+
+  def __init__(self, model: type[M], data: dict[str, Any]):
+    """Initialization.
+
+    Args:
+      model: The pydantic model of the data.
+      data: The data, as produced by `model_dump()`. It is not copied, and
+        must not be changed while the view is in use.
+    """
+    object.__setattr__(self, "_model", model)
+    object.__setattr__(self, "_data", data)
+
+  @classmethod
+  def from_model(cls, instance: M) -> "TrustedView[M]":
+    """Returns a view of the data of a model instance."""
+    return cls(type(instance), instance.model_dump())
+
+  @property
+  def model(self) -> type[M]:
+    """The pydantic model of the data."""
+    return self._model
+
+  def to_model(self) -> M:
+    """Returns a model instance of the data, validating it."""
+    return self._model.model_validate(self._data)
+
+  def to_data(self) -> dict[str, Any]:
+    """Returns the underlying data. It must not be changed."""
+    return self._data
+
+  def __getattr__(self, name: str) -> Any:
+    fields = _fields(self._model)
+    if name not in fields:
+      raise AttributeError(
+          f"{self._model.__name__} view has no attribute {name!r}"
+      )
+    (kind, arg), field = fields[name]
+    if name in self._data:
+      value = self._data[name]
+    elif field.is_required():
+      raise AttributeError(f"{self._model.__name__} data has no {name!r}")
+    else:
+      value = field.get_default(call_default_factory=True)
+    if value is None or kind == _RAW:
+      return value
+    if kind == _MODEL:
+      return TrustedView(arg, value)
+    if kind == _LIST:
+      return tuple(TrustedView(arg, item) for item in value)
+    return _union_member_view(arg, value)
+
+  def __setattr__(self, name: str, value: Any) -> None:
+    raise AttributeError(f"{self._model.__name__} view is read-only")
+
+  def __eq__(self, other: Any) -> bool:
+    if isinstance(other, TrustedView):
+      return self._model is other._model and self._data == other._data
+    return NotImplemented
+
+  def __repr__(self) -> str:
+    return f"TrustedView({self._model.__name__}, {self._data!r})"
+
+
+def _union_member_view(
+    members: tuple[type[BaseModel], ...], value: dict[str, Any]
+) -> TrustedView:
+  """Returns a view of the first union member whose fields fit the value."""
+  keys = value.keys()
+  for member in members:
+    fields = member.model_fields
+    required = {name for name, field in fields.items() if field.is_required()}
+    if required <= keys <= fields.keys():
+      return TrustedView(member, value)
+  raise ValueError(f"No member of {members} fits {value!r}")
+
+
+@functools.cache
+def _fields(
+    model: type[BaseModel],
+) -> dict[str, tuple[tuple[str, Any], FieldInfo]]:
+  """Returns the kind and FieldInfo of each field of a model."""
+  return {
+      name: (_field_kind(field.annotation), field)
+      for name, field in model.model_fields.items()
+  }
+
+
+def _field_kind(annotation: Any) -> tuple[str, Any]:
+  origin = typing.get_origin(annotation)
+  if origin in (typing.Union, types.UnionType):
+    members = [
+        arg for arg in typing.get_args(annotation) if arg is not type(None)
+    ]
+    if len(members) == 1:
+      return _field_kind(members[0])
+    if all(_is_model(member) for member in members):
+      return (_UNION, tuple(members))
+    return (_RAW, None)
+  if origin is list:
+    (item_type,) = typing.get_args(annotation)
+    return (_LIST, item_type) if _is_model(item_type) else (_RAW, None)
+  if _is_model(annotation):
+    return (_MODEL, annotation)
+  return (_RAW, None)
+
+
+def _is_model(annotation: Any) -> bool:
+  return inspect.isclass(annotation) and issubclass(annotation, BaseModel)